@@ -9,15 +9,74 @@ from .models import (
     Exam,
     PlacementProfile,
     PlacementApplication,
+    PublishJob,
+    ResultChangeLog,
+    StudentExamResult,
     Teacher
 )
+from .ranks import schedule_rank_refresh
 
 admin.site.register(Class)
-admin.site.register(ClassTeaching)
 admin.site.register(Subject)
-admin.site.register(ExamResult)
-admin.site.register(Exam)
 admin.site.register(PlacementProfile)
 admin.site.register(PlacementCompany)
 admin.site.register(PlacementApplication)
 admin.site.register(Teacher)
+
+
+@admin.register(ClassTeaching)
+class ClassTeachingAdmin(admin.ModelAdmin):
+    # __str__ reads the user and class, so join them for the changelist
+    list_display = ("__str__", "role")
+    list_filter = ("role",)
+    list_select_related = ("user", "class_taught")
+
+
+@admin.register(Exam)
+class ExamAdmin(admin.ModelAdmin):
+    # __str__ reads the subject name, so join it rather than load it per row
+    list_display = ("__str__", "class_assigned")
+    list_select_related = ("subject", "class_assigned")
+
+
+@admin.register(ExamResult)
+class ExamResultAdmin(admin.ModelAdmin):
+    # A select box would render every exam, each loading its subject
+    raw_id_fields = ("Exam",)
+
+
+@admin.register(StudentExamResult)
+class StudentExamResultAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "grade")
+    raw_id_fields = ("exam", "student")
+
+    # Hand edits bypass publishing, so refresh the materialized ranks here
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        schedule_rank_refresh(obj.exam_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        schedule_rank_refresh(obj.exam_id)
+
+    def delete_queryset(self, request, queryset):
+        exam_ids = set(queryset.values_list("exam_id", flat=True))
+        super().delete_queryset(request, queryset)
+        schedule_rank_refresh(*exam_ids)
+
+
+@admin.register(ResultChangeLog)
+class ResultChangeLogAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "changed_by", "created_at")
+    list_select_related = ("changed_by",)
+    raw_id_fields = ("exam", "changed_by")
+
+
+@admin.register(PublishJob)
+class PublishJobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "submitted_by", "done", "total", "created_at")
+    list_filter = ("status",)
+    list_select_related = ("submitted_by",)
+    raw_id_fields = ("exam", "submitted_by")
+    exclude = ("payload",)
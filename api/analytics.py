@@ -0,0 +1,139 @@
+"""
+Per-exam result statistics for ``exams/<id>/analytics/``.
+
+Marks are pulled out of the normalized StudentExamResult rows into a NumPy
+array when NumPy is installed, or an ``array('d')`` otherwise, and every
+statistic is derived from that one sorted buffer. Output is cached under a
+per-exam results version that ``api.signals`` bumps once a publish commits.
+"""
+
+import math
+from array import array
+from collections import Counter
+
+from django.core.cache import cache
+
+from .models import StudentExamResult
+
+try:
+    import numpy
+except ImportError:  # optional; the array('d') path gives the same numbers
+    numpy = None
+
+ANALYTICS_TIMEOUT = 60 * 60 * 24
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+
+
+def results_version_key(exam_id):
+    return f"exam_results:{exam_id}:version"
+
+
+def results_version(exam_id):
+    key = results_version_key(exam_id)
+    cache.add(key, 0, timeout=None)
+    return cache.get(key, 0)
+
+
+def bump_results_version(exam_id):
+    """Invalidate every cached statistic for ``exam_id``."""
+    key = results_version_key(exam_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def interpolate(sorted_marks, q):
+    """Percentile ``q`` of a sorted sequence, interpolated like numpy's default."""
+    position = (len(sorted_marks) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_marks) - 1)
+    return sorted_marks[lower] + (sorted_marks[upper] - sorted_marks[lower]) * (
+        position - lower
+    )
+
+
+def numpy_statistics(marks):
+    values = numpy.sort(numpy.asarray(marks, dtype=float))
+    counts, edges = numpy.histogram(values, bins=HISTOGRAM_BINS)
+    return {
+        "mean": float(values.mean()),
+        "median": float(numpy.median(values)),
+        "std": float(values.std()),
+        "min": float(values[0]),
+        "max": float(values[-1]),
+        "percentiles": dict(
+            zip(map(str, PERCENTILES), numpy.percentile(values, PERCENTILES).tolist())
+        ),
+    }, {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def array_statistics(marks):
+    values = array("d", sorted(marks))
+    count = len(values)
+    mean = math.fsum(values) / count
+    low, high = values[0], values[-1]
+
+    # Equal-width bins over [min, max] with the last bin closed, as numpy does
+    if high == low:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / HISTOGRAM_BINS
+    counts = [0] * HISTOGRAM_BINS
+    for value in values:
+        counts[min(int((value - low) / width), HISTOGRAM_BINS - 1)] += 1
+
+    return {
+        "mean": mean,
+        "median": interpolate(values, 50),
+        "std": math.sqrt(math.fsum((value - mean) ** 2 for value in values) / count),
+        "min": values[0],
+        "max": values[-1],
+        "percentiles": {str(q): interpolate(values, q) for q in PERCENTILES},
+    }, {
+        "edges": [low + width * i for i in range(HISTOGRAM_BINS + 1)],
+        "counts": counts,
+    }
+
+
+def round_floats(value, digits=2):
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {key: round_floats(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_floats(item, digits) for item in value]
+    return value
+
+
+def compute_statistics(rows, use_numpy=None):
+    """Summarise ``(marks, grade)`` rows; students without marks count as absent."""
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    marks = [marks for marks, _ in rows if marks is not None]
+    grades = Counter(grade for _, grade in rows if grade)
+    summary = {
+        "students": len(rows),
+        "absent": len(rows) - len(marks),
+        "grades": dict(sorted(grades.items())),
+    }
+    if not marks:
+        return {**summary, "stats": None, "histogram": None}
+
+    stats, histogram = (numpy_statistics if use_numpy else array_statistics)(marks)
+    return round_floats({**summary, "stats": stats, "histogram": histogram})
+
+
+def exam_statistics(exam_id):
+    """Return the cached statistics for ``exam_id``, computing them on a miss."""
+    version = results_version(exam_id)
+    key = f"exam_analytics:{exam_id}:{version}"
+    statistics = cache.get(key)
+    if statistics is None:
+        rows = StudentExamResult.objects.filter(exam_id=exam_id).values_list(
+            "marks", "grade"
+        )
+        statistics = {"version": version, **compute_statistics(list(rows))}
+        cache.set(key, statistics, ANALYTICS_TIMEOUT)
+    return statistics
@@ -0,0 +1,210 @@
+"""
+Async variants of the hot read endpoints, mounted under ``async/``.
+
+Under ASGI a sync DRF view runs whole in a worker thread. These views are
+plain async Django views instead: the JWT is checked on the event loop from
+its claims and the queries go through the async ORM (``aget``, ``async
+for``). Responses are rendered by DRF and match the sync views.
+
+Permission classes run on the event loop, so they must not query; class
+membership is checked with ``aclass_role`` inside the view instead.
+"""
+
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import F
+from django.shortcuts import aget_object_or_404
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from .authentication import ClaimsJWTAuthentication
+from .models import (
+    Class,
+    ClassTeaching,
+    Exam,
+    PlacementCompany,
+    PlacementProfile,
+    StudentExamResult,
+    Subject,
+    UserRole,
+)
+from .pagination import ExamPageNumberPagination
+from .permissions import aclass_role
+from .serializers import (
+    ClassSerializer,
+    PlacementCompanySerializer,
+    SubjectSerializer,
+    UserSerializer,
+)
+
+
+class AsyncAPIView(View):
+    """
+    The parts of APIView the async endpoints need: JWT authentication,
+    ``permission_classes``, DRF's exception handling and JSON rendering.
+    """
+
+    authenticator = ClaimsJWTAuthentication()
+    renderer = JSONRenderer()
+    permission_classes = [IsAuthenticated]
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            request.user, request.auth = (
+                await self.authenticator.aauthenticate(request) or (AnonymousUser(), None)
+            )
+            self.check_permissions(request)
+            response = await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(request, exc)
+        return self.finalize_response(request, response)
+
+    def check_permissions(self, request):
+        for permission in (permission() for permission in self.permission_classes):
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def handle_exception(self, request, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            exc.auth_header = self.authenticator.authenticate_header(request)
+        response = exception_handler(exc, {"view": self, "request": request})
+        if response is None:
+            raise exc
+        return response
+
+    def finalize_response(self, request, response):
+        if isinstance(response, Response):
+            response.accepted_renderer = self.renderer
+            response.accepted_media_type = self.renderer.media_type
+            response.renderer_context = {"view": self, "request": request}
+            response.render()
+        return response
+
+
+class AsyncClassDetailView(AsyncAPIView):
+    async def get(self, request, pk):
+        class_obj = await aget_object_or_404(Class, pk=pk)
+
+        teachers, students = [], []
+        persons = ClassTeaching.objects.filter(class_taught=class_obj).select_related("user")
+        async for person in persons:
+            if person.role == UserRole.TEACHER:
+                teachers.append(person.user)
+            if person.role == UserRole.STUDENT:
+                students.append(person.user)
+        subjects = [subject async for subject in Subject.objects.filter(class_assigned=class_obj)]
+
+        return Response(
+            {
+                "class": ClassSerializer(class_obj).data,
+                "teachers": UserSerializer(teachers, many=True).data,
+                "students": UserSerializer(students, many=True).data,
+                "subjects": SubjectSerializer(subjects, many=True).data,
+            }
+        )
+
+
+class AsyncViewSubjectExamsView(AsyncAPIView):
+    pagination_class = ExamPageNumberPagination
+    ordering_fields = ("id", "name")
+
+    async def get(self, request, subject_id):
+        subject = await aget_object_or_404(Subject.objects.only("id", "name"), id=subject_id)
+
+        ordering = request.query_params.get("ordering", "id")
+        if ordering.lstrip("-") not in self.ordering_fields:
+            return Response(
+                {"error": f"Ordering must be one of: {', '.join(self.ordering_fields)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        exams = (
+            Exam.objects.filter(subject=subject)
+            .order_by(ordering, "id")
+            .values("id", "name", "description", class_name=F("class_assigned__name"))
+        )
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(exams, request, view=self)
+        if not page:
+            return Response(
+                {"message": "No exams found for this subject."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {
+                "subject": subject.name,
+                "count": paginator.page.paginator.count,
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "exams": [
+                    {
+                        "id": exam["id"],
+                        "name": exam["name"],
+                        "description": exam["description"],
+                        "class_assigned": exam["class_name"],
+                        "subject": subject.name,
+                    }
+                    for exam in page
+                ],
+            }
+        )
+
+
+class AsyncViewExamResultsView(AsyncAPIView):
+    async def get(self, request, exam_id):
+        exam = await aget_object_or_404(Exam.objects.select_related("subject"), id=exam_id)
+
+        role = await aclass_role(request, exam.class_assigned_id)
+        if role is None:
+            return Response(
+                {"error": "You are not a member of this class."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        rows = StudentExamResult.objects.filter(exam=exam)
+        if role != UserRole.TEACHER:
+            rows = rows.filter(student_id=request.user.id)
+        rows = rows.order_by("student_id").values(
+            "student_id", "student__username", "marks", "grade"
+        )
+        results = {
+            str(row["student_id"]): {
+                "student_id": row["student_id"],
+                "student_name": row["student__username"],
+                "marks": row["marks"],
+                "grade": row["grade"],
+            }
+            async for row in rows
+        }
+        if not results:
+            return Response(
+                {"message": "No results published for this exam yet."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {"exam": exam.name, "subject": exam.subject.name, "results": results}
+        )
+
+
+class AsyncPlacementStudentCompanyView(AsyncAPIView):
+    async def get(self, request):
+        try:
+            profile = await PlacementProfile.objects.aget(user=request.user)
+        except PlacementProfile.DoesNotExist:
+            return Response(
+                {"error": "Placement profile not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        companies = PlacementCompany.objects.with_student_flags(request.user, profile)
+        companies = [company async for company in companies]
+        return Response(PlacementCompanySerializer(companies, many=True).data)
@@ -0,0 +1,146 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+# User fields copied into every token
+USER_CLAIMS = ("username", "email", "is_active", "is_staff", "is_superuser")
+# The claims that grant or deny access. They are taken from a cached copy of
+# the user's row rather than the token, so deactivation and demotion apply
+# to tokens that are already issued.
+AUTH_STATE_FIELDS = ("is_active", "is_staff", "is_superuser")
+# Invalidation is signal driven; the timeout only bounds a missed one
+AUTH_STATE_TIMEOUT = 60 * 5
+
+
+def auth_state_key(user_id):
+    return f"auth_state:{user_id}"
+
+
+def auth_state(user_id):
+    """Return the user's ``AUTH_STATE_FIELDS``, or ``{}`` if the user is gone.
+
+    Cached per user; ``api.signals`` drops the entry once a User change commits.
+    """
+    key = auth_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(*AUTH_STATE_FIELDS).first() or {}
+        cache.set(key, state, AUTH_STATE_TIMEOUT)
+    return state
+
+
+async def aauth_state(user_id):
+    """Async ``auth_state`` for async views; shares its cache entries."""
+    key = auth_state_key(user_id)
+    state = await cache.aget(key)
+    if state is None:
+        state = await User.objects.filter(pk=user_id).values(*AUTH_STATE_FIELDS).afirst() or {}
+        await cache.aset(key, state, AUTH_STATE_TIMEOUT)
+    return state
+
+
+def invalidate_auth_state(*user_ids):
+    cache.delete_many([auth_state_key(user_id) for user_id in user_ids])
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying ``USER_CLAIMS``; access tokens inherit them."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+
+    def set_user_claims(self, user):
+        for claim in USER_CLAIMS:
+            self[claim] = getattr(user, claim)
+
+
+def user_from_claims(validated_token, state):
+    """
+    Build a ``User`` from token claims and its ``auth_state`` without a query.
+
+    Only the primary key and ``USER_CLAIMS`` are populated; every other field
+    is deferred and loads on first access like a ``.only()`` queryset row.
+    ``username`` and ``email`` come from the token and may lag behind the
+    database until it is refreshed.
+    """
+    claims = {
+        User._meta.pk.attname: validated_token[api_settings.USER_ID_CLAIM],
+        **{claim: validated_token[claim] for claim in USER_CLAIMS},
+        **state,
+    }
+    # from_db() expects values in concrete field order
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+    return User.from_db(
+        router.db_for_read(User), fields, [claims[name] for name in fields]
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds the user from the claims embedded by
+    ``ClaimsRefreshToken`` instead of fetching the user on every request.
+
+    ``is_active``, ``is_staff`` and ``is_superuser`` are checked against the
+    cached ``auth_state``, so a deactivated, demoted or deleted user loses
+    access as soon as the change commits. Tokens issued before the claims
+    existed, and setups that revoke tokens on password change, fall back to
+    the regular database lookup.
+    """
+
+    def uses_claims(self, validated_token):
+        """Whether ``get_user`` can answer from the token without a query."""
+        return not (
+            api_settings.CHECK_REVOKE_TOKEN
+            or api_settings.USER_ID_FIELD != "id"
+            or any(claim not in validated_token for claim in USER_CLAIMS)
+        )
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if not self.uses_claims(validated_token):
+            return super().get_user(validated_token)
+
+        state = auth_state(validated_token[api_settings.USER_ID_CLAIM])
+        return self.get_user_from_state(validated_token, state)
+
+    def get_user_from_state(self, validated_token, state):
+        if not state:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        user = user_from_claims(validated_token, state)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        ``authenticate`` for async views.
+
+        Decoding the token is pure CPU work and ``auth_state`` is read
+        through the async cache API, so only the database fallback for tokens
+        without claims leaves the event loop.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if api_settings.USER_ID_CLAIM in validated_token and self.uses_claims(validated_token):
+            state = await aauth_state(validated_token[api_settings.USER_ID_CLAIM])
+            return self.get_user_from_state(validated_token, state), validated_token
+        return await sync_to_async(self.get_user)(validated_token), validated_token
@@ -0,0 +1,10 @@
+"""
+Benchmarks for the hot API paths.
+
+Each benchmark runs against a throwaway test database so it never touches
+real data. Run them with ``python manage.py benchmark <name>``.
+"""
+
+# Importing the area modules registers their benchmarks
+from . import asgi, auth, database, endpoints, results  # noqa: F401
+from .base import BENCHMARKS, test_database  # noqa: F401
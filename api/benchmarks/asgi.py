@@ -0,0 +1,147 @@
+"""
+Concurrent throughput of the sync and async read endpoints under ASGI.
+"""
+
+import asyncio
+import http.client
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+from django.core.asgi import get_asgi_application
+from django.test import AsyncClient
+
+from ..authentication import ClaimsRefreshToken
+from ..seed import seed_college
+from .base import benchmark
+
+try:
+    import uvicorn
+except ImportError:  # optional; AsyncClient drives the ASGI app in-process instead
+    uvicorn = None
+
+
+def asgi_route_pairs(sample):
+    """``(endpoint, user, sync_path)`` for each read endpoint with an async variant."""
+    teacher, student = sample["teacher"], sample["student"]
+    return [
+        ("class_details", teacher, f"/api/class/{sample['class'].id}/details/"),
+        ("subject_exams", teacher, f"/api/subjects/{sample['subject'].id}/exams/"),
+        ("exam_results", teacher, f"/api/view-exam-results/{sample['exam'].id}/"),
+        ("student_companies", student, "/api/placement/student/company/"),
+    ]
+
+
+@contextmanager
+def uvicorn_server():
+    """Serve the ASGI application with uvicorn on a free local port."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(
+        uvicorn.Config(get_asgi_application(), lifespan="off", log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield sock.getsockname()[1]
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+def run_uvicorn_requests(port, path, token, total, concurrency):
+    """GET ``path`` ``total`` times over ``concurrency`` keep-alive connections."""
+    headers = {"Authorization": f"Bearer {token}", "Host": "testserver"}
+
+    def worker(count):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            assert response.status == 200, (path, response.status)
+            latencies.append((time.perf_counter() - start) * 1000)
+        conn.close()
+        return latencies
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return [
+            latency
+            for latencies in pool.map(worker, [total // concurrency] * concurrency)
+            for latency in latencies
+        ]
+
+
+async def run_async_client_requests(path, token, total, concurrency):
+    """The same load through Django's AsyncClient, which calls the ASGI handler directly."""
+    client = AsyncClient()
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+
+    async def worker(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, (path, response.status_code, response.content)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return latencies
+
+
+@benchmark("asgi_concurrency")
+def bench_asgi_concurrency(total=200, concurrency=(1, 10, 50), scale=0.2):
+    """Concurrent throughput of the sync and async read endpoints under ASGI.
+
+    Requests go through uvicorn when it is installed. Without it, Django's
+    AsyncClient drives the same ASGI handler in-process, which leaves out
+    socket and HTTP parsing costs; each row's ``server`` says which was used.
+    """
+    sample = seed_college(
+        students=int(3000 * scale),
+        teachers=max(2, int(150 * scale)),
+        classes=max(1, int(100 * scale)),
+        companies=max(1, int(60 * scale)),
+        prefix="asgi",
+    )
+
+    with ExitStack() as stack:
+        if uvicorn is not None:
+            server, port = "uvicorn", stack.enter_context(uvicorn_server())
+
+            def run(path, token, clients):
+                return run_uvicorn_requests(port, path, token, total, clients)
+        else:
+            server = "asyncclient"
+
+            def run(path, token, clients):
+                return asyncio.run(run_async_client_requests(path, token, total, clients))
+
+        rows = []
+        for endpoint, user, sync_path in asgi_route_pairs(sample):
+            token = str(ClaimsRefreshToken.for_user(user).access_token)
+            for view, path in (("sync", sync_path), ("async", sync_path.replace("/api/", "/api/async/", 1))):
+                run(path, token, 1)  # warm-up
+                for clients in concurrency:
+                    start = time.perf_counter()
+                    latencies = sorted(run(path, token, clients))
+                    elapsed = time.perf_counter() - start
+                    rows.append(
+                        {
+                            "endpoint": endpoint,
+                            "view": view,
+                            "server": server,
+                            "concurrency": clients,
+                            "requests_per_s": len(latencies) / elapsed,
+                            "p50_ms": latencies[len(latencies) // 2],
+                            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                        }
+                    )
+    return rows
@@ -0,0 +1,142 @@
+"""
+Benchmarks for token authentication and password logins.
+"""
+
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.db import connection, connections
+from django.test import RequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ..authentication import ClaimsJWTAuthentication, ClaimsRefreshToken
+from .base import benchmark, measure
+
+User = get_user_model()
+
+
+@benchmark("jwt_auth")
+def bench_jwt_auth(repeat=2000):
+    """Authenticate a bearer token with and without the per-request user fetch."""
+    user = User.objects.create(
+        username="bench_jwt", email="bench_jwt@example.com", password="!"
+    )
+    token = ClaimsRefreshToken.for_user(user).access_token
+    request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    rows = []
+    for mode, backend in (
+        ("db_lookup", JWTAuthentication()),
+        ("claims", ClaimsJWTAuthentication()),
+    ):
+
+        def authenticate():
+            for _ in range(repeat):
+                authenticated = backend.authenticate(Request(request))[0]
+            return authenticated
+
+        authenticated, queries, elapsed = measure(authenticate)
+        assert authenticated.pk == user.pk
+        rows.append(
+            {
+                "mode": mode,
+                "requests": repeat,
+                "queries": queries,
+                "us_per_request": elapsed * 1000 / repeat,
+            }
+        )
+    return rows
+
+
+def run_login_storm(threads, duration, emails, password):
+    """POST /api/login/ from ``threads`` clients for ``duration`` seconds."""
+    counts = {"ok": 0, "failed": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = APIClient()
+        ok = failed = 0
+        while time.perf_counter() < deadline:
+            response = client.post(
+                "/api/login/",
+                {"email": random.choice(emails), "password": password},
+                format="json",
+            )
+            if response.status_code == 200:
+                ok += 1
+            else:
+                failed += 1
+        with lock:
+            counts["ok"] += ok
+            counts["failed"] += failed
+        connections.close_all()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counts
+
+
+@benchmark("login")
+def bench_login(users=2000, repeat=10, threads=8, duration=5):
+    """Time logins by outcome, the hasher work factor, and a concurrent login storm."""
+    password = "bench-login-password"
+    encoded = get_hasher().encode(password, get_hasher().salt())
+    User.objects.bulk_create(
+        User(username=f"bench_login{i}", email=f"bench_login{i}@example.com", password=encoded)
+        for i in range(users)
+    )
+    emails = [f"bench_login{i}@example.com" for i in range(users)]
+
+    rows = []
+    stock, tuned = PBKDF2PasswordHasher(), get_hasher()
+    for name, hasher in (("django_default", stock), ("configured", tuned)):
+        hashed = hasher.encode(password, hasher.salt())
+        _, _, elapsed = measure(
+            lambda: [hasher.verify(password, hashed) for _ in range(repeat)]
+        )
+        rows.append(
+            {"case": f"hasher:{name}", "iterations": hasher.iterations,
+             "queries": 0, "ms": elapsed / repeat}
+        )
+
+    client = APIClient()
+    cases = {
+        "hit": (emails[0], password),
+        "hit_mixed_case": (emails[1].upper(), password),
+        "wrong_password": (emails[2], "not-the-password"),
+        "unknown_email": ("nobody@example.com", password),
+    }
+    for case, (email, attempt) in cases.items():
+        timings = []
+        for _ in range(repeat):
+            response, queries, elapsed = measure(
+                lambda: client.post(
+                    "/api/login/", {"email": email, "password": attempt}, format="json"
+                )
+            )
+            timings.append(elapsed)
+        expected = 200 if attempt == password and case != "unknown_email" else 400
+        assert response.status_code == expected, (case, response.content)
+        timings.sort()
+        rows.append(
+            {"case": case, "iterations": tuned.iterations,
+             "queries": queries, "ms": timings[len(timings) // 2]}
+        )
+
+    connection.close()
+    counts = run_login_storm(threads, duration, emails, password)
+    rows.append(
+        {"case": f"storm:{threads}_threads", "iterations": tuned.iterations,
+         "queries": None, "ms": duration * 1000 / max(counts["ok"], 1),
+         "logins_per_s": counts["ok"] / duration, "failed": counts["failed"]}
+    )
+    return rows
@@ -0,0 +1,93 @@
+"""
+Registry and shared helpers for the benchmarks.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from ..models import Class, ClassTeaching, Exam, Subject, UserRole
+
+User = get_user_model()
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark function under ``name``."""
+
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+@contextmanager
+def test_database():
+    """Create a disposable test database for the duration of the block.
+
+    SQLite gets a temporary file rather than the usual in-memory database so
+    that concurrent benchmarks see real file locking.
+    """
+    setup_test_environment()
+    tmpdir = None
+    if connection.vendor == "sqlite":
+        tmpdir = tempfile.mkdtemp()
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(tmpdir, "bench.sqlite3")
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def measure(func):
+    """Run ``func`` and return ``(result, query_count, elapsed_ms)``."""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+    return result, len(queries.captured_queries), elapsed
+
+
+def create_users(prefix, count):
+    """Bulk create ``count`` users with unusable passwords and return them.
+
+    SQLite and PostgreSQL both hand back the new primary keys, so other users
+    sharing the prefix, such as a benchmark's teacher, are never picked up.
+    """
+    return User.objects.bulk_create(
+        User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password="!")
+        for i in range(count)
+    )
+
+
+def create_class(name, teacher, students=()):
+    """Create a class with one teacher, the given students, a subject and an exam."""
+    class_obj = Class.objects.create(name=name, description="Benchmark class")
+    ClassTeaching.objects.create(
+        user=teacher, class_taught=class_obj, role=UserRole.TEACHER
+    )
+    ClassTeaching.objects.bulk_create(
+        ClassTeaching(user=student, class_taught=class_obj, role=UserRole.STUDENT)
+        for student in students
+    )
+    subject = Subject.objects.create(name=f"{name} subject", class_assigned=class_obj)
+    exam = Exam.objects.create(
+        name=f"{name} exam", class_assigned=class_obj, subject=subject
+    )
+    return class_obj, subject, exam
@@ -0,0 +1,230 @@
+"""
+Benchmarks for database write throughput and the lookup indexes.
+"""
+
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import (
+    OperationalError,
+    close_old_connections,
+    connection,
+    connections,
+    transaction,
+)
+
+from ..models import (
+    Class,
+    ClassTeaching,
+    Exam,
+    ExamResult,
+    PlacementApplication,
+    PlacementCompany,
+    PlacementProfile,
+    Subject,
+    UserRole,
+)
+from .base import benchmark, create_class, create_users
+
+User = get_user_model()
+
+
+# Connection settings overrides compared by the db_throughput benchmark
+BASELINE_DB_PROFILES = {
+    "sqlite": {
+        "OPTIONS": {"init_command": "PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL"},
+    },
+    "postgresql": {"CONN_MAX_AGE": 0, "OPTIONS": {}},
+}
+
+
+def run_concurrent_writes(threads, duration, exams, students):
+    """Publish small result batches from ``threads`` workers for ``duration`` s.
+
+    Every operation ends like a request does, with close_old_connections(),
+    so connection reuse and pooling settings take effect.
+    """
+    counts = {"ops": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        ops = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                exam = random.choice(exams)
+                batch = random.sample(students, 5)
+                with transaction.atomic():
+                    exam_result, _ = ExamResult.objects.select_for_update().get_or_create(
+                        Exam=exam
+                    )
+                    exam_result.add_student_results(
+                        (student, random.randint(0, 100), None) for student in batch
+                    )
+                ops += 1
+            except OperationalError:
+                # "database is locked" and friends
+                errors += 1
+            finally:
+                close_old_connections()
+        with lock:
+            counts["ops"] += ops
+            counts["errors"] += errors
+        connections.close_all()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counts
+
+
+@benchmark("db_throughput")
+def bench_db_throughput(threads=8, duration=5):
+    """Compare concurrent write throughput of the default and configured profiles."""
+    teacher = User.objects.create(username="bench_db_teacher", password="!")
+    students = create_users("bench_db_", 200)
+    exams = [create_class(f"DB {i}", teacher, students)[2] for i in range(4)]
+
+    settings_dict = connection.settings_dict
+    configured = {
+        "OPTIONS": dict(settings_dict["OPTIONS"]),
+        "CONN_MAX_AGE": settings_dict["CONN_MAX_AGE"],
+    }
+    baseline = BASELINE_DB_PROFILES.get(connection.vendor, configured)
+
+    rows = []
+    for profile, overrides in (("baseline", baseline), ("configured", configured)):
+        # Worker threads open fresh connections from this same settings dict
+        settings_dict.update(overrides)
+        connection.close()
+        counts = run_concurrent_writes(threads, duration, exams, students)
+        rows.append(
+            {
+                "profile": profile,
+                "threads": threads,
+                "ops_per_s": counts["ops"] / duration,
+                "errors": counts["errors"],
+            }
+        )
+    settings_dict.update(configured)
+    return rows
+
+
+# The migration that added the lookup indexes, and the one before it
+LOOKUP_INDEX_MIGRATION = "0026_lookup_indexes_and_constraints"
+PRE_LOOKUP_INDEX_MIGRATION = "0025_image_variants"
+
+
+def seed_lookup_data(users=5000, classes=200, companies=100, applications=4):
+    """Seed memberships, exams, profiles and applications for lookup benchmarks."""
+    people = create_users("bench_lookup_", users)
+    class_objs = Class.objects.bulk_create(
+        Class(name=f"Lookup {i}", description="") for i in range(classes)
+    )
+    ClassTeaching.objects.bulk_create(
+        ClassTeaching(
+            user=person,
+            class_taught=class_objs[i % classes],
+            role=UserRole.TEACHER if i < classes else UserRole.STUDENT,
+        )
+        for i, person in enumerate(people)
+    )
+    subjects = Subject.objects.bulk_create(
+        Subject(name=f"Subject {i}", class_assigned=class_obj)
+        for class_obj in class_objs
+        for i in range(5)
+    )
+    Exam.objects.bulk_create(
+        Exam(name=f"Exam {i}", class_assigned_id=subject.class_assigned_id, subject=subject)
+        for subject in subjects
+        for i in range(3)
+    )
+    company_objs = PlacementCompany.objects.bulk_create(
+        PlacementCompany(
+            name=f"Company {i}",
+            job_description="",
+            min_cgpa=6,
+            min_10th=60,
+            min_12th=60,
+            max_backlogs=0,
+            package=500000,
+        )
+        for i in range(companies)
+    )
+    PlacementProfile.objects.bulk_create(
+        PlacementProfile(user=person, cgpa=8, percentage_10th=80, percentage_12th=80)
+        for person in people
+    )
+    PlacementApplication.objects.bulk_create(
+        (
+            PlacementApplication(
+                user=person, company=company_objs[(i + j) % companies], other_details={}
+            )
+            for i, person in enumerate(people)
+            for j in range(applications)
+        ),
+        batch_size=1000,
+    )
+    return {
+        "user": people[-1],
+        "class": class_objs[-1],
+        "subject": subjects[-1],
+        "company": company_objs[-1],
+    }
+
+
+def lookup_queries(sample):
+    """The hot lookups, keyed by a short name, as query set factories."""
+    user, class_obj, subject, company = (
+        sample["user"], sample["class"], sample["subject"], sample["company"],
+    )
+    return {
+        "class_role_check": lambda: ClassTeaching.objects.filter(
+            user=user, class_taught=class_obj, role=UserRole.TEACHER
+        ),
+        "class_roster": lambda: ClassTeaching.objects.filter(
+            class_taught=class_obj, role=UserRole.STUDENT
+        ),
+        "already_applied": lambda: PlacementApplication.objects.filter(
+            user=user, company=company
+        ),
+        "company_applications": lambda: PlacementApplication.objects.filter(
+            company=company
+        ).order_by("id")[:50],
+        "placement_profile": lambda: PlacementProfile.objects.filter(user=user),
+        "login_email": lambda: User.objects.filter(email=user.email),
+        "class_subject_exams": lambda: Exam.objects.filter(
+            class_assigned=class_obj, subject=subject
+        ),
+    }
+
+
+@benchmark("lookup_indexes")
+def bench_lookup_indexes(repeat=200, users=5000):
+    """Time the hot lookups and show their plans before and after the indexes."""
+    sample = seed_lookup_data(users=users)
+    queries = lookup_queries(sample)
+
+    rows = []
+    for state, migration in (
+        ("before", PRE_LOOKUP_INDEX_MIGRATION),
+        ("after", None),
+    ):
+        if migration:
+            call_command("migrate", "api", migration, verbosity=0)
+        else:
+            call_command("migrate", "api", verbosity=0)
+
+        for name, make_query in queries.items():
+            plan = " | ".join(make_query().explain().splitlines())
+            start = time.perf_counter()
+            for _ in range(repeat):
+                list(make_query())
+            elapsed = (time.perf_counter() - start) * 1000 / repeat
+            rows.append({"state": state, "query": name, "ms": elapsed, "plan": plan})
+    return rows
@@ -0,0 +1,182 @@
+"""
+Latency and query counts for every route in api/urls.py.
+"""
+
+from django.contrib.auth import get_user_model
+from django.urls import URLResolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .. import urls as api_urls
+from ..authentication import ClaimsRefreshToken
+from ..models import PublishJob, Research, Teacher, UserRole
+from ..seed import SEED_PASSWORD, seed_college
+from .base import benchmark, measure
+
+User = get_user_model()
+
+
+# Endpoints the harness deliberately leaves out, with the reason
+UNBENCHMARKED_ROUTES = {
+    "add-teachers/": "starts a network import of the faculty directory",
+    "jobs/<str:job_id>/": "needs a live background job",
+}
+
+
+def api_routes():
+    """Every route in api/urls.py; router routes are named by URL name."""
+    routes = set()
+    for pattern in api_urls.urlpatterns:
+        if isinstance(pattern, URLResolver):
+            routes.update(sub.name for sub in pattern.url_patterns)
+        else:
+            routes.add(str(pattern.pattern))
+    return routes
+
+
+def endpoint_requests(sample):
+    """Map each route to ``(user, method, path, payload)`` for the harness."""
+    teacher, student = sample["teacher"], sample["student"]
+    coordinator = sample["coordinator"]
+    class_id, subject_id = sample["class"].id, sample["subject"].id
+    exam_id, company_id = sample["exam"].id, sample["company"].id
+    results = [
+        {"student_id": row.student_id, "marks": row.marks, "grade": row.grade}
+        for row in sample["exam"].student_results.all()
+    ]
+    refresh = str(RefreshToken.for_user(student))
+    roster = list(
+        User.objects.filter(
+            classteaching__class_taught_id=class_id,
+            classteaching__role=UserRole.STUDENT,
+        ).values_list("email", flat=True)
+    )
+    publish_job = PublishJob.objects.create(
+        exam=sample["exam"],
+        submitted_by=teacher,
+        status=PublishJob.Status.FINISHED,
+        total=len(results),
+        done=len(results),
+        unchanged=len(results),
+    )
+    teacher_id = Teacher.objects.values_list("id", flat=True).first()
+    research_id = Research.objects.values_list("id", flat=True).first()
+
+    return {
+        "api-root": (None, "get", "/api/", None),
+        "teacher-list": (None, "get", "/api/teachers/", None),
+        "teacher-detail": (None, "get", f"/api/teachers/{teacher_id}/", None),
+        "research-list": (None, "get", "/api/research/", None),
+        "research-detail": (None, "get", f"/api/research/{research_id}/", None),
+        "placement/company/<int:company_id>/applications/": (
+            coordinator, "get", f"/api/placement/company/{company_id}/applications/", None,
+        ),
+        "placement/company/<int:company_id>/applications/export/": (
+            coordinator, "get", f"/api/placement/company/{company_id}/applications/export/", None,
+        ),
+        "placement/applications/export/": (
+            coordinator, "get", "/api/placement/applications/export/", None,
+        ),
+        "placement/company/": (student, "get", "/api/placement/company/", None),
+        "placement/student/company/": (student, "get", "/api/placement/student/company/", None),
+        "placement/apply/": (student, "post", "/api/placement/apply/", {"company_id": company_id}),
+        "class/<int:class_id>/role/": (teacher, "get", f"/api/class/{class_id}/role/", None),
+        "placement/profile/": (student, "get", "/api/placement/profile/", None),
+        "view-exam-results/<int:exam_id>/": (teacher, "get", f"/api/view-exam-results/{exam_id}/", None),
+        "view-exam-results/<int:exam_id>/me/": (student, "get", f"/api/view-exam-results/{exam_id}/me/", None),
+        "subjects/<int:subject_id>/exams/": (teacher, "get", f"/api/subjects/{subject_id}/exams/", None),
+        "exams/<int:exam_id>/analytics/": (teacher, "get", f"/api/exams/{exam_id}/analytics/", None),
+        "exams/<int:exam_id>/ranks/": (teacher, "get", f"/api/exams/{exam_id}/ranks/", {"page_size": 20}),
+        "exams/<int:exam_id>/ranks/me/": (student, "get", f"/api/exams/{exam_id}/ranks/me/", None),
+        "class/<int:class_id>/ranks/": (teacher, "get", f"/api/class/{class_id}/ranks/", {"page_size": 20}),
+        "class/<int:class_id>/ranks/me/": (student, "get", f"/api/class/{class_id}/ranks/me/", None),
+        "exams/<int:exam_id>/publish-results/": (
+            teacher, "post", f"/api/exams/{exam_id}/publish-results/", {"results": results},
+        ),
+        "publish-jobs/<int:job_id>/": (teacher, "get", f"/api/publish-jobs/{publish_job.id}/", None),
+        "class/<int:class_id>/<int:subject_id>/add-exam/": (
+            teacher, "post", f"/api/class/{class_id}/{subject_id}/add-exam/", {"name": "Bench exam"},
+        ),
+        "class/<int:class_id>/add-subject/": (
+            teacher, "post", f"/api/class/{class_id}/add-subject/", {"name": "Bench subject"},
+        ),
+        "class/<int:class_id>/add-student/": (
+            teacher, "post", f"/api/class/{class_id}/add-student/", {"student_email": student.email},
+        ),
+        "class/<int:class_id>/add-students/": (
+            teacher, "post", f"/api/class/{class_id}/add-students/",
+            {"student_emails": roster},
+        ),
+        "class/<int:pk>/details/": (teacher, "get", f"/api/class/{class_id}/details/", None),
+        "teacher/classes/": (teacher, "get", "/api/teacher/classes/", None),
+        "student/dashboard/": (student, "get", "/api/student/dashboard/", None),
+        "register/": (
+            None, "post", "/api/register/",
+            {"username": student.username, "email": student.email, "password": "x", "password2": "x"},
+        ),
+        "login/": (None, "post", "/api/login/", {"email": student.email, "password": SEED_PASSWORD}),
+        "logout/": (student, "post", "/api/logout/", {"refresh": "invalid"}),
+        "token/refresh/": (None, "post", "/api/token/refresh/", {"refresh": refresh}),
+        "metrics/queries/": (teacher, "get", "/api/metrics/queries/", None),
+        "async/class/<int:pk>/details/": (teacher, "get", f"/api/async/class/{class_id}/details/", None),
+        "async/subjects/<int:subject_id>/exams/": (
+            teacher, "get", f"/api/async/subjects/{subject_id}/exams/", None,
+        ),
+        "async/view-exam-results/<int:exam_id>/": (
+            teacher, "get", f"/api/async/view-exam-results/{exam_id}/", None,
+        ),
+        "async/placement/student/company/": (
+            student, "get", "/api/async/placement/student/company/", None,
+        ),
+    }
+
+
+@benchmark("endpoints")
+def bench_endpoints(iterations=30, scale=0.2):
+    """Drive every API endpoint and record p50/p95 latency and query counts."""
+    sample = seed_college(
+        students=int(3000 * scale),
+        teachers=max(2, int(150 * scale)),
+        classes=max(1, int(100 * scale)),
+        companies=max(1, int(60 * scale)),
+        prefix="bench",
+    )
+    requests = endpoint_requests(sample)
+
+    missing = api_routes() - set(requests) - set(UNBENCHMARKED_ROUTES)
+    if missing:
+        raise AssertionError(f"No benchmark request for: {', '.join(sorted(missing))}")
+
+    rows = []
+    for route, (user, method, path, payload) in sorted(requests.items()):
+        client = APIClient()
+        if user is not None:
+            # Real bearer tokens so authentication is part of the measurement
+            token = ClaimsRefreshToken.for_user(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        def send():
+            response = getattr(client, method)(path, payload, format="json")
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response
+
+        # One warm-up request fills caches and lazy imports before timing
+        send()
+        timings, query_counts = [], []
+        for _ in range(iterations):
+            response, queries, elapsed = measure(send)
+            timings.append(elapsed)
+            query_counts.append(queries)
+
+        timings.sort()
+        rows.append(
+            {
+                "endpoint": f"{method.upper()} {route}",
+                "status": response.status_code,
+                "p50_ms": timings[len(timings) // 2],
+                "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                "queries": sorted(query_counts)[len(query_counts) // 2],
+            }
+        )
+    return rows
@@ -0,0 +1,200 @@
+"""
+Benchmarks for publishing, reading and analysing exam results.
+"""
+
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from .. import analytics
+from ..models import Exam, ExamResult, PublishJob, StudentExamResult
+from ..ranks import deferred_rank_refresh
+from .base import benchmark, create_class, create_users, measure
+
+User = get_user_model()
+
+
+def wait_for_publish_job(job_id, timeout=600):
+    """Poll a PublishJob until the background pool has finished with it."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = PublishJob.objects.defer("payload").get(pk=job_id)
+        if job.status in (PublishJob.Status.FINISHED, PublishJob.Status.FAILED):
+            return job
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Publish job {job_id} still {job.status}")
+        time.sleep(0.02)
+
+
+@benchmark("publish_results")
+def bench_publish_results(sizes=(10, 100, 1000, 10000), legacy_limit=1000):
+    """Publish a full sheet of results for classes of growing size.
+
+    The ``legacy`` rows replay the old one-lookup-and-save-per-row loop for
+    comparison; every save rewrites the blob, so it is quadratic and stops at
+    ``legacy_limit`` students. The exam is re-ranked once after the loop, as
+    ranks did not exist when that loop was replaced. ``async_accept`` is how
+    long a ``?async=true`` post holds the request and ``async_total`` how long
+    until its PublishJob has finished in the background.
+    """
+    rows = []
+    teacher = User.objects.create(username="bench_teacher", password="!")
+    client = APIClient()
+    client.force_authenticate(teacher)
+
+    for size in sizes:
+        students = create_users(f"bench_{size}_", size)
+        _, _, exam = create_class(f"Class {size}", teacher, students)
+        payload = {
+            "results": [
+                {"student_id": student.id, "marks": i % 100, "grade": "A"}
+                for i, student in enumerate(students)
+            ]
+        }
+
+        response, queries, elapsed = measure(
+            lambda: client.post(
+                f"/api/exams/{exam.id}/publish-results/", payload, format="json"
+            )
+        )
+        assert response.status_code == 201, response.content
+        rows.append({"mode": "bulk", "rows": size, "queries": queries, "ms": elapsed})
+
+        # Re-upload the same sheet, then one with three marks corrected
+        for mode, changed in (("unchanged", 0), ("diff_3", 3)):
+            for result in payload["results"][:changed]:
+                result["marks"] += 1
+            response, queries, elapsed = measure(
+                lambda: client.post(
+                    f"/api/exams/{exam.id}/publish-results/", payload, format="json"
+                )
+            )
+            assert response.data["changed"] == changed, response.content
+            rows.append({"mode": mode, "rows": size, "queries": queries, "ms": elapsed})
+
+        # The same sheet for a fresh exam, queued instead of published inline
+        async_exam = Exam.objects.create(
+            name=f"Class {size} async exam",
+            class_assigned_id=exam.class_assigned_id,
+            subject_id=exam.subject_id,
+        )
+        start = time.perf_counter()
+        response, queries, elapsed = measure(
+            lambda: client.post(
+                f"/api/exams/{async_exam.id}/publish-results/?async=true",
+                payload,
+                format="json",
+            )
+        )
+        assert response.status_code == 202, response.content
+        rows.append({"mode": "async_accept", "rows": size, "queries": queries, "ms": elapsed})
+        job = wait_for_publish_job(response.data["job"]["id"])
+        assert job.status == PublishJob.Status.FINISHED, job.error
+        rows.append(
+            {
+                "mode": "async_total",
+                "rows": size,
+                "ms": (time.perf_counter() - start) * 1000,
+            }
+        )
+
+        if size <= legacy_limit:
+            exam_result = ExamResult.objects.create(Exam=exam)
+
+            def legacy():
+                with deferred_rank_refresh():
+                    for result in payload["results"]:
+                        student = User.objects.get(id=result["student_id"])
+                        exam_result.add_student_result(
+                            student, result["marks"], result["grade"]
+                        )
+
+            _, queries, elapsed = measure(legacy)
+            rows.append(
+                {"mode": "legacy", "rows": size, "queries": queries, "ms": elapsed}
+            )
+
+    return rows
+
+
+@benchmark("student_result")
+def bench_student_result(sizes=(100, 1000, 10000), repeat=200):
+    """Read one student's result from exams of growing size.
+
+    ``full_blob`` loads and decodes the whole results blob, ``keyed`` extracts
+    the one entry in SQL and ``normalized`` reads the StudentExamResult row.
+    """
+    teacher = User.objects.create(username="bench_result_teacher", password="!")
+    rows = []
+    for size in sizes:
+        students = create_users(f"bench_result_{size}_", size)
+        _, _, exam = create_class(f"Result {size}", teacher)
+        ExamResult.objects.create(Exam=exam).add_student_results(
+            (student, i % 100, "A") for i, student in enumerate(students)
+        )
+        target = students[size // 2]
+        key = str(target.id)
+        results = ExamResult.objects.filter(Exam=exam)
+
+        lookups = {
+            "full_blob": lambda: results.values_list("results", flat=True).first()[key],
+            "keyed": lambda: results.student_entry(target.id),
+            "normalized": lambda: StudentExamResult.objects.filter(
+                exam=exam, student=target
+            ).values("marks", "grade").first(),
+        }
+        for mode, lookup in lookups.items():
+            entry, queries, elapsed = measure(
+                lambda: [lookup() for _ in range(repeat)][-1]
+            )
+            assert entry["marks"] == (size // 2) % 100, (mode, entry)
+            rows.append(
+                {"mode": mode, "students": size, "queries": queries // repeat,
+                 "ms_per_read": elapsed / repeat}
+            )
+    return rows
+
+
+@benchmark("analytics")
+def bench_analytics(students=5000, repeat=20):
+    """Exam statistics on the server versus shipping the sheet to the browser."""
+    teacher = User.objects.create(username="bench_analytics_teacher", password="!")
+    users = create_users("bench_stats_", students)
+    _, _, exam = create_class("Stats", teacher, users)
+    ExamResult.objects.create(Exam=exam).add_student_results(
+        [(user, random.randint(0, 100), random.choice("ABCDEF")) for user in users]
+    )
+    client = APIClient()
+    client.force_authenticate(teacher)
+
+    rows = []
+    response, queries, elapsed = measure(
+        lambda: client.get(f"/api/view-exam-results/{exam.id}/")
+    )
+    rows.append(
+        {"mode": "full_sheet", "queries": queries, "ms": elapsed, "bytes": len(response.content)}
+    )
+
+    marks = list(
+        StudentExamResult.objects.filter(exam=exam).values_list("marks", "grade")
+    )
+    backends = [("array", False)] + ([("numpy", True)] if analytics.numpy else [])
+    for name, use_numpy in backends:
+        _, _, elapsed = measure(
+            lambda: [analytics.compute_statistics(marks, use_numpy) for _ in range(repeat)]
+        )
+        rows.append({"mode": f"compute:{name}", "queries": 0, "ms": elapsed / repeat})
+
+    url = f"/api/exams/{exam.id}/analytics/"
+    client.get(url)  # warm-up
+    for mode in ("cold", "cached"):
+        if mode == "cold":
+            analytics.bump_results_version(exam.id)
+        response, queries, elapsed = measure(lambda: client.get(url))
+        assert response.status_code == 200, response.content
+        rows.append(
+            {"mode": mode, "queries": queries, "ms": elapsed, "bytes": len(response.content)}
+        )
+    return rows
@@ -0,0 +1,85 @@
+"""
+Response caching for the public faculty and research directory.
+
+Serialized list and detail responses are cached under a per-model version
+counter. Saving or deleting a row bumps the counter once the transaction
+commits (see ``api.signals``), which invalidates every cached response for
+that model at once.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+DIRECTORY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def directory_keys(model):
+    label = model._meta.label_lower
+    return f"directory:{label}:version", f"directory:{label}:modified"
+
+
+def directory_state(model):
+    """Return ``(version, last_modified)`` for ``model``'s cached responses."""
+    version_key, modified_key = directory_keys(model)
+    cache.add(version_key, 0, timeout=None)
+    cache.add(modified_key, int(time.time()), timeout=None)
+    state = cache.get_many([version_key, modified_key])
+    return state.get(version_key, 0), state.get(modified_key, int(time.time()))
+
+
+def bump_directory_version(model):
+    """Invalidate every cached directory response for ``model``."""
+    version_key, modified_key = directory_keys(model)
+    cache.add(version_key, 0, timeout=None)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, timeout=None)
+    cache.set(modified_key, int(time.time()), timeout=None)
+
+
+class CachedDirectoryMixin:
+    """Serve ``list``/``retrieve`` from the cache with ETag and 304 support."""
+
+    cache_timeout = DIRECTORY_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, render, request, *args, **kwargs):
+        model = self.queryset.model
+        version, last_modified = directory_state(model)
+        # Absolute URI so image URLs built for one host are not served to another
+        key = "directory:{}:{}:{}".format(
+            model._meta.label_lower, version, request.build_absolute_uri()
+        )
+
+        cached = cache.get(key)
+        if cached is None:
+            response = render(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = json.dumps(response.data, sort_keys=True, default=str)
+            cached = {
+                "data": response.data,
+                "etag": quote_etag(hashlib.md5(body.encode()).hexdigest()),
+            }
+            cache.set(key, cached, self.cache_timeout)
+
+        not_modified = get_conditional_response(
+            request, etag=cached["etag"], last_modified=last_modified
+        )
+        response = not_modified or Response(cached["data"])
+        response["ETag"] = cached["etag"]
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "public, max-age=0, must-revalidate"
+        return response
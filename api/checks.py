@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core import checks
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """api.signals invalidates cached responses and per-user state in the
+    default cache; a process-local cache only drops them in one worker."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend in PROCESS_LOCAL_CACHES:
+        return [
+            checks.Error(
+                "The default cache is local to each process, so cache "
+                "invalidations do not reach other workers.",
+                hint="Set CACHE_BACKEND and CACHE_LOCATION to a shared cache such as Redis.",
+                id="api.E001",
+            )
+        ]
+    return []
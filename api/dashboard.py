@@ -0,0 +1,106 @@
+"""
+The student dashboard: every class, subject and exam a user belongs to,
+with the user's own results, in one response.
+
+Dashboards are cached per user. ``api.signals`` drops them when a class,
+subject, exam or membership changes, and publishing results drops them for
+the students on the sheet.
+"""
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import ClassTeaching, Exam, StudentExamResult, Subject, UserRole
+
+DASHBOARD_TIMEOUT = 60 * 60
+
+
+def dashboard_key(user_id):
+    return f"dashboard:{user_id}"
+
+
+def invalidate_dashboards(*user_ids):
+    cache.delete_many([dashboard_key(user_id) for user_id in user_ids])
+
+
+def invalidate_class_dashboards(class_id):
+    """Drop the cached dashboard of every member of ``class_id``."""
+    invalidate_dashboards(
+        *ClassTeaching.objects.filter(class_taught_id=class_id).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+def build_dashboard(user_id):
+    """Assemble the dashboard with four queries, whatever its size."""
+    memberships = (
+        ClassTeaching.objects.filter(user_id=user_id)
+        .select_related("class_taught")
+        .order_by("class_taught_id")
+        .prefetch_related(
+            Prefetch(
+                "class_taught__subjects",
+                queryset=Subject.objects.order_by("id").prefetch_related(
+                    Prefetch(
+                        "exams",
+                        queryset=Exam.objects.order_by("id").prefetch_related(
+                            Prefetch(
+                                "student_results",
+                                queryset=StudentExamResult.objects.filter(
+                                    student_id=user_id
+                                ).only("exam_id", "marks", "grade"),
+                                to_attr="own_results",
+                            )
+                        ),
+                    )
+                ),
+            )
+        )
+    )
+
+    classes = {}
+    for membership in memberships:
+        class_obj = membership.class_taught
+        # A teacher row wins over a stray student row for the same class
+        if class_obj.id in classes and membership.role != UserRole.TEACHER:
+            continue
+        classes[class_obj.id] = {
+            "id": class_obj.id,
+            "name": class_obj.name,
+            "description": class_obj.description,
+            "role": membership.role,
+            "subjects": [
+                {
+                    "id": subject.id,
+                    "name": subject.name,
+                    "description": subject.description,
+                    "exams": [
+                        {
+                            "id": exam.id,
+                            "name": exam.name,
+                            "description": exam.description,
+                            "result": next(
+                                (
+                                    {"marks": result.marks, "grade": result.grade}
+                                    for result in exam.own_results
+                                ),
+                                None,
+                            ),
+                        }
+                        for exam in subject.exams.all()
+                    ],
+                }
+                for subject in class_obj.subjects.all()
+            ],
+        }
+    return {"classes": list(classes.values())}
+
+
+def get_dashboard(user_id):
+    key = dashboard_key(user_id)
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_dashboard(user_id)
+        cache.set(key, dashboard, DASHBOARD_TIMEOUT)
+    return dashboard
@@ -0,0 +1,151 @@
+"""
+Bulk student enrollment for ``class/<id>/add-students/``.
+
+A whole roster is enrolled with a fixed number of queries: one to resolve the
+emails, one to find existing memberships and one batched insert.
+"""
+
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .dashboard import invalidate_dashboards
+from .models import ClassTeaching, UserRole
+from .permissions import invalidate_class_roles
+
+User = get_user_model()
+
+MAX_ENROLLMENT_ROWS = 1000
+
+ENROLLED = "enrolled"
+ALREADY_ENROLLED = "already_enrolled"
+NOT_FOUND = "not_found"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+
+class EnrollmentError(ValueError):
+    """The request did not contain a usable list of emails."""
+
+
+def emails_from_csv(upload):
+    """Read emails from an uploaded CSV, by ``email`` column or else the first column."""
+    try:
+        text = io.TextIOWrapper(upload, encoding="utf-8-sig")
+        rows = [row for row in csv.reader(text) if row]
+    except (UnicodeDecodeError, csv.Error):
+        raise EnrollmentError("The uploaded file is not a readable UTF-8 CSV.")
+
+    column = 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "email" in header:
+            column = header.index("email")
+            rows = rows[1:]
+    return [row[column] if len(row) > column else "" for row in rows]
+
+
+def emails_from_request(request):
+    """Return the raw email list from ``student_emails`` or an uploaded ``file``."""
+    upload = request.FILES.get("file")
+    if upload is not None:
+        emails = emails_from_csv(upload)
+    else:
+        if hasattr(request.data, "getlist"):
+            # Form posts may repeat the field or send one comma/newline list
+            emails = request.data.getlist("student_emails")
+            emails = emails[0] if len(emails) == 1 else emails
+        else:
+            emails = request.data.get("student_emails")
+        if isinstance(emails, str):
+            emails = emails.replace(",", "\n").splitlines()
+        if not isinstance(emails, list):
+            raise EnrollmentError(
+                "Provide a list of student_emails or upload a CSV file."
+            )
+
+    if not emails:
+        raise EnrollmentError("No student emails were provided.")
+    if len(emails) > MAX_ENROLLMENT_ROWS:
+        raise EnrollmentError(
+            f"At most {MAX_ENROLLMENT_ROWS} students can be enrolled per request."
+        )
+    return emails
+
+
+def users_by_email(emails):
+    """
+    Users whose email case-insensitively matches one of ``emails``, oldest first.
+
+    Emails are not unique; like EmailBackend, callers take the oldest account.
+    Rows carry the lower-cased email as ``email_lower``.
+    """
+    return (
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in={email.lower() for email in emails})
+        .order_by("id")
+    )
+
+
+def enroll_students(class_id, emails):
+    """
+    Enroll the users behind ``emails`` as students of ``class_id``.
+
+    Returns one ``{"email", "status"}`` row per input email, in input order.
+    Emails match case-insensitively, like login does. Users who already
+    belong to the class, as student or teacher, are left untouched.
+    """
+    cleaned = [email.strip() if isinstance(email, str) else "" for email in emails]
+
+    users = {}
+    for user_id, email in users_by_email(email for email in cleaned if email).values_list(
+        "id", "email_lower"
+    ):
+        users.setdefault(email, user_id)
+
+    members = set(
+        ClassTeaching.objects.filter(
+            class_taught_id=class_id, user_id__in=users.values()
+        ).values_list("user_id", flat=True)
+    )
+
+    results, enrolled, seen = [], [], set()
+    for email in cleaned:
+        key = email.lower()
+        user_id = users.get(key)
+        if not email:
+            status = INVALID
+        elif key in seen:
+            status = DUPLICATE
+        elif user_id is None:
+            status = NOT_FOUND
+        elif user_id in members:
+            status = ALREADY_ENROLLED
+        else:
+            status = ENROLLED
+            members.add(user_id)
+            enrolled.append(user_id)
+        seen.add(key)
+        results.append({"email": email, "status": status})
+
+    if enrolled:
+        with transaction.atomic():
+            # ignore_conflicts covers a concurrent enrollment of the same student
+            ClassTeaching.objects.bulk_create(
+                [
+                    ClassTeaching(
+                        user_id=user_id, class_taught_id=class_id, role=UserRole.STUDENT
+                    )
+                    for user_id in enrolled
+                ],
+                ignore_conflicts=True,
+                batch_size=500,
+            )
+        # bulk_create sends no post_save, so drop the per-user caches here
+        transaction.on_commit(lambda: invalidate_class_roles(*enrolled))
+        transaction.on_commit(lambda: invalidate_dashboards(*enrolled))
+
+    return results
@@ -0,0 +1,69 @@
+import csv
+import json
+
+from .models import PlacementApplication
+from .serializers import PlacementProfileSerializer
+
+# other_details is a PlacementProfileSerializer snapshot taken at apply time
+DETAIL_COLUMNS = [
+    name for name in PlacementProfileSerializer.Meta.fields if name != "user"
+]
+COLUMNS = [
+    "application_id",
+    "user_id",
+    "username",
+    "email",
+    "company_id",
+    "company",
+] + DETAIL_COLUMNS
+
+
+class EchoBuffer:
+    """File-like object whose write() hands the line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def application_rows(queryset, chunk_size=2000):
+    """Yield flattened application rows without loading model instances."""
+    rows = queryset.order_by("id").values_list(
+        "id",
+        "user_id",
+        "user__username",
+        "user__email",
+        "company_id",
+        "company__name",
+        "other_details",
+    )
+    for *fields, other_details in rows.iterator(chunk_size=chunk_size):
+        if not isinstance(other_details, dict):
+            other_details = {}
+        yield fields + [other_details.get(name) for name in DETAIL_COLUMNS]
+
+
+def stream_csv(queryset):
+    writer = csv.writer(EchoBuffer())
+    yield writer.writerow(COLUMNS)
+    for row in application_rows(queryset):
+        yield writer.writerow(row)
+
+
+def stream_ndjson(queryset):
+    for row in application_rows(queryset):
+        yield json.dumps(dict(zip(COLUMNS, row)), default=str) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
+
+
+def export_applications(export_format, company_id=None):
+    """Return ``(iterator, content_type)`` for the requested export format."""
+    stream, content_type = EXPORT_FORMATS[export_format]
+    queryset = PlacementApplication.objects.all()
+    if company_id is not None:
+        queryset = queryset.filter(company_id=company_id)
+    return stream(queryset), content_type
@@ -0,0 +1,404 @@
+"""
+Import of the public faculty directory from the college website.
+
+Images are fetched concurrently through a bounded thread pool with timeouts
+and retries, and teachers are upserted on (name, branch) so the import can
+be re-run safely.
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
+import requests
+from django.core.files.base import ContentFile
+from django.db import transaction
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .caching import bump_directory_version
+from .images import needs_variants, schedule_image_variants
+from .models import Teacher
+
+FACULTY_BASE_URL = "https://cucek.cusat.ac.in/"
+
+FACULTY_DATA = {
+    "CSE": [
+        {
+            "name": "Dr. Preetha Mathew",
+            "profession": "HOD CS",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/01.jpg",
+            "profileLink": "?page=12&s=17"
+        },
+        {
+            "name": "Bindu P K",
+            "profession": "Associate Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/02.jpg",
+            "profileLink": "?page=12&s=18"
+        },
+        {
+            "name": "Manoj Kumar P",
+            "profession": "Associate Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/03.jpg",
+            "profileLink": "?page=12&s=20"
+        },
+        {
+            "name": "Anitha Mary Chacko",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/16.jpg",
+            "profileLink": "?page=12&s=141"
+        },
+        {
+            "name": "Alice Joseph",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/07.jpg",
+            "profileLink": "?page=12&s=6"
+        },
+        {
+            "name": "Aswathy V Shaji",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/22.jpg",
+            "profileLink": "?page=12&s=197"
+        },
+        {
+            "name": "Hafeesa M Habeeb",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/24.jpg",
+            "profileLink": "?page=12&s=215"
+        },
+        {
+            "name": "Amritha Mary Davis",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CSE/FACULTY PICS/0.jpg",
+            "profileLink": "?page=12&s=#"
+        }
+    ],
+    "CE": [
+        {
+            "name": "Dr.Sunilkumar N",
+            "profession": "HOD CE",
+            "image": "images/PIC & SIGN/CE/FACULTY PICS/01.jpg",
+            "profileLink": "?page=12&s=52"
+        },
+        {
+            "name": "Minimole A",
+            "profession": "Associate Professor",
+            "image": "images/PIC & SIGN/CE/FACULTY PICS/02.jpg",
+            "profileLink": "?page=12&s=15"
+        },
+        {
+            "name": "Harija K S",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CE/FACULTY PICS/40.jpg",
+            "profileLink": "?page=12&s=205"
+        },
+        {
+            "name": "Prajeesha M P",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CE/FACULTY PICS/0.jpg",
+            "profileLink": "?page=12&s=#"
+        },
+        {
+            "name": "Aimy Rose Joy",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/CE/FACULTY PICS/0.jpg",
+            "profileLink": "?page=12&s=#"
+        }
+    ],
+    "ECE": [
+        {
+            "name": "Dr.Anilkumar K K",
+            "profession": "HOD ECE",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/02.jpg",
+            "profileLink": "?page=12&s=26"
+        },
+        {
+            "name": "Dr. Manoj V J",
+            "profession": "Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/01.jpg",
+            "profileLink": "?page=12&s=199"
+        },
+        {
+            "name": "Nishanth R",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/24.jpg",
+            "profileLink": "?page=12&s=203"
+        },
+        {
+            "name": "Akhila L",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/05.jpg",
+            "profileLink": "?page=12&s=67"
+        },
+        {
+            "name": "Abin John Joseph",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/06.jpg",
+            "profileLink": "?page=12&s=21"
+        },
+        {
+            "name": "Malini Mohan",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/19.jpg",
+            "profileLink": "?page=12&s=146"
+        },
+        {
+            "name": "Sujith P S",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/21.jpg",
+            "profileLink": "?page=12&s=200"
+        },
+        {
+            "name": "Jaya Sukes",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/ECE/FACULTY PICS/26.jpg",
+            "profileLink": "?page=12&s=214"
+        }
+    ],
+    "EEE": [
+        {
+            "name": "Dr.Shiny Paul",
+            "profession": "HOD EEE",
+            "image": "images/PIC & SIGN/EEE/FACULTY PICS/02.jpg",
+            "profileLink": "?page=12&s=29"
+        },
+        {
+            "name": "Priya R Krishnan",
+            "profession": "Associate Professor",
+            "image": "images/PIC & SIGN/EEE/FACULTY PICS/04.jpg",
+            "profileLink": "?page=12&s=27"
+        },
+        {
+            "name": "Sajan Joseph",
+            "profession": "Associate Professor",
+            "image": "images/PIC & SIGN/EEE/FACULTY PICS/03.jpg",
+            "profileLink": "?page=12&s=30"
+        },
+        {
+            "name": "Nakul Sasikumar",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/EEE/FACULTY PICS/30.jpg",
+            "profileLink": "?page=12&s=156"
+        },
+        {
+            "name": "Raji Reghunanthan",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/EEE/FACULTY PICS/36.jpg",
+            "profileLink": "?page=12&s=209"
+        }
+    ],
+    "IT": [
+        {
+            "name": "Dr.Jabir K V T",
+            "profession": "HOD IT",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/02.jpg",
+            "profileLink": "?page=12&s=43"
+        },
+        {
+            "name": "Dr.Jayaprabha P",
+            "profession": "Associate Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/01.jpg",
+            "profileLink": "?page=12&s=42"
+        },
+        {
+            "name": "Dr.Harikrishnan D",
+            "profession": "Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/03.jpg",
+            "profileLink": "?page=12&s=44"
+        },
+        {
+            "name": "Nidhin Sani",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/05.jpg",
+            "profileLink": "?page=12&s=40"
+        },
+        {
+            "name": "Vineeth M V",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/16.jpg",
+            "profileLink": "?page=12&s=188"
+        },
+        {
+            "name": "Santhikrishna M S",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/17.jpg",
+            "profileLink": "?page=12&s=189"
+        },
+        {
+            "name": "Athira K R",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/21.jpg",
+            "profileLink": "?page=12&s=223"
+        },
+        {
+            "name": "Vidya Muraleedharan",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/22.jpg",
+            "profileLink": "?page=12&s=#"
+        },
+        {
+            "name": "Jesna A A",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/23.jpg",
+            "profileLink": "?page=12&s=#"
+        },
+        {
+            "name": "Keethimol P P",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/IT/FACULTY PICS/20.jpg",
+            "profileLink": "?page=12&s=222"
+        }
+    ],
+    "MCA": [
+        {
+            "name": "Deepa Nair",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/MCA/FACULTY PICS/01.jpg",
+            "profileLink": "?page=12&s=45"
+        },
+        {
+            "name": "Radhika B",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/MCA/FACULTY PICS/09.jpg",
+            "profileLink": "?page=12&s=75"
+        },
+        {
+            "name": "Anoop S",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/MCA/FACULTY PICS/19.jpg",
+            "profileLink": "?page=12&s=191"
+        },
+        {
+            "name": "Sanjana",
+            "profession": "Assistant Professor",
+            "image": "images/PIC & SIGN/MCA/FACULTY PICS/0.jpg",
+            "profileLink": "?page=12&s=#"
+        }
+    ]
+}
+
+
+def make_session(pool_size, retries):
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_image(session, url, timeout):
+    """Return the image bytes, or ``None`` with an error message on failure."""
+    try:
+        response = session.get(url, timeout=timeout)
+    except requests.RequestException as exc:
+        return None, str(exc)
+    if response.status_code != 200:
+        return None, f"status {response.status_code}"
+    return response.content, None
+
+
+def import_faculty(
+    faculty=None,
+    base_url=FACULTY_BASE_URL,
+    workers=8,
+    timeout=10,
+    retries=3,
+    progress=None,
+):
+    """Download faculty images concurrently and upsert the teachers.
+
+    Images whose SHA-256 matches the stored ``image_hash`` are not written
+    again. ``progress(done, total)`` is called after each download.
+    Returns a summary dict with created/updated/unchanged counts and errors.
+    """
+    faculty = FACULTY_DATA if faculty is None else faculty
+    records = [
+        (branch, data) for branch, teachers in faculty.items() for data in teachers
+    ]
+    total = len(records)
+
+    # One session per worker thread, all sharing the same retry policy
+    local = threading.local()
+
+    def download(branch, data):
+        if not hasattr(local, "session"):
+            local.session = make_session(workers, retries)
+        url = base_url + quote(data["image"])
+        content, error = fetch_image(local.session, url, timeout)
+        return branch, data, url, content, error
+
+    downloads = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(download, branch, data) for branch, data in records]
+        for done, future in enumerate(as_completed(futures), start=1):
+            downloads.append(future.result())
+            if progress:
+                progress(done, total)
+
+    existing = {
+        (teacher.name, teacher.branch): teacher
+        for teacher in Teacher.objects.only("id", "name", "branch", "image", "image_hash")
+    }
+
+    summary = {"created": 0, "updated": 0, "unchanged": 0, "errors": []}
+    teachers = []
+    for branch, data, url, content, error in downloads:
+        current = existing.get((data["name"], branch))
+        image = current.image.name if current and current.image else None
+        image_hash = current.image_hash if current else ""
+
+        changed = False
+        if error:
+            summary["errors"].append({"url": url, "error": error})
+        else:
+            content_hash = hashlib.sha256(content).hexdigest()
+            if content_hash != image_hash or not image:
+                image_name = os.path.basename(data["image"]).replace(" ", "_")
+                image = ContentFile(content, name=image_name)
+                image_hash = content_hash
+                changed = True
+
+        if current is None:
+            summary["created"] += 1
+        elif changed:
+            summary["updated"] += 1
+        else:
+            summary["unchanged"] += 1
+
+        teachers.append(
+            Teacher(
+                name=data["name"],
+                profession=data["profession"],
+                about="",
+                qualifications="M.Tech",
+                experience=0,
+                branch=branch,
+                projects="",
+                image=image,
+                image_hash=image_hash,
+                path=data["profileLink"],
+            )
+        )
+
+    with transaction.atomic():
+        Teacher.objects.bulk_create(
+            teachers,
+            update_conflicts=True,
+            unique_fields=["name", "branch"],
+            update_fields=["profession", "path", "image", "image_hash"],
+        )
+    # bulk_create does not send post_save, so do its follow-up work here
+    bump_directory_version(Teacher)
+    for teacher in Teacher.objects.only("id", "image", "image_variants"):
+        if needs_variants(teacher):
+            schedule_image_variants(teacher)
+
+    return summary
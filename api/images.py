@@ -0,0 +1,148 @@
+"""
+Thumbnail derivatives for teacher and research portraits.
+
+Each source image is scaled down to fit a few fixed boxes in WebP and JPEG
+and stored under a name derived from the source's SHA-256. Sizes are keyed
+by the width actually produced; images are never upscaled, so a small
+source yields fewer, narrower derivatives. Identical images share
+derivatives, and regenerating them is a no-op. The generated names are
+recorded on the model in ``image_variants``, and derivatives no row refers
+to any more are deleted.
+"""
+
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from . import jobs
+from .caching import bump_directory_version
+from .models import Research, Teacher
+
+THUMBNAIL_SIZES = (96, 256, 512)
+# Bumped when the layout of ``image_variants`` changes, so rows get rebuilt
+VARIANTS_VERSION = 2
+
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def build_derivatives(field_file, storage=default_storage):
+    """Write every size/format derivative of ``field_file`` and describe them."""
+    with field_file.open("rb") as source:
+        data = source.read()
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert("RGB")
+
+    sizes = {}
+    for size in THUMBNAIL_SIZES:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.LANCZOS)
+        width = str(thumbnail.width)
+        if width in sizes:
+            # The source is smaller than this box; thumbnail() never upscales
+            continue
+        sizes[width] = {}
+        for extension, (pil_format, options) in DERIVATIVE_FORMATS.items():
+            name = f"derivatives/{content_hash[:2]}/{content_hash}/{width}.{extension}"
+            if not storage.exists(name):
+                buffer = io.BytesIO()
+                thumbnail.save(buffer, format=pil_format, **options)
+                name = storage.save(name, ContentFile(buffer.getvalue()))
+            sizes[width][extension] = name
+
+    return {
+        "version": VARIANTS_VERSION,
+        "source": field_file.name,
+        "hash": content_hash,
+        "sizes": sizes,
+    }
+
+
+def derivative_names(variants):
+    return {
+        name
+        for formats in ((variants or {}).get("sizes") or {}).values()
+        for name in formats.values()
+    }
+
+
+def delete_unused_derivatives(old_variants, new_variants, storage=default_storage):
+    """Delete the files of ``old_variants`` that no row refers to any more."""
+    stale = derivative_names(old_variants) - derivative_names(new_variants)
+    if not stale:
+        return 0
+    # Names embed the source hash, so only rows with that hash can share them
+    content_hash = old_variants["hash"]
+    for model in (Teacher, Research):
+        for variants in model.objects.filter(image_variants__hash=content_hash).values_list(
+            "image_variants", flat=True
+        ):
+            stale -= derivative_names(variants)
+    for name in stale:
+        storage.delete(name)
+    return len(stale)
+
+
+def needs_variants(instance):
+    variants = instance.image_variants or {}
+    if not instance.image:
+        return bool(variants)
+    return (
+        variants.get("source") != instance.image.name
+        or variants.get("version") != VARIANTS_VERSION
+    )
+
+
+def generate_image_variants(model, pk, progress=None):
+    """Build (or clear) the derivatives for one row and store their names."""
+    instance = model.objects.filter(pk=pk).only("id", "image", "image_variants").first()
+    if instance is None or not needs_variants(instance):
+        return None
+
+    variants = build_derivatives(instance.image) if instance.image else {}
+    # update() keeps this from re-triggering post_save
+    model.objects.filter(pk=pk).update(image_variants=variants)
+    delete_unused_derivatives(instance.image_variants, variants)
+    bump_directory_version(model)
+    return variants
+
+
+def schedule_image_variants(instance):
+    """Queue derivative generation once the current transaction commits."""
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(
+        lambda: jobs.submit(
+            f"image_variants:{model._meta.label_lower}:{pk}",
+            generate_image_variants,
+            model,
+            pk,
+        )
+    )
+
+
+def srcset(variants, url):
+    """Return ``srcset`` strings per format plus per-size URLs.
+
+    ``url`` turns a storage name into a public URL.
+    """
+    sizes = (variants or {}).get("sizes") or {}
+    if not sizes:
+        return None
+    widths = sorted(sizes, key=int)
+    return {
+        "srcset": {
+            extension: ", ".join(f"{url(sizes[w][extension])} {w}w" for w in widths)
+            for extension in DERIVATIVE_FORMATS
+        },
+        "sizes": {
+            w: {extension: url(name) for extension, name in sizes[w].items()}
+            for w in widths
+        },
+    }
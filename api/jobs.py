@@ -0,0 +1,97 @@
+"""
+Minimal in-process background jobs.
+
+Work is run on a small shared thread pool and its progress is kept in
+memory, so no external broker is needed. Job state does not survive a
+restart.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_JOBS = 100
+
+executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-jobs")
+
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+class Job:
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "pending"
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+
+    def report(self, done, total):
+        self.done = done
+        self.total = total
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def submit(name, func, *args, **kwargs):
+    """Run ``func(*args, progress=job.report, **kwargs)`` in the background."""
+    job = Job(name)
+    with _lock:
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+
+    def run():
+        job.status = "running"
+        try:
+            job.result = func(*args, progress=job.report, **kwargs)
+            job.status = "finished"
+        except Exception as exc:
+            logger.exception("Background job %s failed", name)
+            job.error = str(exc)
+            job.status = "failed"
+        finally:
+            close_old_connections()
+
+    executor.submit(run)
+    return job
+
+
+def defer(name, func, *args):
+    """
+    Run ``func(*args)`` on the pool without tracking it here.
+
+    For work that records its own state, such as a PublishJob row.
+    """
+
+    def run():
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Background job %s failed", name)
+        finally:
+            close_old_connections()
+
+    return executor.submit(run)
+
+
+def get_job(job_id):
+    with _lock:
+        return _jobs.get(job_id)
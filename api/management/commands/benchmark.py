@@ -0,0 +1,122 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import BENCHMARKS, test_database
+
+# Metrics checked against a saved baseline; lower is better for all of them
+REGRESSION_METRICS = ("queries", "p50_ms", "p95_ms", "ms")
+# Timing differences below this many milliseconds are treated as noise
+MIN_MS_DELTA = 5.0
+
+
+def row_key(row):
+    """Identify a row by its non-numeric fields (endpoint, mode, ...)."""
+    return tuple(
+        (key, value)
+        for key, value in sorted(row.items())
+        if key not in REGRESSION_METRICS and not isinstance(value, float)
+    )
+
+
+def load_baseline(path):
+    try:
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+    except (OSError, ValueError) as exc:
+        raise CommandError(f"Cannot read baseline {path}: {exc}")
+    if not isinstance(baseline, dict):
+        raise CommandError(f"Baseline {path} is not a benchmark report.")
+    return baseline
+
+
+def find_regressions(baseline, report, threshold):
+    regressions = []
+    for name, rows in report.items():
+        baseline_rows = {row_key(row): row for row in baseline.get(name, [])}
+        for row in rows:
+            previous = baseline_rows.get(row_key(row))
+            if previous is None:
+                continue
+            for metric in REGRESSION_METRICS:
+                if metric not in row or metric not in previous:
+                    continue
+                before, after = previous[metric], row[metric]
+                if after <= before * (1 + threshold):
+                    continue
+                if metric.endswith("ms") and after - before < MIN_MS_DELTA:
+                    continue
+                regressions.append(
+                    f"{name} {dict(row_key(row))}: {metric} {before:.2f} -> {after:.2f}"
+                )
+    return regressions
+
+
+class Command(BaseCommand):
+    help = "Run API benchmarks against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Benchmarks to run (default: all). Available: "
+            + ", ".join(sorted(BENCHMARKS)),
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the results as JSON."
+        )
+        parser.add_argument(
+            "--save", metavar="FILE", help="Write the results to FILE as a baseline."
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="FILE",
+            help="Fail if any metric regressed against the baseline in FILE.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed relative regression for --compare (default: 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or sorted(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+        # Read the baseline first, so a bad path fails before the benchmarks run
+        baseline = load_baseline(options["compare"]) if options["compare"] else None
+
+        report = {}
+        with test_database():
+            for name in names:
+                report[name] = BENCHMARKS[name]()
+
+        if options["save"]:
+            with open(options["save"], "w") as baseline_file:
+                json.dump(report, baseline_file, indent=2, sort_keys=True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for name, rows in report.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                for row in rows:
+                    self.stdout.write(
+                        "  "
+                        + "  ".join(
+                            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                            for key, value in row.items()
+                        )
+                    )
+
+        if baseline is not None:
+            regressions = find_regressions(baseline, report, options["threshold"])
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} regression(s) against the baseline:\n"
+                    + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
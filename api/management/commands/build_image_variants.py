@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.images import generate_image_variants, needs_variants
+from api.models import Research, Teacher
+
+
+class Command(BaseCommand):
+    help = "Build missing thumbnail derivatives for teacher and research images."
+
+    def handle(self, *args, **options):
+        for model in (Teacher, Research):
+            built = 0
+            for instance in model.objects.only("id", "image", "image_variants"):
+                if needs_variants(instance):
+                    generate_image_variants(model, instance.pk)
+                    built += 1
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {built} updated")
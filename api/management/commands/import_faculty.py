@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.faculty import FACULTY_BASE_URL, import_faculty
+
+
+class Command(BaseCommand):
+    help = "Import the faculty directory and images from the college website."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default=FACULTY_BASE_URL)
+        parser.add_argument(
+            "--workers", type=int, default=8, help="Concurrent image downloads."
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=10, help="Per-request timeout in seconds."
+        )
+        parser.add_argument(
+            "--retries", type=int, default=3, help="Retries per image on failure."
+        )
+
+    def handle(self, *args, **options):
+        def progress(done, total):
+            self.stdout.write(f"\rDownloaded {done}/{total}", ending="")
+            self.stdout.flush()
+
+        summary = import_faculty(
+            base_url=options["base_url"],
+            workers=options["workers"],
+            timeout=options["timeout"],
+            retries=options["retries"],
+            progress=progress,
+        )
+        self.stdout.write("")
+        self.stdout.write(json.dumps(summary, indent=2))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from api.models import PublishJob
+from api.publishing import run_publish_job
+
+
+class Command(BaseCommand):
+    help = "Publish queued exam result sheets, e.g. those left pending by a restart."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requeue-running",
+            action="store_true",
+            help="Also rerun jobs stuck as running, whose worker is gone.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_running"]:
+            # Publishing is diff-based, so rerunning the already written chunks is cheap
+            PublishJob.objects.filter(status=PublishJob.Status.RUNNING).update(
+                status=PublishJob.Status.PENDING,
+                started_at=None,
+                done=0,
+                changed=0,
+                unchanged=0,
+                errors=[],
+            )
+
+        pending = PublishJob.objects.filter(status=PublishJob.Status.PENDING)
+        processed = 0
+        for job_id in pending.order_by("id").values_list("id", flat=True):
+            try:
+                job = run_publish_job(job_id)
+            except Exception as exc:
+                self.stderr.write(f"Publish job {job_id} failed: {exc}")
+                continue
+            if job is not None:
+                processed += 1
+        self.stdout.write(f"Processed {processed} publish jobs")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.ranks import rebuild_ranks
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized exam and class rank tables."
+
+    def handle(self, *args, **options):
+        classes = rebuild_ranks()
+        self.stdout.write(f"Ranks rebuilt for {classes} classes")
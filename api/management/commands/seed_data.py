@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.seed import SEED_PASSWORD, seed_college
+
+
+class Command(BaseCommand):
+    help = "Seed the database with synthetic college data for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplier for the default volumes (3000 students, 100 classes, ...).",
+        )
+        parser.add_argument(
+            "--prefix", default="seed", help="Username prefix, to seed more than once."
+        )
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        sample = seed_college(
+            students=max(1, int(3000 * scale)),
+            teachers=max(2, int(150 * scale)),
+            classes=max(1, int(100 * scale)),
+            companies=max(1, int(60 * scale)),
+            prefix=options["prefix"],
+        )
+        self.stdout.write(json.dumps(sample["counts"], indent=2))
+        self.stdout.write(f"All seeded accounts use the password '{SEED_PASSWORD}'.")
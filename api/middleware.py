@@ -0,0 +1,239 @@
+"""
+Per-request SQL and latency instrumentation.
+
+Enable with ``QUERY_METRICS_ENABLED = True``. Every non-streamed response
+then carries a ``Server-Timing`` header, and rolling per-route statistics
+are kept in memory for the admin-only ``metrics/queries/`` endpoint.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Samples and duplicated SQL fingerprints kept per route, and histogram
+# bucket upper bounds
+QUERY_METRICS_SAMPLES = 500
+QUERY_METRICS_DUPLICATES = 50
+WALL_MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def stats(values):
+    return {
+        "p50": round(percentile(values, 0.5), 2),
+        "p95": round(percentile(values, 0.95), 2),
+        "max": round(max(values, default=0), 2),
+    }
+
+
+def histogram(values, buckets):
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        counts[bisect_left(buckets, value)] += 1
+    labels = [f"<={bound}" for bound in buckets] + [f">{buckets[-1]}"]
+    return dict(zip(labels, counts))
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.samples = deque(maxlen=QUERY_METRICS_SAMPLES)
+        # Worst repeat count seen for each duplicated SQL fingerprint
+        self.duplicates = Counter()
+
+    def record(self, wall_ms, queries, sql_ms, duplicates):
+        self.requests += 1
+        self.samples.append((wall_ms, queries, sql_ms))
+        for fingerprint, count in duplicates.items():
+            if count > self.duplicates[fingerprint]:
+                self.duplicates[fingerprint] = count
+        if len(self.duplicates) > QUERY_METRICS_DUPLICATES:
+            # Keep the worst offenders so ad-hoc SQL cannot grow this forever
+            self.duplicates = Counter(
+                dict(self.duplicates.most_common(QUERY_METRICS_DUPLICATES))
+            )
+
+    def summary(self):
+        samples = list(self.samples)
+        wall = [sample[0] for sample in samples]
+        queries = [sample[1] for sample in samples]
+        sql = [sample[2] for sample in samples]
+        return {
+            "requests": self.requests,
+            "wall_ms": stats(wall),
+            "queries": stats(queries),
+            "sql_ms": stats(sql),
+            "wall_ms_histogram": histogram(wall, WALL_MS_BUCKETS),
+            "queries_histogram": histogram(queries, QUERY_COUNT_BUCKETS),
+            "duplicate_queries": [
+                {"sql": sql, "max_repeats": count}
+                for sql, count in self.duplicates.most_common(5)
+            ],
+        }
+
+
+_routes = {}
+_lock = threading.Lock()
+
+
+def record_request(route, wall_ms, queries, sql_ms, duplicates):
+    with _lock:
+        metrics = _routes.setdefault(route, RouteMetrics())
+        metrics.record(wall_ms, queries, sql_ms, duplicates)
+
+
+def route_summaries():
+    with _lock:
+        return {route: metrics.summary() for route, metrics in sorted(_routes.items())}
+
+
+def reset_metrics():
+    with _lock:
+        _routes.clear()
+
+
+class QueryRecorder:
+    """Counts, times and fingerprints the queries of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.count = 0
+        self.sql_ms = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.count += 1
+            # Parameters are passed separately, so the SQL text is the fingerprint
+            self.fingerprints[sql] += 1
+
+
+# The recorder of the request being served. A context variable rather than a
+# per-request execute_wrapper, because database connections are per thread
+# and async views query from a worker thread that sync_to_async copies the
+# context into.
+_current_recorder = contextvars.ContextVar("query_metrics_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` that reports to the current request's recorder, if any."""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder():
+    """Route the queries of this thread's connections through ``record_query``."""
+    for connection in connections.all():
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+
+class QueryMetricsMiddleware:
+    """
+    Record SQL and latency per route, for sync and async requests alike.
+
+    Streamed responses run their queries as the body is consumed, so they
+    are recorded once the last chunk has been sent, and get no
+    ``Server-Timing`` header as its totals are not known up front.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        install_query_recorder()
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        # Sync views and the async ORM share this request's thread-sensitive
+        # worker thread; its connections need the wrapper too
+        await sync_to_async(install_query_recorder)()
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder)
+
+    def finish(self, request, response, recorder):
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.arecorded_stream(
+                    request, response.streaming_content, recorder
+                )
+            else:
+                response.streaming_content = self.recorded_stream(
+                    request, response.streaming_content, recorder
+                )
+            return response
+
+        wall_ms = self.record(request, recorder)
+        response["Server-Timing"] = (
+            f"total;dur={wall_ms:.1f}, "
+            f'db;dur={recorder.sql_ms:.1f};desc="{recorder.count} queries"'
+        )
+        return response
+
+    # The body may be closed from another context than it ran in, so these
+    # clear the recorder rather than resetting a token
+    def recorded_stream(self, request, content, recorder):
+        install_query_recorder()
+        _current_recorder.set(recorder)
+        try:
+            yield from content
+        finally:
+            _current_recorder.set(None)
+            self.record(request, recorder)
+
+    async def arecorded_stream(self, request, content, recorder):
+        _current_recorder.set(recorder)
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            _current_recorder.set(None)
+            self.record(request, recorder)
+
+    def record(self, request, recorder):
+        wall_ms = (time.perf_counter() - recorder.start) * 1000
+        match = request.resolver_match
+        route = f"{request.method} /{match.route}" if match else f"{request.method} <unresolved>"
+        duplicates = {sql: n for sql, n in recorder.fingerprints.items() if n > 1}
+        record_request(route, wall_ms, recorder.count, recorder.sql_ms, duplicates)
+        return wall_ms
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_alter_subject_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentExamResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marks', models.FloatField(blank=True, null=True)),
+                ('grade', models.CharField(blank=True, max_length=10, null=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_results', to='api.exam')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'exam'], name='student_result_student_idx'), models.Index(fields=['exam', '-marks'], name='student_result_marks_idx')],
+                'constraints': [models.UniqueConstraint(fields=('exam', 'student'), name='unique_student_exam_result')],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:05
+
+from django.db import migrations
+
+
+def backfill_student_results(apps, schema_editor):
+    ExamResult = apps.get_model("api", "ExamResult")
+    StudentExamResult = apps.get_model("api", "StudentExamResult")
+    User = apps.get_model("auth", "User")
+
+    for exam_result in ExamResult.objects.iterator(chunk_size=100):
+        results = exam_result.results or {}
+        student_ids = set()
+        for key in results:
+            try:
+                student_ids.add(int(key))
+            except (TypeError, ValueError):
+                continue
+        existing = set(
+            User.objects.filter(id__in=student_ids).values_list("id", flat=True)
+        )
+
+        rows = []
+        for key, entry in results.items():
+            try:
+                student_id = int(key)
+            except (TypeError, ValueError):
+                continue
+            if student_id not in existing or not isinstance(entry, dict):
+                continue
+            try:
+                marks = float(entry.get("marks"))
+            except (TypeError, ValueError):
+                marks = None
+            rows.append(
+                StudentExamResult(
+                    exam_id=exam_result.Exam_id,
+                    student_id=student_id,
+                    marks=marks,
+                    grade=entry.get("grade"),
+                )
+            )
+        StudentExamResult.objects.bulk_create(
+            rows, ignore_conflicts=True, batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_studentexamresult'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_student_results, migrations.RunPython.noop),
+    ]
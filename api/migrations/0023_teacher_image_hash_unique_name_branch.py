@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:08
+
+from django.db import migrations, models
+
+
+def remove_duplicate_teachers(apps, schema_editor):
+    # Earlier imports created a new row per call; keep the oldest of each
+    Teacher = apps.get_model("api", "Teacher")
+    duplicates = (
+        Teacher.objects.values("name", "branch")
+        .annotate(keep_id=models.Min("id"), count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        Teacher.objects.filter(
+            name=duplicate["name"], branch=duplicate["branch"]
+        ).exclude(id=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_backfill_studentexamresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacher',
+            name='image_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(remove_duplicate_teachers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='teacher',
+            constraint=models.UniqueConstraint(fields=('name', 'branch'), name='unique_teacher_name_branch'),
+        ),
+    ]
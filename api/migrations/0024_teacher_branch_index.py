@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_teacher_image_hash_unique_name_branch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='teacher',
+            name='branch',
+            field=models.CharField(db_index=True, default='General', max_length=255, verbose_name='Branch Name'),
+        ),
+    ]
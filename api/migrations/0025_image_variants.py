@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_teacher_branch_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='research',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Cast
+
+
+def remove_duplicate_rows(apps, schema_editor):
+    """Drop duplicates that would violate the new unique constraints."""
+    ClassTeaching = apps.get_model("api", "ClassTeaching")
+    PlacementApplication = apps.get_model("api", "PlacementApplication")
+    PlacementProfile = apps.get_model("api", "PlacementProfile")
+
+    # Keep one membership per user and class, preferring the teacher row
+    duplicates = (
+        ClassTeaching.objects.values("user_id", "class_taught_id")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        rows = ClassTeaching.objects.filter(
+            user_id=duplicate["user_id"], class_taught_id=duplicate["class_taught_id"]
+        )
+        keep = rows.filter(role="Teacher").order_by("id").first() or rows.order_by("id").first()
+        rows.exclude(id=keep.id).delete()
+
+    # Keep the first application per user and company
+    duplicates = (
+        PlacementApplication.objects.values("user_id", "company_id")
+        .annotate(keep_id=models.Min("id"), count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        PlacementApplication.objects.filter(
+            user_id=duplicate["user_id"], company_id=duplicate["company_id"]
+        ).exclude(id=duplicate["keep_id"]).delete()
+
+    # Keep the first profile per user, carrying over the coordinator flag
+    duplicates = (
+        PlacementProfile.objects.values("user_id")
+        .annotate(
+            keep_id=models.Min("id"),
+            count=models.Count("id"),
+            coordinator=models.Max(Cast("is_placement_coordinator", models.IntegerField())),
+        )
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        PlacementProfile.objects.filter(id=duplicate["keep_id"]).update(
+            is_placement_coordinator=bool(duplicate["coordinator"])
+        )
+        PlacementProfile.objects.filter(user_id=duplicate["user_id"]).exclude(
+            id=duplicate["keep_id"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # SQLite rebuilds auth_user in later auth migrations, dropping any
+        # index Django does not know about, so add ours after all of them
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_rows, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='placementprofile',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='classteaching',
+            index=models.Index(fields=['class_taught', 'role'], name='class_member_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['class_assigned', 'subject'], name='exam_class_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placementapplication',
+            index=models.Index(fields=['company', 'id'], name='application_company_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='classteaching',
+            constraint=models.UniqueConstraint(fields=('user', 'class_taught'), name='unique_class_membership'),
+        ),
+        migrations.AddConstraint(
+            model_name='placementapplication',
+            constraint=models.UniqueConstraint(fields=('user', 'company'), name='unique_placement_application'),
+        ),
+        # auth.User is not ours to add Meta indexes to; EmailBackend looks it up by email
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS "api_auth_user_email_idx" ON "auth_user" ("email")',
+            'DROP INDEX IF EXISTS "api_auth_user_email_idx"',
+        ),
+    ]
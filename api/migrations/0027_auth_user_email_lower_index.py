@@ -0,0 +1,16 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_lookup_indexes_and_constraints'),
+    ]
+
+    operations = [
+        # EmailBackend matches on LOWER(email) so logins are case-insensitive
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS "api_auth_user_email_lower_idx" ON "auth_user" (LOWER("email"))',
+            'DROP INDEX IF EXISTS "api_auth_user_email_lower_idx"',
+        ),
+    ]
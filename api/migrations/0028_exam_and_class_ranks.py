@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_auth_user_email_lower_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_marks', models.FloatField()),
+                ('exams_counted', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('percentile', models.FloatField()),
+                ('class_assigned', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_ranks', to='api.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_ranks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['class_assigned', 'rank'], name='class_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('class_assigned', 'student'), name='unique_class_rank')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marks', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('percentile', models.FloatField()),
+                ('class_assigned', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_ranks', to='api.class')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='api.exam')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_ranks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['exam', 'rank'], name='exam_rank_idx'), models.Index(fields=['class_assigned', 'student'], name='exam_rank_class_idx')],
+                'constraints': [models.UniqueConstraint(fields=('exam', 'student'), name='unique_exam_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.1.7 on 2026-10-18 11:34
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def ranked(rows):
+    # Same "1224" ranking and percentile as api.ranks.competition_ranks
+    total = len(rows)
+    start = 0
+    while start < total:
+        end = start
+        while end < total and rows[end][1] == rows[start][1]:
+            end += 1
+        percentile = 100 * (total - end + (end - start) / 2) / total
+        for student_id, score in rows[start:end]:
+            yield student_id, score, start + 1, percentile
+        start = end
+
+
+def backfill_ranks(apps, schema_editor):
+    Exam = apps.get_model("api", "Exam")
+    StudentExamResult = apps.get_model("api", "StudentExamResult")
+    ExamRank = apps.get_model("api", "ExamRank")
+    ClassRank = apps.get_model("api", "ClassRank")
+
+    for exam_id, class_id in Exam.objects.values_list("id", "class_assigned_id").iterator():
+        rows = list(
+            StudentExamResult.objects.filter(exam_id=exam_id, marks__isnull=False)
+            .order_by("-marks", "student_id")
+            .values_list("student_id", "marks")
+        )
+        ExamRank.objects.bulk_create(
+            [
+                ExamRank(
+                    class_assigned_id=class_id,
+                    exam_id=exam_id,
+                    student_id=student_id,
+                    marks=marks,
+                    rank=rank,
+                    percentile=percentile,
+                )
+                for student_id, marks, rank, percentile in ranked(rows)
+            ],
+            batch_size=1000,
+        )
+
+    class_ids = ExamRank.objects.values_list("class_assigned_id", flat=True).distinct()
+    for class_id in list(class_ids):
+        totals = list(
+            ExamRank.objects.filter(class_assigned_id=class_id)
+            .values("student_id")
+            .annotate(total=Sum("marks"), exams=Count("id"))
+            .order_by("-total", "student_id")
+            .values_list("student_id", "total", "exams")
+        )
+        exams = {student_id: count for student_id, _, count in totals}
+        ClassRank.objects.bulk_create(
+            [
+                ClassRank(
+                    class_assigned_id=class_id,
+                    student_id=student_id,
+                    total_marks=total,
+                    exams_counted=exams[student_id],
+                    rank=rank,
+                    percentile=percentile,
+                )
+                for student_id, total, rank, percentile in ranked(
+                    [(student_id, total) for student_id, total, _ in totals]
+                )
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_exam_and_class_ranks'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ranks, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+import json
+
+from django.db import connections, models, transaction
 from django.contrib.auth.models import User
 
 
@@ -9,12 +11,23 @@ class Teacher(models.Model):
     qualifications = models.TextField(verbose_name="Qualifications")
     experience = models.PositiveIntegerField(verbose_name="Years of Experience")
     branch = models.CharField(
-        max_length=255, default="General", verbose_name="Branch Name"
+        max_length=255, default="General", verbose_name="Branch Name", db_index=True
     )
     projects = models.TextField(verbose_name="Projects", blank=True)
     image = models.ImageField(upload_to="teachers_images/", blank=True, null=True)
+    # SHA-256 of the stored image, used to skip unchanged images on re-import
+    image_hash = models.CharField(max_length=64, blank=True, default="")
+    # Thumbnail derivatives built by api.images
+    image_variants = models.JSONField(blank=True, default=dict)
     path = models.CharField(max_length=255, verbose_name="Path", default="\home")
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name", "branch"], name="unique_teacher_name_branch"
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -31,6 +44,8 @@ class Research(models.Model):
         null=True,
         verbose_name="Profile Image",
     )
+    # Thumbnail derivatives built by api.images
+    image_variants = models.JSONField(blank=True, default=dict)
     publications = models.TextField(verbose_name="Publications", blank=True)
 
     def __str__(self):
@@ -70,6 +85,16 @@ class ClassTeaching(models.Model):
         max_length=10, choices=UserRole.choices, default=UserRole.TEACHER
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "class_taught"], name="unique_class_membership"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["class_taught", "role"], name="class_member_role_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} teaching {self.class_taught.name} as {self.role}"
 
@@ -108,10 +133,54 @@ class Exam(models.Model):
         verbose_name="Subject",
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["class_assigned", "subject"], name="exam_class_subject_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.subject.name})"
 
 
+class JSONObjectKey(models.Func):
+    """
+    ``field -> key`` that always reads ``key`` as an object key.
+
+    ``KeyTransform`` (``results__12``) treats digit-only keys such as student
+    ids as array indexes, so it never matches the ``results`` blob.
+    """
+
+    output_field = models.JSONField()
+
+    def __init__(self, expression, key):
+        super().__init__(expression)
+        self.key = str(key)
+
+    def as_sql(self, compiler, connection):
+        # SQLite and MySQL
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"JSON_EXTRACT({sql}, %s)", (*params, "$." + json.dumps(self.key))
+
+    def as_postgresql(self, compiler, connection):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"({sql} -> %s::text)", (*params, self.key)
+
+
+class ExamResultQuerySet(models.QuerySet):
+    def student_entry(self, student_id):
+        """Return one student's entry from ``results`` without reading the whole blob."""
+        connection = connections[self.db]
+        if connection.vendor in ("postgresql", "sqlite", "mysql"):
+            return self.values_list(
+                JSONObjectKey("results", student_id), flat=True
+            ).first()
+        # No JSON path support: load the blob and pick the entry in Python
+        results = self.values_list("results", flat=True).first()
+        return (results or {}).get(str(student_id))
+
+
 class ExamResult(models.Model):
     # Linking the exam result to a specific subject
     Exam = models.ForeignKey(
@@ -121,22 +190,203 @@ class ExamResult(models.Model):
     # Store the results as a JSON field
     results = models.JSONField(blank=True, null=True, default=dict)
 
+    objects = ExamResultQuerySet.as_manager()
+
     def add_student_result(self, student, marks, grade=None):
         """Helper method to add a student result in JSON format."""
+        self.add_student_results([(student, marks, grade)])
+
+    def add_student_results(self, entries):
+        """Merge several ``(student, marks, grade)`` entries and save once."""
+        entries = list(entries)
         if self.results is None:
             self.results = {}
 
-        self.results[str(student.id)] = {
-            "student_id": student.id,
-            "student_name": student.username,  # or any other attribute you want to store
-            "marks": marks,
-            "grade": grade,
+        for student, marks, grade in entries:
+            self.results[str(student.id)] = {
+                "student_id": student.id,
+                "student_name": student.username,  # or any other attribute you want to store
+                "marks": marks,
+                "grade": grade,
+            }
+
+        # Blob and normalized rows commit together, so readers never see one
+        # without the other
+        with transaction.atomic():
+            self.save()
+
+            # Keep the normalized per-student rows in step with the blob
+            StudentExamResult.objects.bulk_create(
+                [
+                    StudentExamResult(
+                        exam_id=self.Exam_id, student=student, marks=marks, grade=grade
+                    )
+                    for student, marks, grade in entries
+                ],
+                update_conflicts=True,
+                unique_fields=["exam", "student"],
+                update_fields=["marks", "grade"],
+                batch_size=500,
+            )
+
+
+class StudentExamResult(models.Model):
+    """One student's result for one exam, normalized out of ``ExamResult.results``."""
+
+    exam = models.ForeignKey(
+        Exam, on_delete=models.CASCADE, related_name="student_results"
+    )
+    student = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="exam_results"
+    )
+    marks = models.FloatField(null=True, blank=True)
+    grade = models.CharField(max_length=10, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["exam", "student"], name="unique_student_exam_result"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["student", "exam"], name="student_result_student_idx"),
+            models.Index(fields=["exam", "-marks"], name="student_result_marks_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} in exam {self.exam_id}: {self.marks}"
+
+
+class ResultChangeLog(models.Model):
+    """What one publish changed: ``{student_id: {field: [old, new]}}``."""
+
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name="change_logs")
+    changed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    changed_rows = models.PositiveIntegerField()
+    changes = models.JSONField(default=dict)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["exam", "created_at"], name="result_change_exam_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.changed_rows} change(s) to exam {self.exam_id}"
+
+
+class PublishJob(models.Model):
+    """A result sheet accepted for background publishing, see ``api.publishing``."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        FINISHED = "finished"
+        FAILED = "failed"
+
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name="publish_jobs")
+    submitted_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    # The posted "results" list, kept until the job has run
+    payload = models.JSONField(default=list)
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="publish_job_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"Publish job {self.pk} for exam {self.exam_id}: {self.status}"
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "exam": self.exam_id,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+            "error": self.error or None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
         }
-        self.save()
+
+
+class ExamRank(models.Model):
+    """A student's materialized rank within one exam, rebuilt by ``api.ranks``."""
+
+    class_assigned = models.ForeignKey(
+        Class, on_delete=models.CASCADE, related_name="exam_ranks"
+    )
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name="ranks")
+    student = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="exam_ranks"
+    )
+    marks = models.FloatField()
+    rank = models.PositiveIntegerField()
+    percentile = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["exam", "student"], name="unique_exam_rank"),
+        ]
+        indexes = [
+            models.Index(fields=["exam", "rank"], name="exam_rank_idx"),
+            models.Index(fields=["class_assigned", "student"], name="exam_rank_class_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} ranked {self.rank} in exam {self.exam_id}"
+
+
+class ClassRank(models.Model):
+    """A student's materialized rank by total marks across a class's exams."""
+
+    class_assigned = models.ForeignKey(
+        Class, on_delete=models.CASCADE, related_name="class_ranks"
+    )
+    student = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="class_ranks"
+    )
+    total_marks = models.FloatField()
+    exams_counted = models.PositiveIntegerField()
+    rank = models.PositiveIntegerField()
+    percentile = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["class_assigned", "student"], name="unique_class_rank"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["class_assigned", "rank"], name="class_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} ranked {self.rank} in class {self.class_assigned_id}"
 
 
 class PlacementProfile(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
     cgpa = models.FloatField(
         null=False,
         blank=False
@@ -149,6 +399,28 @@ class PlacementProfile(models.Model):
         return f"Placement profile for {self.user.username}"
 
 
+class PlacementCompanyQuerySet(models.QuerySet):
+    def with_student_flags(self, user, profile):
+        """Annotate ``is_eligible`` and ``applied`` for one student in SQL."""
+        return self.annotate(
+            is_eligible=models.Case(
+                models.When(
+                    min_cgpa__lte=profile.cgpa,
+                    min_10th__lte=profile.percentage_10th,
+                    min_12th__lte=profile.percentage_12th,
+                    then=models.Value(True),
+                ),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            ),
+            applied=models.Exists(
+                PlacementApplication.objects.filter(
+                    user=user, company=models.OuterRef("pk")
+                )
+            ),
+        )
+
+
 class PlacementCompany(models.Model):
     name = models.CharField(max_length=200)
     job_description = models.TextField()
@@ -158,8 +430,21 @@ class PlacementCompany(models.Model):
     max_backlogs = models.IntegerField()
     package = models.IntegerField()
 
+    objects = PlacementCompanyQuerySet.as_manager()
+
 
 class PlacementApplication(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     company = models.ForeignKey(PlacementCompany, on_delete=models.CASCADE)
     other_details = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "company"], name="unique_placement_application"
+            ),
+        ]
+        indexes = [
+            # Cursor pagination walks a company's applications by id
+            models.Index(fields=["company", "id"], name="application_company_id_idx"),
+        ]
@@ -0,0 +1,51 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination that async views can await, see ``api.async_views``."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Django's Paginator would count and slice synchronously
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            )
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+
+class ApplicationCursorPagination(CursorPagination):
+    # Keyset pagination on the primary key so deep pages stay cheap
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = "id"
+
+
+class ExamPageNumberPagination(AsyncPageNumberPagination):
+    # Subjects hold a handful of exams, so numbered pages with a total are fine
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class RankPagination(PageNumberPagination):
+    # Merit lists are read from the top, e.g. ?page_size=20 for the top 20
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from rest_framework.permissions import BasePermission
+
+from .models import ClassTeaching, UserRole
+
+# Invalidation is signal driven; the timeout only bounds a missed one
+CLASS_ROLES_TIMEOUT = 60 * 5
+
+
+def class_roles_key(user_id):
+    return f"class_roles:{user_id}"
+
+
+def class_roles(request):
+    """Return the requesting user's ``{class_id: role}`` map.
+
+    The map is loaded with one query, cached per user across requests and
+    memoized on the request, so repeated role checks are dictionary lookups.
+    ``api.signals`` drops the cached map once a ClassTeaching change commits.
+    """
+    roles = getattr(request, "_class_roles", None)
+    if roles is None:
+        key = class_roles_key(request.user.id)
+        roles = cache.get(key)
+        if roles is None:
+            roles = {}
+            memberships = ClassTeaching.objects.filter(user_id=request.user.id)
+            for class_id, role in memberships.values_list("class_taught_id", "role"):
+                # A teacher row wins over a stray student row for the same class
+                if roles.get(class_id) != UserRole.TEACHER:
+                    roles[class_id] = role
+            cache.set(key, roles, CLASS_ROLES_TIMEOUT)
+        request._class_roles = roles
+    return roles
+
+
+async def aclass_roles(request):
+    """Async ``class_roles`` for async views; shares its cache entries."""
+    roles = getattr(request, "_class_roles", None)
+    if roles is None:
+        key = class_roles_key(request.user.id)
+        roles = await cache.aget(key)
+        if roles is None:
+            roles = {}
+            memberships = ClassTeaching.objects.filter(user_id=request.user.id)
+            async for class_id, role in memberships.values_list("class_taught_id", "role"):
+                if roles.get(class_id) != UserRole.TEACHER:
+                    roles[class_id] = role
+            await cache.aset(key, roles, CLASS_ROLES_TIMEOUT)
+        request._class_roles = roles
+    return roles
+
+
+def class_role(request, class_id):
+    """Return the user's role in ``class_id``, or ``None`` if not a member."""
+    return class_roles(request).get(int(class_id))
+
+
+async def aclass_role(request, class_id):
+    return (await aclass_roles(request)).get(int(class_id))
+
+
+def invalidate_class_roles(*user_ids):
+    cache.delete_many([class_roles_key(user_id) for user_id in user_ids])
+
+
+class ClassRolePermission(BasePermission):
+    """Allow members of the class named by the ``class_id`` URL kwarg.
+
+    Views can set ``class_permission_message`` to customise the 403 body.
+    """
+
+    role = None
+    class_kwarg = "class_id"
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+
+        role = class_role(request, view.kwargs[self.class_kwarg])
+        allowed = role is not None if self.role is None else role == self.role
+        if not allowed and getattr(view, "class_permission_message", None):
+            self.message = {"error": view.class_permission_message}
+        return allowed
+
+
+class IsClassMember(ClassRolePermission):
+    pass
+
+
+class IsClassTeacher(ClassRolePermission):
+    role = UserRole.TEACHER
@@ -0,0 +1,229 @@
+"""
+Diff-based publishing of exam result sheets.
+
+A posted sheet is compared with the stored per-student rows and only the
+entries whose marks or grade differ are written, together with a
+ResultChangeLog of what changed. Re-posting an unchanged sheet writes
+nothing, so it fires no signals and keeps every cache and rank table warm.
+
+Large sheets can instead be queued as a PublishJob: the request only stores
+the payload, and a worker on the ``api.jobs`` pool validates and publishes it
+in chunks, recording progress and per-row errors on the job as it goes.
+"""
+
+import math
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from . import jobs
+from .dashboard import invalidate_dashboards
+from .models import ExamResult, PublishJob, ResultChangeLog, StudentExamResult
+from .ranks import deferred_rank_refresh
+
+User = get_user_model()
+
+PUBLISH_CHUNK_SIZE = 1000
+# Marks outside this range are typos, and huge values overflow the statistics
+MAX_MARKS = 1000
+GRADE_MAX_LENGTH = StudentExamResult._meta.get_field("grade").max_length
+
+
+def normalize_marks(marks):
+    return None if marks is None else float(marks)
+
+
+def prepare_entries(results_data):
+    """
+    Validate posted result rows.
+
+    Returns ``(entries, errors)``: ``(student, marks, grade)`` entries for the
+    rows that can be published and one ``{"row", "student_id", "error"}`` dict
+    per rejected row. All students are resolved with a single lookup.
+    """
+    errors = []
+    rows = []
+    for index, result in enumerate(results_data):
+        student_id = result.get("student_id") if isinstance(result, dict) else None
+        try:
+            # int() would turn true into user 1 and 1.7 into user 1
+            if isinstance(student_id, bool) or (
+                isinstance(student_id, float) and not student_id.is_integer()
+            ):
+                raise ValueError
+            student_id = int(student_id)
+            # Larger ids overflow the database's 64-bit integer column
+            if not 0 < student_id < 2**63:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors.append({"row": index, "error": "A valid student_id is required."})
+            continue
+        marks = result.get("marks")
+        if marks is not None:
+            try:
+                # bool is an int, and "nan" and "inf" parse as floats
+                if isinstance(marks, bool) or not math.isfinite(float(marks)):
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors.append(
+                    {"row": index, "student_id": student_id, "error": "Marks must be a number."}
+                )
+                continue
+            if not 0 <= float(marks) <= MAX_MARKS:
+                errors.append(
+                    {
+                        "row": index,
+                        "student_id": student_id,
+                        "error": f"Marks must be between 0 and {MAX_MARKS}.",
+                    }
+                )
+                continue
+        grade = result.get("grade")
+        # Stored as text, so anything else would never compare equal on re-post
+        if grade is not None and not (isinstance(grade, str) and len(grade) <= GRADE_MAX_LENGTH):
+            errors.append(
+                {
+                    "row": index,
+                    "student_id": student_id,
+                    "error": f"Grade must be text of at most {GRADE_MAX_LENGTH} characters.",
+                }
+            )
+            continue
+        rows.append((index, student_id, marks, grade))
+
+    students = User.objects.only("id", "username").in_bulk(
+        {student_id for _, student_id, _, _ in rows}
+    )
+
+    entries = []
+    for index, student_id, marks, grade in rows:
+        student = students.get(student_id)
+        if student is None:
+            errors.append(
+                {"row": index, "student_id": student_id, "error": "Student not found."}
+            )
+            continue
+        entries.append((student, marks, grade))
+    return entries, errors
+
+
+def diff_results(exam, entries):
+    """
+    Return ``(changed_entries, changes)`` for ``(student, marks, grade)`` entries.
+
+    A student listed twice keeps their last entry. ``changes`` maps each
+    changed student id to ``{field: [old, new]}`` for the fields that differ.
+    """
+    latest = {student.id: (student, marks, grade) for student, marks, grade in entries}
+    stored = {
+        student_id: (marks, grade)
+        for student_id, marks, grade in StudentExamResult.objects.filter(
+            exam=exam, student_id__in=latest
+        ).values_list("student_id", "marks", "grade")
+    }
+
+    changed, changes = [], {}
+    for student_id, (student, marks, grade) in latest.items():
+        old_marks, old_grade = stored.get(student_id, (None, None))
+        new_marks = normalize_marks(marks)
+        if student_id in stored and (old_marks, old_grade) == (new_marks, grade):
+            continue
+        fields = {}
+        if student_id not in stored or old_marks != new_marks:
+            fields["marks"] = [old_marks, new_marks]
+        if student_id not in stored or old_grade != grade:
+            fields["grade"] = [old_grade, grade]
+        changed.append((student, new_marks, grade))
+        changes[str(student_id)] = fields
+    return changed, changes
+
+
+def publish_results(exam, entries, published_by=None):
+    """
+    Apply a sheet of ``(student, marks, grade)`` entries to ``exam``.
+
+    Returns ``{"changed", "unchanged"}`` counts. The diff is taken once without
+    locks so an unchanged sheet returns before any write, then again under
+    the ExamResult row lock so concurrent publishers cannot lose updates.
+    """
+    entries = list(entries)
+    students = len({student.id for student, _, _ in entries})
+
+    changed, _ = diff_results(exam, entries)
+    if not changed:
+        return {"changed": 0, "unchanged": students}
+
+    with transaction.atomic():
+        exam_result, _ = ExamResult.objects.select_for_update().get_or_create(Exam=exam)
+        changed, changes = diff_results(exam, entries)
+        if changed:
+            exam_result.add_student_results(changed)
+            ResultChangeLog.objects.create(
+                exam=exam,
+                changed_by=published_by,
+                changed_rows=len(changed),
+                changes=changes,
+            )
+
+    invalidate_dashboards(*(student.id for student, _, _ in changed))
+    return {"changed": len(changed), "unchanged": students - len(changed)}
+
+
+def queue_publish_job(exam, results_data, submitted_by=None):
+    """Store ``results_data`` as a PublishJob and run it once the request commits."""
+    job = PublishJob.objects.create(
+        exam=exam,
+        submitted_by=submitted_by,
+        payload=results_data,
+        total=len(results_data),
+    )
+    transaction.on_commit(lambda: jobs.defer("publish_results", run_publish_job, job.pk))
+    return job
+
+
+def run_publish_job(job_id):
+    """
+    Publish a pending PublishJob, chunk by chunk.
+
+    The job is claimed with a conditional update, so a job picked up by both a
+    worker and ``process_publish_jobs`` still runs once. ``done`` counts
+    processed rows, rejected ones included, and is saved after every chunk;
+    the exam is re-ranked once, after the last chunk. Returns the job, or None when it was not pending.
+    """
+    claimed = PublishJob.objects.filter(
+        pk=job_id, status=PublishJob.Status.PENDING
+    ).update(status=PublishJob.Status.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return None
+
+    job = PublishJob.objects.select_related("exam", "submitted_by").get(pk=job_id)
+    progress = ["done", "changed", "unchanged", "errors"]
+    try:
+        entries, job.errors = prepare_entries(job.payload)
+        job.done = len(job.errors)
+        job.save(update_fields=progress)
+
+        with deferred_rank_refresh():
+            for start in range(0, len(entries), PUBLISH_CHUNK_SIZE):
+                chunk = entries[start:start + PUBLISH_CHUNK_SIZE]
+                summary = publish_results(
+                    job.exam, chunk, published_by=job.submitted_by
+                )
+                job.done += len(chunk)
+                job.changed += summary["changed"]
+                job.unchanged += summary["unchanged"]
+                job.save(update_fields=progress)
+    except Exception as exc:
+        # Keep the payload so the job can be inspected and requeued
+        job.status = PublishJob.Status.FAILED
+        job.error = str(exc)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at"])
+        raise
+
+    job.status = PublishJob.Status.FINISHED
+    job.payload = []
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "payload", "finished_at"])
+    return job
@@ -0,0 +1,192 @@
+"""
+Materialized merit lists.
+
+ExamRank holds every student's rank in an exam and ClassRank their rank by
+total marks across the class's exams. Publishing results re-ranks that one
+exam, then re-aggregates its class from the materialized exam ranks, writing
+only the rows that moved, so reading "top 20" or "my rank" is an indexed
+lookup.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import ClassRank, Exam, ExamRank, StudentExamResult
+
+logger = logging.getLogger(__name__)
+
+_deferred = threading.local()
+
+
+def competition_ranks(rows):
+    """
+    Rank ``(student_id, score)`` rows sorted by score, best first.
+
+    Yields ``(student_id, score, rank, percentile)``. Tied scores share the
+    best rank ("1224" ranking). The percentile is the share of students below,
+    counting half of those tied.
+    """
+    total = len(rows)
+    start = 0
+    while start < total:
+        end = start
+        while end < total and rows[end][1] == rows[start][1]:
+            end += 1
+        tied = end - start
+        percentile = 100 * (total - end + tied / 2) / total
+        for student_id, score in rows[start:end]:
+            yield student_id, score, start + 1, percentile
+        start = end
+
+
+def sync_ranks(model, scope, unique_fields, ranks):
+    """
+    Make ``model``'s rows within ``scope`` match ``ranks``.
+
+    ``ranks`` maps student ids to their field values. Only students whose
+    values changed are upserted and only students no longer ranked are
+    deleted, so correcting a few marks rewrites a few rows rather than the
+    whole list. Returns the number of rows written.
+    """
+    fields = list(next(iter(ranks.values()), {}))
+    rows = model.objects.filter(**scope)
+    stored = {row.pop("student_id"): row for row in rows.values("student_id", *fields)}
+
+    stale = stored.keys() - ranks.keys()
+    if stale:
+        rows.filter(student_id__in=stale).delete()
+    changed = [
+        model(**scope, student_id=student_id, **values)
+        for student_id, values in ranks.items()
+        if stored.get(student_id) != values
+    ]
+    model.objects.bulk_create(
+        changed,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=fields,
+        batch_size=1000,
+    )
+    return len(changed) + len(stale)
+
+
+def recompute_class_ranks(class_id):
+    """Refresh ClassRank for ``class_id`` from its materialized exam ranks."""
+    totals = list(
+        ExamRank.objects.filter(class_assigned_id=class_id)
+        .values("student_id")
+        .annotate(total=Sum("marks"), exams=Count("id"))
+        .order_by("-total", "student_id")
+        .values_list("student_id", "total", "exams")
+    )
+    exams = {student_id: count for student_id, _, count in totals}
+
+    with transaction.atomic():
+        sync_ranks(
+            ClassRank,
+            {"class_assigned_id": class_id},
+            ["class_assigned", "student"],
+            {
+                student_id: {
+                    "total_marks": total,
+                    "exams_counted": exams[student_id],
+                    "rank": rank,
+                    "percentile": percentile,
+                }
+                for student_id, total, rank, percentile in competition_ranks(
+                    [(student_id, total) for student_id, total, _ in totals]
+                )
+            },
+        )
+
+
+def recompute_exam_ranks(exam_id, update_class=True):
+    """Refresh ExamRank for one exam, then (by default) its class aggregate."""
+    class_id = (
+        Exam.objects.filter(pk=exam_id).values_list("class_assigned_id", flat=True).first()
+    )
+    if class_id is None:
+        # The exam is gone; its ranks went with it
+        return
+
+    rows = list(
+        StudentExamResult.objects.filter(exam_id=exam_id, marks__isnull=False)
+        .order_by("-marks", "student_id")
+        .values_list("student_id", "marks")
+    )
+    with transaction.atomic():
+        written = sync_ranks(
+            ExamRank,
+            {"class_assigned_id": class_id, "exam_id": exam_id},
+            ["exam", "student"],
+            {
+                student_id: {"marks": marks, "rank": rank, "percentile": percentile}
+                for student_id, marks, rank, percentile in competition_ranks(rows)
+            },
+        )
+        if update_class and written:
+            recompute_class_ranks(class_id)
+
+
+def rebuild_ranks():
+    """Rebuild every rank table, e.g. after rows were bulk loaded without signals."""
+    exams = Exam.objects.values_list("id", "class_assigned_id")
+    class_ids = set()
+    for exam_id, class_id in exams.iterator():
+        recompute_exam_ranks(exam_id, update_class=False)
+        class_ids.add(class_id)
+    for class_id in class_ids:
+        recompute_class_ranks(class_id)
+    return len(class_ids)
+
+
+@contextmanager
+def deferred_rank_refresh():
+    """
+    Hold back rank refreshes scheduled in this thread until the block exits.
+
+    For work that commits one exam in several transactions, such as a chunked
+    publish job, so each exam is re-ranked once rather than after every chunk.
+    A failed refresh is logged, not raised, as the results are already saved.
+    """
+    if getattr(_deferred, "exam_ids", None) is not None:
+        yield
+        return
+    _deferred.exam_ids = set()
+    try:
+        yield
+    finally:
+        exam_ids, _deferred.exam_ids = _deferred.exam_ids, None
+        for exam_id in exam_ids:
+            try:
+                recompute_exam_ranks(exam_id)
+            except Exception:
+                logger.exception("Rank refresh for exam %s failed", exam_id)
+
+
+def schedule_rank_refresh(*exam_ids):
+    """
+    Recompute ranks for ``exam_ids`` once the current transaction commits.
+
+    The callback is robust: the results have already committed by then, so a
+    failure is logged by Django and left for ``rebuild_ranks`` rather than
+    turned into an error response.
+    """
+    exam_ids = set(exam_ids)
+    if getattr(_deferred, "exam_ids", None) is not None:
+        _deferred.exam_ids.update(exam_ids)
+        return
+
+    def refresh():
+        for exam_id in exam_ids:
+            recompute_exam_ranks(exam_id)
+
+    transaction.on_commit(refresh, robust=True)
+
+
+def schedule_class_rank_refresh(class_id):
+    transaction.on_commit(lambda: recompute_class_ranks(class_id), robust=True)
@@ -0,0 +1,220 @@
+"""
+Synthetic college data for load tests and benchmarks.
+
+Everything is inserted with ``bulk_create`` so even the larger scales seed
+in seconds. All seeded accounts share the password ``SEED_PASSWORD``.
+"""
+
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import (
+    Class,
+    ClassTeaching,
+    Exam,
+    ExamResult,
+    PlacementApplication,
+    PlacementCompany,
+    PlacementProfile,
+    Research,
+    StudentExamResult,
+    Subject,
+    Teacher,
+    UserRole,
+)
+from .ranks import rebuild_ranks
+from .serializers import PlacementProfileSerializer
+
+User = get_user_model()
+
+SEED_PASSWORD = "seed-password"
+BATCH_SIZE = 1000
+GRADES = ["S", "A", "B", "C", "D", "E", "F"]
+
+
+def grade_for(marks):
+    return GRADES[min(len(GRADES) - 1, max(0, (100 - int(marks)) // 10))]
+
+
+@transaction.atomic
+def seed_college(
+    students=3000,
+    teachers=150,
+    classes=100,
+    subjects_per_class=5,
+    exams_per_subject=2,
+    companies=60,
+    applications_per_student=3,
+    prefix="seed",
+    rng=None,
+):
+    """Create a realistic spread of users, classes, results and placements.
+
+    Returns a dict of sample rows (a teacher with a class, a student, an exam
+    with results, a company, ...) that benchmarks can point requests at.
+    """
+    rng = rng or random.Random(42)
+    password = make_password(SEED_PASSWORD)
+
+    User.objects.bulk_create(
+        (
+            User(
+                username=f"{prefix}_teacher_{i}",
+                email=f"{prefix}_teacher_{i}@cucek.example",
+                password=password,
+            )
+            for i in range(teachers)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    User.objects.bulk_create(
+        (
+            User(
+                username=f"{prefix}_student_{i}",
+                email=f"{prefix}_student_{i}@cucek.example",
+                password=password,
+            )
+            for i in range(students)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    teacher_users = list(User.objects.filter(username__startswith=f"{prefix}_teacher_").order_by("id"))
+    student_users = list(User.objects.filter(username__startswith=f"{prefix}_student_").order_by("id"))
+
+    class_objs = Class.objects.bulk_create(
+        Class(name=f"{prefix} class {i}", description="Seeded class") for i in range(classes)
+    )
+
+    # Two teachers per class; every student in exactly one class
+    memberships = []
+    for i, class_obj in enumerate(class_objs):
+        for teacher in {teacher_users[i % teachers], teacher_users[(i + 1) % teachers]}:
+            memberships.append(
+                ClassTeaching(user=teacher, class_taught=class_obj, role=UserRole.TEACHER)
+            )
+    roster = {class_obj.id: [] for class_obj in class_objs}
+    for i, student in enumerate(student_users):
+        class_obj = class_objs[i % classes]
+        roster[class_obj.id].append(student)
+        memberships.append(
+            ClassTeaching(user=student, class_taught=class_obj, role=UserRole.STUDENT)
+        )
+    ClassTeaching.objects.bulk_create(memberships, batch_size=BATCH_SIZE)
+
+    subjects = Subject.objects.bulk_create(
+        Subject(name=f"Subject {j}", description="", class_assigned=class_obj)
+        for class_obj in class_objs
+        for j in range(subjects_per_class)
+    )
+    exams = Exam.objects.bulk_create(
+        Exam(
+            name=f"Series {k}",
+            description="",
+            class_assigned_id=subject.class_assigned_id,
+            subject=subject,
+        )
+        for subject in subjects
+        for k in range(exams_per_subject)
+    )
+
+    # Results as both the JSON blob and the normalized rows
+    exam_results = []
+    student_results = []
+    for exam in exams:
+        blob = {}
+        for student in roster[exam.class_assigned_id]:
+            marks = rng.randint(20, 100)
+            grade = grade_for(marks)
+            blob[str(student.id)] = {
+                "student_id": student.id,
+                "student_name": student.username,
+                "marks": marks,
+                "grade": grade,
+            }
+            student_results.append(
+                StudentExamResult(exam=exam, student=student, marks=marks, grade=grade)
+            )
+        exam_results.append(ExamResult(Exam=exam, results=blob))
+    ExamResult.objects.bulk_create(exam_results, batch_size=BATCH_SIZE)
+    StudentExamResult.objects.bulk_create(student_results, batch_size=BATCH_SIZE)
+    # Bulk inserts send no signals, so materialize the merit lists directly
+    rebuild_ranks()
+
+    company_objs = PlacementCompany.objects.bulk_create(
+        PlacementCompany(
+            name=f"{prefix} company {i}",
+            job_description="Seeded company",
+            min_cgpa=rng.choice([6, 6.5, 7, 7.5, 8]),
+            min_10th=rng.choice([60, 70, 80]),
+            min_12th=rng.choice([60, 70, 80]),
+            max_backlogs=rng.choice([0, 1, 2]),
+            package=rng.randint(3, 30) * 100000,
+        )
+        for i in range(companies)
+    )
+    profiles = PlacementProfile.objects.bulk_create(
+        (
+            PlacementProfile(
+                user=student,
+                cgpa=round(rng.uniform(5, 10), 2),
+                percentage_10th=round(rng.uniform(55, 100), 2),
+                percentage_12th=round(rng.uniform(55, 100), 2),
+                is_placement_coordinator=(i == 0),
+            )
+            for i, student in enumerate(student_users)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    applications = []
+    for profile in profiles:
+        details = PlacementProfileSerializer(profile).data
+        for company in rng.sample(company_objs, min(applications_per_student, companies)):
+            applications.append(
+                PlacementApplication(user=profile.user, company=company, other_details=details)
+            )
+    PlacementApplication.objects.bulk_create(applications, batch_size=BATCH_SIZE)
+
+    Teacher.objects.bulk_create(
+        Teacher(
+            name=f"{prefix} faculty {i}",
+            profession="Assistant Professor",
+            qualifications="M.Tech",
+            experience=rng.randint(0, 30),
+            branch=rng.choice(["CSE", "CE", "ECE", "EEE", "IT", "MCA"]),
+        )
+        for i in range(teachers)
+    )
+    Research.objects.bulk_create(
+        Research(
+            name=f"{prefix} researcher {i}",
+            profession="Professor",
+            research_interests="Seeded",
+            research_scholars="",
+            projects="",
+        )
+        for i in range(max(1, teachers // 5))
+    )
+
+    first_class = class_objs[0]
+    first_exam = next(exam for exam in exams if exam.class_assigned_id == first_class.id)
+    return {
+        "teacher": teacher_users[0],
+        "student": roster[first_class.id][0],
+        "coordinator": student_users[0],
+        "class": first_class,
+        "subject": first_exam.subject,
+        "exam": first_exam,
+        "company": company_objs[0],
+        "counts": {
+            "users": teachers + students,
+            "classes": classes,
+            "subjects": len(subjects),
+            "exams": len(exams),
+            "student_results": len(student_results),
+            "companies": companies,
+            "applications": len(applications),
+        },
+    }
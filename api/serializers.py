@@ -1,8 +1,14 @@
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Exam, PlacementCompany, PlacementProfile, Teacher, Research, Class, Subject, PlacementApplication
+from .authentication import ClaimsRefreshToken
+from .images import srcset
+from .models import PlacementCompany, PlacementProfile, Teacher, Research, Class, Subject, PlacementApplication
 
 User = get_user_model()
 
@@ -33,20 +39,53 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid email or password")
         return {"user": user}
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Copy the user's current claims into the refreshed tokens."""
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        refresh.set_user_claims(user)
+        return super().validate({**attrs, "refresh": str(refresh)})
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name"]
 
-class TeacherSerializer(serializers.ModelSerializer):
+class ImageVariantsMixin(serializers.Serializer):
+    image_srcset = serializers.SerializerMethodField()
+
+    def get_image_srcset(self, obj):
+        request = self.context.get("request")
+
+        def url(name):
+            path = default_storage.url(name)
+            return request.build_absolute_uri(path) if request else path
+
+        return srcset(obj.image_variants, url)
+
+class TeacherSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     class Meta:
         model = Teacher
-        fields = '__all__'
+        exclude = ['image_hash', 'image_variants']
 
-class ResearchSerializer(serializers.ModelSerializer):
+class ResearchSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     class Meta:
         model = Research
-        fields = '__all__'
+        exclude = ['image_variants']
 
 class ClassSerializer(serializers.ModelSerializer):
     class Meta:
@@ -72,31 +111,12 @@ class PlacementCompanyAdminSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 class PlacementCompanySerializer(serializers.ModelSerializer):
-    is_eligible = serializers.BooleanField(read_only=True)
-    applied = serializers.BooleanField(read_only=True)
+    # Read from the annotations added by PlacementCompanyQuerySet.with_student_flags
+    is_eligible = serializers.BooleanField(read_only=True, default=False)
+    applied = serializers.BooleanField(read_only=True, default=False)
     class Meta:
         model = PlacementCompany
         fields = ["id" ,"name", "job_description", "min_cgpa", "min_10th", "min_12th", "max_backlogs", "package", "is_eligible", "applied"]
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        profile = self.context.get('profile')
-        user = self.context.get('user')
-        
-        if profile:
-            representation['is_eligible'] = (
-                profile.cgpa >= instance.min_cgpa and
-                profile.percentage_10th >= instance.min_10th and
-                profile.percentage_12th >= instance.min_12th
-                # and profile.backlogs <= instance.max_backlogs
-            )
-
-            representation["applied"] = PlacementApplication.objects.filter(user=user, company=instance).count() > 0
-
-        else:
-            representation['is_eligible'] = False
-            
-        return representation
     
 class ApplicationSerializer(serializers.ModelSerializer):
     user = UserSerializer()
@@ -104,4 +124,22 @@ class ApplicationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PlacementApplication
-        fields = ["user", "company", "other_details"]
\ No newline at end of file
+        fields = ["user", "company", "other_details"]
+
+class ApplicationListSerializer(serializers.ModelSerializer):
+    """Application row without the company, which is sent once per page.
+
+    Pass ``fields`` to restrict the output to a subset of the declared fields.
+    """
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        model = PlacementApplication
+        fields = ["id", "user", "other_details"]
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
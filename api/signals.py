@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .analytics import bump_results_version
+from .authentication import invalidate_auth_state
+from .caching import bump_directory_version
+from .dashboard import invalidate_class_dashboards, invalidate_dashboards
+from .images import needs_variants, schedule_image_variants
+from .models import (
+    Class,
+    ClassTeaching,
+    Exam,
+    ExamResult,
+    Research,
+    StudentExamResult,
+    Subject,
+    Teacher,
+)
+from .permissions import invalidate_class_roles
+from .ranks import schedule_class_rank_refresh, schedule_rank_refresh
+
+User = get_user_model()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_auth_state(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which is not part of the cached state
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    # After commit, so a concurrent request cannot re-cache the old flags
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_auth_state(user_id))
+
+
+@receiver([post_save, post_delete], sender=Teacher)
+@receiver([post_save, post_delete], sender=Research)
+def invalidate_directory_cache(sender, **kwargs):
+    # After commit, so a reader cannot cache the old rows under the new version
+    transaction.on_commit(lambda: bump_directory_version(sender))
+
+
+@receiver(post_save, sender=Teacher)
+@receiver(post_save, sender=Research)
+def queue_image_variants(sender, instance, **kwargs):
+    if needs_variants(instance):
+        schedule_image_variants(instance)
+
+
+@receiver([post_save, post_delete], sender=ClassTeaching)
+def invalidate_class_role_cache(sender, instance, **kwargs):
+    # After commit, so a concurrent request cannot re-cache the old roles
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_class_roles(user_id))
+    transaction.on_commit(lambda: invalidate_dashboards(user_id))
+
+
+@receiver(post_save, sender=Class)
+def invalidate_class_dashboard_cache(sender, instance, **kwargs):
+    # After commit, so a concurrent request cannot re-cache the old class
+    class_id = instance.id
+    transaction.on_commit(lambda: invalidate_class_dashboards(class_id))
+
+
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Exam)
+def invalidate_class_content_dashboard_cache(sender, instance, **kwargs):
+    class_id = instance.class_assigned_id
+    transaction.on_commit(lambda: invalidate_class_dashboards(class_id))
+
+
+@receiver([post_save, post_delete], sender=ExamResult)
+def invalidate_exam_result_statistics(sender, instance, **kwargs):
+    # After commit, so a reader cannot cache the old marks under the new version
+    transaction.on_commit(lambda: bump_results_version(instance.Exam_id))
+
+
+@receiver(post_save, sender=ExamResult)
+def refresh_exam_ranks(sender, instance, **kwargs):
+    # Publishing saves the ExamResult once per sheet; the per-student rows are
+    # bulk upserted without signals
+    schedule_rank_refresh(instance.Exam_id)
+
+
+@receiver(post_delete, sender=Exam)
+def refresh_class_ranks(sender, instance, **kwargs):
+    # The exam's ranks cascade away; its class totals must drop them too
+    schedule_class_rank_refresh(instance.class_assigned_id)
+
+
+@receiver([post_save, post_delete], sender=StudentExamResult)
+def invalidate_student_result_statistics(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_results_version(instance.exam_id))
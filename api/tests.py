@@ -1,3 +1,1831 @@
-from django.test import TestCase
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from cucek_backend.hashers import TunedPBKDF2PasswordHasher
+
+from . import analytics
+from .benchmarks import BENCHMARKS
+from .analytics import compute_statistics
+from .authentication import ClaimsJWTAuthentication, ClaimsRefreshToken
+from .checks import check_shared_cache
+from .exports import COLUMNS
+from .faculty import import_faculty
+from .images import derivative_names, generate_image_variants
+from .management.commands.benchmark import find_regressions
+from .middleware import (
+    QUERY_METRICS_DUPLICATES,
+    QueryMetricsMiddleware,
+    RouteMetrics,
+    reset_metrics,
+    route_summaries,
+)
+from .permissions import class_roles_key
+from .publishing import run_publish_job
+from .serializers import PlacementProfileSerializer, TeacherSerializer
+from .seed import seed_college
+from .ranks import competition_ranks, deferred_rank_refresh, schedule_rank_refresh
+from .models import (
+    Class,
+    ClassTeaching,
+    Exam,
+    ExamRank,
+    ExamResult,
+    PlacementApplication,
+    PlacementCompany,
+    PlacementProfile,
+    PublishJob,
+    ResultChangeLog,
+    StudentExamResult,
+    Subject,
+    Teacher,
+    UserRole,
+)
+
+User = get_user_model()
+
+
+class ClassDetailViewTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.class_obj = Class.objects.create(name="S6 CSE", description="Sixth semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=self.class_obj, role=UserRole.TEACHER
+        )
+        Subject.objects.create(name="Compilers", class_assigned=self.class_obj)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def add_students(self, count):
+        start = User.objects.count()
+        students = User.objects.bulk_create(
+            User(username=f"student{start + i}") for i in range(count)
+        )
+        ClassTeaching.objects.bulk_create(
+            ClassTeaching(user=student, class_taught=self.class_obj, role=UserRole.STUDENT)
+            for student in students
+        )
+
+    def test_roster_is_partitioned_by_role(self):
+        self.add_students(2)
+        response = self.client.get(f"/api/class/{self.class_obj.id}/details/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t["username"] for t in response.data["teachers"]], ["teacher"])
+        self.assertEqual(len(response.data["students"]), 2)
+        self.assertEqual([s["name"] for s in response.data["subjects"]], ["Compilers"])
+
+    def test_query_count_does_not_grow_with_members(self):
+        for count in (1, 50):
+            self.add_students(count)
+            # class, members with users, subjects
+            with self.assertNumQueries(3):
+                response = self.client.get(f"/api/class/{self.class_obj.id}/details/")
+            self.assertEqual(response.status_code, 200)
+
+
+class ClassRoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.class_obj = Class.objects.create(name="S5 CE", description="Fifth semester")
+        self.membership = ClassTeaching.objects.create(
+            user=self.teacher, class_taught=self.class_obj, role=UserRole.TEACHER
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.url = f"/api/class/{self.class_obj.id}/ranks/"
+
+    def test_removed_teacher_loses_access(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_demoted_teacher_loses_teacher_access(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.role = UserRole.STUDENT
+            self.membership.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        response = self.client.get(f"/api/class/{self.class_obj.id}/role/")
+        self.assertEqual(response.data["role"], UserRole.STUDENT)
+
+    def test_roles_are_dropped_only_once_the_change_commits(self):
+        self.client.get(self.url)
+        key = class_roles_key(self.teacher.id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.membership.delete()
+            # A reader before the commit would re-cache the old roles
+            self.assertIsNotNone(cache.get(key))
+        for callback in callbacks:
+            callback()
+
+        self.assertIsNone(cache.get(key))
+
+
+class BulkAddStudentsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.class_obj = Class.objects.create(name="S1 CSE", description="First semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=self.class_obj, role=UserRole.TEACHER
+        )
+        self.url = f"/api/class/{self.class_obj.id}/add-students/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        # Load the teacher's cached class roles before any query counting
+        self.client.get(f"/api/class/{self.class_obj.id}/role/")
+
+    def create_students(self, prefix, count):
+        User.objects.bulk_create(
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com")
+            for i in range(count)
+        )
+        return [f"{prefix}{i}@example.com" for i in range(count)]
+
+    def test_reports_status_per_row(self):
+        emails = self.create_students("s", 2)
+        ClassTeaching.objects.create(
+            user=User.objects.get(email=emails[1]),
+            class_taught=self.class_obj,
+            role=UserRole.STUDENT,
+        )
+        response = self.client.post(
+            self.url,
+            {"student_emails": [emails[0], emails[1], "nobody@example.com", emails[0], ""]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [row["status"] for row in response.data["results"]],
+            ["enrolled", "already_enrolled", "not_found", "duplicate", "invalid"],
+        )
+        self.assertEqual(
+            ClassTeaching.objects.filter(
+                class_taught=self.class_obj, role=UserRole.STUDENT
+            ).count(),
+            2,
+        )
+
+    def test_accepts_csv_upload(self):
+        emails = self.create_students("csv", 3)
+        upload = SimpleUploadedFile(
+            "roster.csv", ("name,email\n" + "".join(f"x,{e}\n" for e in emails)).encode()
+        )
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["enrolled"], 3)
+
+    def test_emails_match_case_insensitively(self):
+        emails = self.create_students("Mixed", 1)
+        User.objects.create(username="later", email=emails[0].lower())
+
+        response = self.client.post(
+            self.url,
+            {"student_emails": [emails[0].upper(), emails[0].lower()]},
+            format="json",
+        )
+
+        self.assertEqual(
+            [row["status"] for row in response.data["results"]], ["enrolled", "duplicate"]
+        )
+        self.assertTrue(
+            ClassTeaching.objects.filter(
+                user__username="Mixed0", class_taught=self.class_obj
+            ).exists()
+        )
+
+    def test_query_count_does_not_grow_with_roster(self):
+        for prefix, count in (("a", 1), ("b", 120)):
+            emails = self.create_students(prefix, count)
+            # users by email, existing memberships, savepoint, insert, release
+            with self.assertNumQueries(5):
+                response = self.client.post(
+                    self.url, {"student_emails": emails}, format="json"
+                )
+            self.assertEqual(response.data["enrolled"], count)
+
+    def test_enrolled_students_see_the_class(self):
+        emails = self.create_students("r", 1)
+        student = User.objects.get(email=emails[0])
+        student_client = APIClient()
+        student_client.force_authenticate(student)
+        # Cache the student's (empty) role map before the enrollment
+        role_url = f"/api/class/{self.class_obj.id}/role/"
+        self.assertEqual(student_client.get(role_url).status_code, 404)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {"student_emails": emails}, format="json")
+
+        self.assertEqual(student_client.get(role_url).status_code, 200)
+
+
+class AddStudentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.class_obj = Class.objects.create(name="S3 CSE", description="Third semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=self.class_obj, role=UserRole.TEACHER
+        )
+        self.student = User.objects.create(username="asha", email="Asha@Example.com")
+        self.url = f"/api/class/{self.class_obj.id}/add-student/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def add(self, email):
+        return self.client.post(self.url, {"student_email": email}, format="json")
+
+    def test_email_match_is_case_insensitive_and_oldest_wins(self):
+        User.objects.create(username="asha2", email="asha@example.com")
+
+        response = self.add("ASHA@example.com")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(
+                ClassTeaching.objects.filter(
+                    class_taught=self.class_obj, role=UserRole.STUDENT
+                ).values_list("user_id", flat=True)
+            ),
+            [self.student.id],
+        )
+
+    def test_repeat_enrollment_is_rejected(self):
+        self.assertEqual(self.add("asha@example.com").status_code, 201)
+
+        response = self.add("asha@example.com")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Student is already enrolled in this class.")
+
+    def test_unknown_email_is_not_found(self):
+        self.assertEqual(self.add("nobody@example.com").status_code, 404)
+        self.assertEqual(self.add(["asha@example.com"]).status_code, 400)
+
+
+class StudentDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.student = User.objects.create_user(username="student", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def add_class(self, subjects=2, exams=2):
+        class_obj = Class.objects.create(name="S3 ECE", description="Third semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=class_obj, role=UserRole.TEACHER
+        )
+        ClassTeaching.objects.create(
+            user=self.student, class_taught=class_obj, role=UserRole.STUDENT
+        )
+        for i in range(subjects):
+            subject = Subject.objects.create(name=f"Subject {i}", class_assigned=class_obj)
+            for j in range(exams):
+                exam = Exam.objects.create(
+                    name=f"Series {j}", class_assigned=class_obj, subject=subject
+                )
+                StudentExamResult.objects.create(
+                    exam=exam, student=self.student, marks=50 + j, grade="B"
+                )
+        return class_obj
+
+    def test_nests_subjects_exams_and_own_results(self):
+        self.add_class(subjects=1, exams=1)
+        other = User.objects.create_user(username="other", password="pass")
+        exam = Exam.objects.get()
+        StudentExamResult.objects.create(exam=exam, student=other, marks=99, grade="O")
+
+        response = self.client.get("/api/student/dashboard/")
+
+        self.assertEqual(response.status_code, 200)
+        (class_data,) = response.data["classes"]
+        self.assertEqual(class_data["role"], UserRole.STUDENT)
+        exam_data = class_data["subjects"][0]["exams"][0]
+        self.assertEqual(exam_data["result"], {"marks": 50, "grade": "B"})
+
+    def test_query_count_does_not_grow_with_classes(self):
+        for classes in (1, 5):
+            while ClassTeaching.objects.filter(user=self.student).count() < classes:
+                self.add_class()
+            cache.clear()
+            # memberships with classes, subjects, exams, own results
+            with self.assertNumQueries(4):
+                response = self.client.get("/api/student/dashboard/")
+            self.assertEqual(len(response.data["classes"]), classes)
+
+            # Served from the per-user cache afterwards
+            with self.assertNumQueries(0):
+                self.client.get("/api/student/dashboard/")
+
+    def test_class_content_changes_refresh_the_dashboard_on_commit(self):
+        class_obj = self.add_class(subjects=1, exams=1)
+        self.client.get("/api/student/dashboard/")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Subject.objects.create(name="Late subject", class_assigned=class_obj)
+            # Until the commit, readers may still be served the cached dashboard
+            response = self.client.get("/api/student/dashboard/")
+            self.assertEqual(len(response.data["classes"][0]["subjects"]), 1)
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get("/api/student/dashboard/")
+        self.assertEqual(len(response.data["classes"][0]["subjects"]), 2)
+
+    def test_publishing_results_refreshes_the_dashboard(self):
+        exam = Exam.objects.get(class_assigned=self.add_class(subjects=1, exams=1))
+        self.client.get("/api/student/dashboard/")
+
+        teacher_client = APIClient()
+        teacher_client.force_authenticate(self.teacher)
+        response = teacher_client.post(
+            f"/api/exams/{exam.id}/publish-results/",
+            {"results": [{"student_id": self.student.id, "marks": 91, "grade": "A+"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get("/api/student/dashboard/")
+        exam_data = response.data["classes"][0]["subjects"][0]["exams"][0]
+        self.assertEqual(exam_data["result"], {"marks": 91, "grade": "A+"})
+
+
+class ViewSubjectExamsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="teacher", password="pass")
+        self.class_obj = Class.objects.create(name="S5 IT", description="Fifth semester")
+        self.subject = Subject.objects.create(name="Networks", class_assigned=self.class_obj)
+        self.url = f"/api/subjects/{self.subject.id}/exams/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_exams(self, count):
+        start = Exam.objects.count()
+        Exam.objects.bulk_create(
+            Exam(name=f"Exam {start + i:03}", class_assigned=self.class_obj, subject=self.subject)
+            for i in range(count)
+        )
+
+    def test_query_count_does_not_grow_with_exams(self):
+        for count in (1, 30):
+            self.add_exams(count)
+            # subject, page count, page rows
+            with self.assertNumQueries(3):
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["exams"][0]["class_assigned"], "S5 IT")
+            self.assertEqual(response.data["exams"][0]["subject"], "Networks")
+
+    def test_ordering_and_pagination(self):
+        self.add_exams(5)
+        response = self.client.get(self.url, {"ordering": "-name", "page_size": 2})
+
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(
+            [exam["name"] for exam in response.data["exams"]], ["Exam 004", "Exam 003"]
+        )
+        self.assertIsNotNone(response.data["next"])
+        self.assertEqual(
+            self.client.get(self.url, {"ordering": "class_assigned"}).status_code, 400
+        )
+
+    def test_no_exams_is_not_found(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_admin_changelist_query_count_does_not_grow(self):
+        admin = User.objects.create_superuser(username="admin", password="pass")
+        self.client.force_login(admin)
+        counts = []
+        for count in (1, 20):
+            self.add_exams(count)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/admin/api/exam/")
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class ExamResultAccessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.student = User.objects.create_user(username="student", password="pass")
+        self.classmate = User.objects.create_user(username="classmate", password="pass")
+        class_obj = Class.objects.create(name="S7 ME", description="Seventh semester")
+        ClassTeaching.objects.bulk_create(
+            [
+                ClassTeaching(user=self.teacher, class_taught=class_obj, role=UserRole.TEACHER),
+                ClassTeaching(user=self.student, class_taught=class_obj, role=UserRole.STUDENT),
+                ClassTeaching(user=self.classmate, class_taught=class_obj, role=UserRole.STUDENT),
+            ]
+        )
+        subject = Subject.objects.create(name="Thermodynamics", class_assigned=class_obj)
+        self.exam = Exam.objects.create(name="Series 1", class_assigned=class_obj, subject=subject)
+        self.exam_result = ExamResult.objects.create(Exam=self.exam)
+        self.exam_result.add_student_results(
+            [(self.student, 72, "B+"), (self.classmate, 88, "A")]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_own_result_contains_only_the_student(self):
+        response = self.client.get(f"/api/view-exam-results/{self.exam.id}/me/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["result"]["marks"], 72)
+        self.assertEqual(response.data["result"]["student_name"], "student")
+
+    def test_own_result_falls_back_to_the_results_blob(self):
+        StudentExamResult.objects.filter(student=self.student).delete()
+        response = self.client.get(f"/api/view-exam-results/{self.exam.id}/me/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["result"]["grade"], "B+")
+
+    def test_own_result_not_published(self):
+        outsider = User.objects.create_user(username="outsider", password="pass")
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f"/api/view-exam-results/{self.exam.id}/me/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_students_only_see_their_own_row_of_the_sheet(self):
+        response = self.client.get(f"/api/view-exam-results/{self.exam.id}/")
+        self.assertEqual(list(response.data["results"]), [str(self.student.id)])
+
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get(f"/api/view-exam-results/{self.exam.id}/")
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.student = User.objects.create_user(username="student", password="pass")
+        self.outsider = User.objects.create_user(username="outsider", password="pass")
+        class_obj = Class.objects.create(name="S8 EC", description="Eighth semester")
+        ClassTeaching.objects.bulk_create(
+            [
+                ClassTeaching(user=self.teacher, class_taught=class_obj, role=UserRole.TEACHER),
+                ClassTeaching(user=self.student, class_taught=class_obj, role=UserRole.STUDENT),
+            ]
+        )
+        subject = Subject.objects.create(name="Antennas", class_assigned=class_obj)
+        exams = Exam.objects.bulk_create(
+            Exam(name=f"Series {i}", class_assigned=class_obj, subject=subject)
+            for i in range(3)
+        )
+        ExamResult.objects.create(Exam=exams[0]).add_student_results(
+            [(self.student, 64, "B")]
+        )
+        PlacementProfile.objects.create(
+            user=self.student, cgpa=8.1, percentage_10th=90, percentage_12th=85
+        )
+        PlacementCompany.objects.create(
+            name="Acme", job_description="SDE", min_cgpa=7, min_10th=60,
+            min_12th=60, max_backlogs=0, package=12,
+        )
+        self.paths = {
+            "teacher": [
+                f"/api/class/{class_obj.id}/details/",
+                f"/api/subjects/{subject.id}/exams/?page_size=2&ordering=-name",
+                f"/api/view-exam-results/{exams[0].id}/",
+                f"/api/view-exam-results/{exams[1].id}/",
+            ],
+            "student": [
+                f"/api/view-exam-results/{exams[0].id}/",
+                "/api/placement/student/company/",
+            ],
+            "outsider": [
+                f"/api/view-exam-results/{exams[0].id}/",
+                "/api/placement/student/company/",
+            ],
+        }
+
+    def get(self, user, path):
+        token = ClaimsRefreshToken.for_user(user).access_token
+        return self.client.get(path, HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_async_views_match_the_sync_views(self):
+        for name, paths in self.paths.items():
+            user = getattr(self, name)
+            for path in paths:
+                with self.subTest(user=name, path=path):
+                    expected = self.get(user, path)
+                    response = self.get(user, path.replace("/api/", "/api/async/", 1))
+                    self.assertEqual(response.status_code, expected.status_code)
+                    self.assertEqual(
+                        response.json(),
+                        # Page links point at the async route
+                        json.loads(expected.content.decode().replace("/api/", "/api/async/")),
+                    )
+
+    def test_async_views_require_a_valid_token(self):
+        response = self.client.get("/api/async/placement/student/company/")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+        response = self.client.get(
+            "/api/async/placement/student/company/", HTTP_AUTHORIZATION="Bearer nope"
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["code"], "token_not_valid")
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="admin", password="pass")
+        self.refresh = ClaimsRefreshToken.for_user(self.admin)
+
+    def get(self, path):
+        return self.client.get(
+            path, HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+
+    def update_admin(self, **fields):
+        for name, value in fields.items():
+            setattr(self.admin, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.save()
+
+    def test_claims_user_is_cached_between_requests(self):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+        ClaimsJWTAuthentication().authenticate(request)
+        with self.assertNumQueries(0):
+            user, _ = ClaimsJWTAuthentication().authenticate(request)
+        self.assertTrue(user.is_superuser)
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.get("/api/jobs/missing/").status_code, 404)
+
+        self.update_admin(is_active=False)
+
+        for path in ("/api/jobs/missing/", "/api/async/placement/student/company/"):
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response.json()["code"], "user_inactive")
+
+    def test_demoted_user_loses_admin_access(self):
+        self.update_admin(is_staff=False, is_superuser=False)
+
+        self.assertEqual(self.get("/api/jobs/missing/").status_code, 403)
+
+    def test_deleted_user_is_rejected(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.delete()
+
+        response = self.get("/api/jobs/missing/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["code"], "user_not_found")
+
+    def test_refreshed_tokens_carry_current_claims(self):
+        self.update_admin(is_staff=False, is_superuser=False, email="new@example.com")
+
+        response = self.client.post("/api/token/refresh/", {"refresh": str(self.refresh)})
+
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data["access"])
+        self.assertFalse(access["is_staff"])
+        self.assertFalse(access["is_superuser"])
+        self.assertEqual(access["email"], "new@example.com")
+
+    def test_deactivated_user_cannot_refresh(self):
+        self.update_admin(is_active=False)
+
+        response = self.client.post("/api/token/refresh/", {"refresh": str(self.refresh)})
+
+        self.assertEqual(response.status_code, 401)
+
+
+class EmailBackendTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="asha", email="Asha@Example.com", password="pass"
+        )
+
+    def test_email_match_is_case_insensitive(self):
+        self.assertEqual(authenticate(email="asha@example.COM", password="pass"), self.user)
+        self.assertIsNone(authenticate(email="asha@example.com", password="wrong"))
+
+    def test_unknown_email_still_hashes_the_password(self):
+        with mock.patch.object(User, "set_password") as set_password:
+            self.assertIsNone(authenticate(email="nobody@example.com", password="pass"))
+        set_password.assert_called_once_with("pass")
+
+    def test_oldest_account_wins_for_duplicate_emails(self):
+        User.objects.create_user(username="asha2", email="asha@example.com", password="pass")
+
+        self.assertEqual(authenticate(email="ASHA@example.com", password="pass"), self.user)
+
+    def test_inactive_users_cannot_log_in(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(authenticate(email="asha@example.com", password="pass"))
+
+    def test_work_factor_never_drops_below_django_default(self):
+        self.assertGreaterEqual(
+            TunedPBKDF2PasswordHasher.iterations, PBKDF2PasswordHasher.iterations
+        )
+        stock = PBKDF2PasswordHasher()
+        self.assertFalse(get_hasher().must_update(stock.encode("pass", stock.salt())))
+
+
+class ExamAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.students = User.objects.bulk_create(
+            User(username=f"student{i}") for i in range(4)
+        )
+        class_obj = Class.objects.create(name="S2 EEE", description="Second semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=class_obj, role=UserRole.TEACHER
+        )
+        subject = Subject.objects.create(name="Circuits", class_assigned=class_obj)
+        self.exam = Exam.objects.create(name="Series 1", class_assigned=class_obj, subject=subject)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def publish(self, marks):
+        results = [
+            {"student_id": student.id, "marks": mark, "grade": "A" if mark and mark >= 30 else "B"}
+            for student, mark in zip(self.students, marks)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/exams/{self.exam.id}/publish-results/", {"results": results}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_array_fallback_statistics(self):
+        summary = compute_statistics(
+            [(10, "B"), (20, "B"), (30, "A"), (40, "A"), (None, None)], use_numpy=False
+        )
+
+        self.assertEqual((summary["students"], summary["absent"]), (5, 1))
+        self.assertEqual(summary["grades"], {"A": 2, "B": 2})
+        self.assertEqual(summary["stats"]["mean"], 25)
+        self.assertEqual(summary["stats"]["median"], 25)
+        self.assertEqual(summary["stats"]["std"], 11.18)
+        self.assertEqual(summary["stats"]["percentiles"]["25"], 17.5)
+        self.assertEqual(summary["histogram"]["counts"], [1, 0, 0, 1, 0, 0, 1, 0, 0, 1])
+        self.assertEqual(summary["histogram"]["edges"][-1], 40)
+
+    @skipUnless(analytics.numpy, "NumPy is not installed")
+    def test_numpy_and_array_statistics_agree(self):
+        samples = {
+            "spread": [(mark, "A") for mark in (3, 97, 41.5, 41.5, 60, 12, 88, 0)],
+            "single": [(55, "A")],
+            "equal": [(70, "A")] * 5,
+        }
+        for name, rows in samples.items():
+            with self.subTest(sample=name):
+                self.assertEqual(
+                    compute_statistics(rows, use_numpy=True),
+                    compute_statistics(rows, use_numpy=False),
+                )
+
+    def test_publishing_refreshes_cached_statistics(self):
+        url = f"/api/exams/{self.exam.id}/analytics/"
+        self.publish([10, 20, 30, 40])
+        self.assertEqual(self.client.get(url).data["stats"]["max"], 40)
+
+        self.publish([10, 20, 30, 90])
+        response = self.client.get(url)
+        self.assertEqual(response.data["stats"]["max"], 90)
+        self.assertEqual(response.data["stats"]["mean"], 37.5)
+
+    def test_students_cannot_see_analytics(self):
+        self.client.force_authenticate(self.students[0])
+        response = self.client.get(f"/api/exams/{self.exam.id}/analytics/")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class RankTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.students = User.objects.bulk_create(
+            User(username=f"student{i}") for i in range(4)
+        )
+        self.class_obj = Class.objects.create(name="S8 CSE", description="Eighth semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=self.class_obj, role=UserRole.TEACHER
+        )
+        ClassTeaching.objects.bulk_create(
+            ClassTeaching(user=student, class_taught=self.class_obj, role=UserRole.STUDENT)
+            for student in self.students
+        )
+        subject = Subject.objects.create(name="Compilers", class_assigned=self.class_obj)
+        self.exams = [
+            Exam.objects.create(name=f"Series {i}", class_assigned=self.class_obj, subject=subject)
+            for i in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def publish(self, exam, marks):
+        results = [
+            {"student_id": student.id, "marks": mark}
+            for student, mark in zip(self.students, marks)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/exams/{exam.id}/publish-results/", {"results": results}, format="json"
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_ties_share_the_best_rank(self):
+        ranked = list(competition_ranks([(1, 90), (2, 80), (3, 80), (4, 70)]))
+
+        self.assertEqual([rank for _, _, rank, _ in ranked], [1, 2, 2, 4])
+        self.assertEqual([percentile for *_, percentile in ranked], [87.5, 50.0, 50.0, 12.5])
+
+    def test_publishing_materializes_exam_and_class_ranks(self):
+        self.publish(self.exams[0], [40, 90, 60, 70])
+        self.publish(self.exams[1], [95, 10, 60, 70])
+
+        response = self.client.get(f"/api/exams/{self.exams[0].id}/ranks/", {"page_size": 2})
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(
+            [row["student_name"] for row in response.data["results"]], ["student1", "student3"]
+        )
+
+        response = self.client.get(f"/api/class/{self.class_obj.id}/ranks/")
+        self.assertEqual(
+            [(row["student_name"], row["total_marks"]) for row in response.data["results"]],
+            [("student3", 140), ("student0", 135), ("student2", 120), ("student1", 100)],
+        )
+
+    def test_failed_rank_refresh_does_not_fail_the_publish(self):
+        with mock.patch("api.ranks.recompute_exam_ranks", side_effect=RuntimeError("boom")):
+            with self.assertLogs(level="ERROR"):
+                self.publish(self.exams[0], [40, 90, 60, 70])
+
+        self.assertEqual(StudentExamResult.objects.filter(exam=self.exams[0]).count(), 4)
+
+    def test_failed_deferred_refresh_is_logged(self):
+        with mock.patch("api.ranks.recompute_exam_ranks", side_effect=RuntimeError("boom")):
+            with self.assertLogs("api.ranks", "ERROR"):
+                with deferred_rank_refresh():
+                    schedule_rank_refresh(self.exams[0].id)
+
+    def test_republishing_an_exam_updates_the_class_totals(self):
+        self.publish(self.exams[0], [40, 90, 60, 70])
+        self.publish(self.exams[0], [100, 90, 60, 70])
+
+        student_client = APIClient()
+        student_client.force_authenticate(self.students[0])
+        response = student_client.get(f"/api/class/{self.class_obj.id}/ranks/me/")
+        self.assertEqual((response.data["rank"], response.data["total_marks"]), (1, 100))
+
+        response = student_client.get(f"/api/exams/{self.exams[0].id}/ranks/me/")
+        self.assertEqual((response.data["rank"], response.data["ranked"]), (1, 4))
+
+    def test_students_cannot_list_ranks(self):
+        self.client.force_authenticate(self.students[0])
+
+        self.assertEqual(self.client.get(f"/api/exams/{self.exams[0].id}/ranks/").status_code, 403)
+        self.assertEqual(self.client.get(f"/api/class/{self.class_obj.id}/ranks/").status_code, 403)
+
+
+class StudentExamResultTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.students = User.objects.bulk_create(
+            User(username=f"student{i}") for i in range(3)
+        )
+        class_obj = Class.objects.create(name="S3 IT", description="Third semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=class_obj, role=UserRole.TEACHER
+        )
+        subject = Subject.objects.create(name="Databases", class_assigned=class_obj)
+        self.exam = Exam.objects.create(name="Series 1", class_assigned=class_obj, subject=subject)
+        self.exam_result = ExamResult.objects.create(Exam=self.exam)
+
+    def test_rows_are_upserted_in_step_with_the_blob(self):
+        self.exam_result.add_student_results(
+            [(student, 60, "B") for student in self.students]
+        )
+        self.exam_result.add_student_results([(self.students[0], 95, "A+")])
+
+        rows = StudentExamResult.objects.filter(exam=self.exam)
+        self.assertEqual(rows.count(), 3)
+        self.assertEqual(
+            rows.values_list("marks", "grade").get(student=self.students[0]), (95, "A+")
+        )
+        self.exam_result.refresh_from_db()
+        self.assertEqual(self.exam_result.results[str(self.students[0].id)]["marks"], 95)
+
+    def test_teacher_sheet_is_read_from_the_rows(self):
+        self.exam_result.add_student_results(
+            [(student, 50 + i, "B") for i, student in enumerate(self.students)]
+        )
+        # The blob is no longer read; clearing it leaves the sheet intact
+        ExamResult.objects.filter(pk=self.exam_result.pk).update(results={})
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+
+        # Exam with subject, the teacher's roles and the result rows
+        with self.assertNumQueries(3):
+            response = client.get(f"/api/view-exam-results/{self.exam.id}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["marks"] for row in response.data["results"].values()], [50, 51, 52]
+        )
+
+    def test_non_numeric_marks_are_rejected_per_row(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        response = client.post(
+            f"/api/exams/{self.exam.id}/publish-results/",
+            {"results": [
+                {"student_id": self.students[0].id, "marks": "seventy"},
+                {"student_id": self.students[1].id, "marks": 70},
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["errors"][0]["error"], "Marks must be a number.")
+        self.assertFalse(
+            StudentExamResult.objects.filter(student=self.students[0]).exists()
+        )
+
+
+    def test_boolean_and_non_finite_marks_are_rejected_per_row(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        for i, marks in enumerate(("nan", "inf", "-Infinity", True)):
+            with self.subTest(marks=marks):
+                response = client.post(
+                    f"/api/exams/{self.exam.id}/publish-results/",
+                    {"results": [
+                        {"student_id": self.students[0].id, "marks": marks},
+                        # A changed mark each time, so every post publishes
+                        {"student_id": self.students[1].id, "marks": 70 + i},
+                    ]},
+                    format="json",
+                )
+
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(
+                    response.data["errors"],
+                    [{"row": 0, "student_id": self.students[0].id,
+                      "error": "Marks must be a number."}],
+                )
+                self.assertFalse(
+                    StudentExamResult.objects.filter(student=self.students[0]).exists()
+                )
+
+    def test_out_of_range_marks_are_rejected_per_row(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        response = client.post(
+            f"/api/exams/{self.exam.id}/publish-results/",
+            {"results": [
+                {"student_id": self.students[0].id, "marks": 1e308},
+                {"student_id": self.students[1].id, "marks": -5},
+                {"student_id": self.students[2].id, "marks": 1000},
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [(error["row"], error["error"]) for error in response.data["errors"]],
+            [(0, "Marks must be between 0 and 1000."), (1, "Marks must be between 0 and 1000.")],
+        )
+        analytics_response = client.get(f"/api/exams/{self.exam.id}/analytics/")
+        self.assertEqual(analytics_response.status_code, 200)
+        self.assertEqual(analytics_response.data["stats"]["max"], 1000)
+
+    def test_invalid_student_ids_are_rejected_per_row(self):
+        client = APIClient()
+        client.force_authenticate(self.teacher)
+        response = client.post(
+            f"/api/exams/{self.exam.id}/publish-results/",
+            {"results": [
+                {"student_id": True, "marks": 50},
+                {"student_id": self.students[0].id + 0.5, "marks": 50},
+                {"student_id": "99999999999999999999", "marks": 50},
+                {"student_id": self.students[1].id, "marks": 50},
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [(error["row"], error["error"]) for error in response.data["errors"]],
+            [(row, "A valid student_id is required.") for row in range(3)],
+        )
+        self.assertEqual(
+            list(StudentExamResult.objects.values_list("student_id", flat=True)),
+            [self.students[1].id],
+        )
+
+class PublishExamResultsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.students = User.objects.bulk_create(
+            User(username=f"student{i}") for i in range(30)
+        )
+        self.class_obj = Class.objects.create(name="S2 EE", description="Second semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=self.class_obj, role=UserRole.TEACHER
+        )
+        self.subject = Subject.objects.create(name="Circuits", class_assigned=self.class_obj)
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def publish(self, students):
+        exam = Exam.objects.create(
+            name="Series", class_assigned=self.class_obj, subject=self.subject
+        )
+        sheet = [{"student_id": student.id, "marks": 40, "grade": "C"} for student in students]
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    f"/api/exams/{exam.id}/publish-results/", {"results": sheet}, format="json"
+                )
+        self.assertEqual(response.status_code, 201)
+        return exam, len(queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_the_sheet(self):
+        # The first publish also creates the class's merit list
+        self.publish(self.students)
+        _, small = self.publish(self.students[:3])
+        exam, large = self.publish(self.students)
+
+        self.assertEqual(small, large)
+        self.assertEqual(ExamResult.objects.get(Exam=exam).results.keys(), {
+            str(student.id) for student in self.students
+        })
+
+    def test_bad_rows_are_reported_without_blocking_the_rest(self):
+        exam = Exam.objects.create(
+            name="Series", class_assigned=self.class_obj, subject=self.subject
+        )
+        sheet = [
+            {"student_id": self.students[0].id, "marks": 70, "grade": "A"},
+            {"marks": 50},
+            {"student_id": 999999, "marks": 50},
+        ]
+        response = self.client.post(
+            f"/api/exams/{exam.id}/publish-results/", {"results": sheet}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["published"], 1)
+        self.assertEqual(
+            [(error["row"], error["error"]) for error in response.data["errors"]],
+            [(1, "A valid student_id is required."), (2, "Student not found.")],
+        )
+
+    def test_sheet_with_no_valid_rows_is_rejected(self):
+        exam = Exam.objects.create(
+            name="Series", class_assigned=self.class_obj, subject=self.subject
+        )
+        response = self.client.post(
+            f"/api/exams/{exam.id}/publish-results/",
+            {"results": [{"student_id": 999999}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExamResult.objects.filter(Exam=exam).exists())
+
+
+class PublishDiffTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pass")
+        self.students = User.objects.bulk_create(
+            User(username=f"student{i}") for i in range(10)
+        )
+        class_obj = Class.objects.create(name="S4 CE", description="Fourth semester")
+        ClassTeaching.objects.create(
+            user=self.teacher, class_taught=class_obj, role=UserRole.TEACHER
+        )
+        subject = Subject.objects.create(name="Surveying", class_assigned=class_obj)
+        self.exam = Exam.objects.create(name="Series 1", class_assigned=class_obj, subject=subject)
+        self.url = f"/api/exams/{self.exam.id}/publish-results/"
+        self.sheet = [
+            {"student_id": student.id, "marks": 50 + i, "grade": "B"}
+            for i, student in enumerate(self.students)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+        self.publish()
+
+    def publish(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {"results": self.sheet}, format="json")
+
+    def test_unchanged_sheet_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.publish()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["changed"], response.data["unchanged"]), (0, 10))
+        writes = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")
+        ]
+        self.assertEqual(writes, [])
+        self.assertEqual(ResultChangeLog.objects.count(), 1)
+
+    def test_non_text_and_long_grades_are_rejected_per_row(self):
+        self.sheet[0]["grade"] = 7
+        self.sheet[1]["grade"] = {"letter": "A"}
+        self.sheet[2]["grade"] = "A" * 11
+        response = self.publish()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [0, 1, 2])
+        self.assertEqual((response.data["changed"], response.data["unchanged"]), (0, 7))
+        self.assertEqual(
+            StudentExamResult.objects.get(student=self.students[0]).grade, "B"
+        )
+
+    def test_only_changed_rows_are_applied_and_logged(self):
+        self.sheet[0]["marks"] = 99
+        self.sheet[4]["grade"] = "A"
+        # A repeated student keeps their last entry
+        self.sheet.append({"student_id": self.students[7].id, "marks": 10, "grade": "F"})
+        response = self.publish()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["changed"], 3)
+        log = ResultChangeLog.objects.latest("id")
+        self.assertEqual(log.changed_rows, 3)
+        self.assertEqual(log.changed_by, self.teacher)
+        self.assertEqual(log.changes[str(self.students[0].id)], {"marks": [50, 99]})
+        self.assertEqual(log.changes[str(self.students[4].id)], {"grade": ["B", "A"]})
+        self.assertEqual(
+            StudentExamResult.objects.get(student=self.students[7]).marks, 10
+        )
+        self.assertEqual(
+            ExamResult.objects.get(Exam=self.exam).results[str(self.students[7].id)]["grade"],
+            "F",
+        )
+
+    def test_async_publish_runs_in_chunks_with_row_errors(self):
+        self.sheet[0]["marks"] = 99
+        self.sheet.append({"student_id": self.students[1].id, "marks": "absent"})
+        self.sheet.append({"student_id": 999999, "marks": 10})
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                f"{self.url}?async=true", {"results": self.sheet}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(callbacks), 1)
+        job_id = response.data["job"]["id"]
+        self.assertEqual(response.data["job"]["status"], PublishJob.Status.PENDING)
+        self.assertEqual(StudentExamResult.objects.get(student=self.students[0]).marks, 50)
+
+        # Run the worker inline rather than on the pool's own connection
+        with mock.patch("api.publishing.PUBLISH_CHUNK_SIZE", 4):
+            run_publish_job(job_id)
+        # A job only runs once
+        self.assertIsNone(run_publish_job(job_id))
+
+        response = self.client.get(f"/api/publish-jobs/{job_id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], PublishJob.Status.FINISHED)
+        self.assertEqual((response.data["done"], response.data["total"]), (12, 12))
+        self.assertEqual((response.data["changed"], response.data["unchanged"]), (1, 9))
+        self.assertEqual(
+            [(error["row"], error["error"]) for error in response.data["errors"]],
+            [(10, "Marks must be a number."), (11, "Student not found.")],
+        )
+        self.assertEqual(StudentExamResult.objects.get(student=self.students[0]).marks, 99)
+        self.assertEqual(
+            ExamRank.objects.get(exam=self.exam, student=self.students[0]).rank, 1
+        )
+
+        # Only the submitter, the class's teachers and staff can follow a job
+        self.client.force_authenticate(self.students[0])
+        response = self.client.get(f"/api/publish-jobs/{job_id}/")
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(QUERY_METRICS_ENABLED=True)
+class QueryMetricsTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        self.admin = User.objects.create_superuser(username="admin", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_responses_carry_server_timing(self):
+        response = self.client.get("/api/metrics/queries/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(
+            response["Server-Timing"], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$'
+        )
+
+    def test_routes_are_summarised_for_admins(self):
+        self.client.get("/api/metrics/queries/")
+        response = self.client.get("/api/metrics/queries/")
+
+        summary = response.data["routes"]["GET /api/metrics/queries/"]
+        self.assertEqual(summary["requests"], 1)
+        self.assertEqual(sum(summary["wall_ms_histogram"].values()), 1)
+
+        self.assertEqual(self.client.delete("/api/metrics/queries/").status_code, 204)
+        response = self.client.get("/api/metrics/queries/")
+        self.assertNotIn("GET /api/metrics/queries/", response.data["routes"])
+
+    def test_non_admins_are_refused(self):
+        student = User.objects.create_user(username="student", password="pass")
+        self.client.force_authenticate(student)
+
+        self.assertEqual(self.client.get("/api/metrics/queries/").status_code, 403)
+
+    @override_settings(QUERY_METRICS_ENABLED=False)
+    def test_disabled_metrics_are_not_found(self):
+        response = self.client.get("/api/metrics/queries/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(self.client.delete("/api/metrics/queries/").status_code, 404)
+
+    def test_streamed_responses_are_recorded_once_consumed(self):
+        PlacementProfile.objects.create(
+            user=self.admin, cgpa=8, percentage_10th=80, percentage_12th=80,
+            is_placement_coordinator=True,
+        )
+        route = "GET /api/placement/applications/export/"
+
+        response = self.client.get("/api/placement/applications/export/")
+        self.assertNotIn(route, route_summaries())
+
+        with CaptureQueriesContext(connection) as queries:
+            b"".join(response.streaming_content)
+        self.assertNotIn("Server-Timing", response)
+        summary = route_summaries()[route]
+        self.assertEqual(summary["requests"], 1)
+        self.assertGreaterEqual(summary["queries"]["max"], len(queries.captured_queries))
+
+    def test_async_views_stay_async_and_are_recorded(self):
+        async def view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(QueryMetricsMiddleware(view)))
+
+        cache.clear()
+        PlacementProfile.objects.create(
+            user=self.admin, cgpa=8, percentage_10th=80, percentage_12th=80
+        )
+        token = ClaimsRefreshToken.for_user(self.admin).access_token
+        response = async_to_sync(self.async_client.get)(
+            "/api/async/placement/student/company/",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        # The auth state, the profile and the companies, run by the async ORM
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+        summary = route_summaries()["GET /api/async/placement/student/company/"]
+        self.assertEqual(summary["queries"]["max"], 3)
+
+    def test_duplicate_fingerprints_are_capped(self):
+        metrics = RouteMetrics()
+        metrics.record(1, 3, 1, {"SELECT worst": 10})
+        for i in range(QUERY_METRICS_DUPLICATES * 2):
+            metrics.record(1, 2, 1, {f"SELECT {i}": 2})
+
+        self.assertEqual(len(metrics.duplicates), QUERY_METRICS_DUPLICATES)
+        self.assertEqual(
+            metrics.summary()["duplicate_queries"][0],
+            {"sql": "SELECT worst", "max_repeats": 10},
+        )
+
+
+class PlacementTestData(TestCase):
+    """Three students with profiles, four companies and their applications."""
+
+    def setUp(self):
+        self.students = User.objects.bulk_create(
+            User(username=f"student{i}", email=f"student{i}@example.com") for i in range(3)
+        )
+        self.profiles = PlacementProfile.objects.bulk_create(
+            PlacementProfile(
+                user=student, cgpa=6 + i, percentage_10th=80, percentage_12th=80
+            )
+            for i, student in enumerate(self.students)
+        )
+        self.companies = PlacementCompany.objects.bulk_create(
+            PlacementCompany(
+                name=f"Company {i}", job_description="SDE", min_cgpa=5 + i,
+                min_10th=60, min_12th=60, max_backlogs=0, package=10,
+            )
+            for i in range(4)
+        )
+        self.client = APIClient()
+
+    def apply(self, student, company):
+        profile = PlacementProfile.objects.get(user=student)
+        return PlacementApplication.objects.create(
+            user=student,
+            company=company,
+            other_details=PlacementProfileSerializer(profile).data,
+        )
+
+
+class PlacementStudentCompanyTests(PlacementTestData):
+    def test_flags_are_annotated_in_two_queries(self):
+        # student1 has a CGPA of 7: eligible for companies 0-2
+        self.apply(self.students[1], self.companies[2])
+        self.client.force_authenticate(self.students[1])
+
+        # The profile, then the companies with both flags
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/placement/student/company/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["is_eligible"], row["applied"]) for row in response.data],
+            [(True, False), (True, False), (True, True), (False, False)],
+        )
+
+    def test_student_without_a_profile(self):
+        outsider = User.objects.create_user(username="outsider", password="pass")
+        self.client.force_authenticate(outsider)
+
+        response = self.client.get("/api/placement/student/company/")
+        self.assertEqual(response.status_code, 404)
+
+
+class PlacementUniquenessTests(PlacementTestData):
+    def test_repeat_application_is_rejected(self):
+        self.client.force_authenticate(self.students[2])
+        payload = {"company_id": self.companies[0].id}
+
+        self.assertEqual(
+            self.client.post("/api/placement/apply/", payload, format="json").status_code, 201
+        )
+        response = self.client.post("/api/placement/apply/", payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            PlacementApplication.objects.filter(user=self.students[2]).count(), 1
+        )
+
+    def test_second_profile_is_rejected(self):
+        self.client.force_authenticate(self.students[0])
+
+        response = self.client.post(
+            "/api/placement/profile/",
+            {"cgpa": 9, "percentage_10th": 90, "percentage_12th": 90},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PlacementProfile.objects.get(user=self.students[0]).cgpa, 6)
+
+
+class PlacementApplicationListTests(PlacementTestData):
+    def setUp(self):
+        super().setUp()
+        self.company = self.companies[0]
+        applicants = User.objects.bulk_create(
+            User(username=f"applicant{i}") for i in range(7)
+        )
+        self.applications = PlacementApplication.objects.bulk_create(
+            PlacementApplication(user=user, company=self.company, other_details={"cgpa": 8})
+            for user in applicants
+        )
+        self.url = f"/api/placement/company/{self.company.id}/applications/"
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.append([row["id"] for row in response.data["results"]])
+            url = response.data["next"]
+        return ids
+
+    def test_cursor_pages_cover_every_application_once(self):
+        pages = self.walk(f"{self.url}?page_size=3")
+
+        expected = sorted(application.id for application in self.applications)
+        self.assertEqual(pages, [expected[:3], expected[3:6], expected[6:]])
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get(f"{self.url}?page_size=3")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_pages_are_stable_while_applications_arrive(self):
+        first = self.client.get(f"{self.url}?page_size=3")
+        # A new applicant and a withdrawal on the first page shift nothing
+        late = User.objects.create_user(username="late", password="pass")
+        PlacementApplication.objects.create(user=late, company=self.company, other_details={})
+        PlacementApplication.objects.filter(pk=first.data["results"][0]["id"]).delete()
+        second = self.client.get(first.data["next"])
+
+        expected = sorted(application.id for application in self.applications)
+        self.assertEqual([row["id"] for row in second.data["results"]], expected[3:6])
+
+    def test_sparse_fields(self):
+        response = self.client.get(f"{self.url}?fields=id,other_details")
+
+        self.assertEqual(set(response.data["results"][0]), {"id", "other_details"})
+        self.assertEqual(response.data["company"]["id"], self.company.id)
+
+        response = self.client.get(f"{self.url}?fields=id,salary")
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_company(self):
+        response = self.client.get("/api/placement/company/999999/applications/")
+        self.assertEqual(response.status_code, 404)
+
+
+class PlacementExportTests(PlacementTestData):
+    def setUp(self):
+        super().setUp()
+        PlacementProfile.objects.filter(user=self.students[0]).update(
+            is_placement_coordinator=True
+        )
+        self.first = self.apply(self.students[1], self.companies[0])
+        self.second = self.apply(self.students[2], self.companies[1])
+        self.client.force_authenticate(self.students[0])
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_has_a_header_and_detail_columns(self):
+        response, body = self.export("/api/placement/applications/export/")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="applications-all.csv"'
+        )
+        header, *rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(header, COLUMNS)
+        self.assertEqual([row[0] for row in rows], [str(self.first.id), str(self.second.id)])
+        row = dict(zip(header, rows[0]))
+        self.assertEqual(
+            (row["username"], row["email"], row["company"], row["cgpa"]),
+            ("student1", "student1@example.com", "Company 0", "7.0"),
+        )
+
+    def test_ndjson_for_one_company(self):
+        response, body = self.export(
+            f"/api/placement/company/{self.companies[1].id}/applications/export/?type=ndjson"
+        )
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["application_id"], self.second.id)
+        self.assertEqual(rows[0]["percentage_10th"], 80)
+
+    def test_only_coordinators_can_export(self):
+        self.client.force_authenticate(self.students[1])
+        response = self.client.get("/api/placement/applications/export/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_type(self):
+        response = self.client.get("/api/placement/applications/export/?type=xlsx")
+        self.assertEqual(response.status_code, 400)
+
+
+def jpeg_bytes(color, size=(8, 8)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class StubImageHandler(BaseHTTPRequestHandler):
+    # Maps request paths to image bytes; anything else is a 404
+    images = {}
+
+    def do_GET(self):
+        content = self.images.get(self.path)
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ImageVariantsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def teacher(self, name, image):
+        teacher = Teacher.objects.create(
+            name=name, profession="Professor", qualifications="PhD", experience=5
+        )
+        self.set_image(teacher, image)
+        return teacher
+
+    def set_image(self, teacher, image):
+        if image is None:
+            teacher.image = None
+            teacher.save()
+        else:
+            teacher.image.save(f"{teacher.name}.jpg", ContentFile(image))
+        generate_image_variants(Teacher, teacher.pk)
+        teacher.refresh_from_db()
+        return teacher.image_variants
+
+    def test_widths_are_the_real_derivative_widths(self):
+        variants = self.teacher("A", jpeg_bytes("red", (300, 150))).image_variants
+
+        # 512 would upscale, so the largest derivative is the source width
+        self.assertEqual(sorted(variants["sizes"], key=int), ["96", "256", "300"])
+        for width, formats in variants["sizes"].items():
+            for name in formats.values():
+                with default_storage.open(name) as image_file:
+                    self.assertEqual(Image.open(image_file).width, int(width))
+        srcset = TeacherSerializer(Teacher.objects.get(name="A")).data["image_srcset"]
+        self.assertTrue(srcset["srcset"]["webp"].endswith("300.webp 300w"))
+
+        # A portrait is fitted by height, so its widths are narrower than the boxes
+        portrait = self.teacher("B", jpeg_bytes("red", (200, 400))).image_variants
+        self.assertEqual(sorted(portrait["sizes"], key=int), ["48", "128", "200"])
+
+    def test_derivatives_are_named_by_content_hash_and_shared(self):
+        image = jpeg_bytes("blue", (600, 600))
+        first = self.teacher("A", image).image_variants
+        second = self.teacher("B", image).image_variants
+
+        content_hash = hashlib.sha256(image).hexdigest()
+        self.assertEqual(first["hash"], content_hash)
+        self.assertEqual(
+            first["sizes"]["256"]["webp"],
+            f"derivatives/{content_hash[:2]}/{content_hash}/256.webp",
+        )
+        self.assertEqual(first["sizes"], second["sizes"])
+
+    def test_unused_derivatives_are_deleted(self):
+        shared = jpeg_bytes("green", (600, 600))
+        first = self.teacher("A", shared)
+        second = self.teacher("B", shared)
+        old_names = derivative_names(first.image_variants)
+
+        # Still used by B
+        self.set_image(first, jpeg_bytes("white", (600, 600)))
+        self.assertTrue(all(default_storage.exists(name) for name in old_names))
+
+        self.assertEqual(self.set_image(second, None), {})
+        self.assertFalse(any(default_storage.exists(name) for name in old_names))
+        self.assertTrue(
+            all(default_storage.exists(name) for name in derivative_names(first.image_variants))
+        )
+
+
+class DirectoryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = Teacher.objects.create(
+            name="A. Kumar", profession="Professor", qualifications="PhD",
+            experience=12, branch="CSE",
+        )
+        self.client = APIClient()
+
+    def test_conditional_requests_get_304(self):
+        response = self.client.get("/api/teachers/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=0, must-revalidate")
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response = self.client.get("/api/teachers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get("/api/teachers/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_repeat_requests_are_served_from_the_cache(self):
+        self.client.get(f"/api/teachers/{self.teacher.id}/")
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/api/teachers/{self.teacher.id}/")
+        self.assertEqual(response.data["name"], "A. Kumar")
+
+    def test_saves_invalidate_once_committed(self):
+        etag = self.client.get("/api/teachers/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.name = "A. K. Kumar"
+            self.teacher.save()
+            # Until the save commits, readers keep the old cached response
+            self.assertEqual(self.client.get("/api/teachers/")["ETag"], etag)
+
+        response = self.client.get("/api/teachers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]["name"], "A. K. Kumar")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.teacher.delete()
+        self.assertEqual(self.client.get("/api/teachers/").data, [])
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["api.E001"])
+
+        shared = {"BACKEND": "django.core.cache.backends.redis.RedisCache"}
+        with override_settings(CACHES={"default": shared}):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class ImportFacultyTests(TestCase):
+    faculty = {
+        "CSE": [
+            {"name": "A", "profession": "HOD", "image": "pics/CSE/01.jpg", "profileLink": "?s=1"},
+            {"name": "B", "profession": "AP", "image": "pics/CSE/02.jpg", "profileLink": "?s=2"},
+        ],
+        "IT": [
+            {"name": "C", "profession": "AP", "image": "pics/IT/missing.jpg", "profileLink": "?s=3"},
+        ],
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubImageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/"
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        StubImageHandler.images = {
+            "/pics/CSE/01.jpg": jpeg_bytes("red"),
+            "/pics/CSE/02.jpg": jpeg_bytes("blue"),
+        }
+
+    def run_import(self):
+        return import_faculty(
+            faculty=self.faculty, base_url=self.base_url, workers=2, timeout=2, retries=0
+        )
+
+    def test_import_creates_teachers_and_reports_failures(self):
+        summary = self.run_import()
+
+        self.assertEqual(summary["created"], 3)
+        self.assertEqual(len(summary["errors"]), 1)
+        self.assertEqual(Teacher.objects.count(), 3)
+        self.assertTrue(Teacher.objects.get(name="A").image)
+        self.assertFalse(Teacher.objects.get(name="C").image)
+
+    def test_reimport_is_idempotent_and_skips_unchanged_images(self):
+        self.run_import()
+        image_name = Teacher.objects.get(name="A").image.name
+
+        StubImageHandler.images["/pics/CSE/02.jpg"] = jpeg_bytes("green")
+        summary = self.run_import()
+
+        self.assertEqual(summary["created"], 0)
+        self.assertEqual(summary["updated"], 1)
+        self.assertEqual(Teacher.objects.count(), 3)
+        self.assertEqual(Teacher.objects.get(name="A").image.name, image_name)
+
+
+class BenchmarkCompareTests(TestCase):
+    baseline = {"fake": [{"mode": "bulk", "rows": 10, "queries": 10, "ms": 100.0}]}
+
+    def test_regressions_beyond_the_threshold_are_reported(self):
+        within = {"fake": [{"mode": "bulk", "rows": 10, "queries": 12, "ms": 120.0}]}
+        beyond = {"fake": [{"mode": "bulk", "rows": 10, "queries": 13, "ms": 200.0}]}
+
+        self.assertEqual(find_regressions(self.baseline, within, 0.25), [])
+        self.assertEqual(
+            find_regressions(self.baseline, beyond, 0.25),
+            [
+                "fake {'mode': 'bulk', 'rows': 10}: queries 10.00 -> 13.00",
+                "fake {'mode': 'bulk', 'rows': 10}: ms 100.00 -> 200.00",
+            ],
+        )
+
+    def test_noise_and_unmatched_rows_are_ignored(self):
+        baseline = {"fake": [{"mode": "bulk", "rows": 10, "ms": 1.0}]}
+        report = {
+            "fake": [
+                {"mode": "bulk", "rows": 10, "ms": 3.0},
+                {"mode": "bulk", "rows": 100, "ms": 900.0},
+            ],
+            "new": [{"mode": "bulk", "ms": 900.0}],
+        }
+
+        self.assertEqual(find_regressions(baseline, report, 0.25), [])
+
+    def run_compare(self, rows, baseline_text, benchmark=None):
+        benchmark = benchmark or mock.Mock(return_value=rows)
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as baseline_file:
+            baseline_file.write(baseline_text)
+        self.addCleanup(os.remove, baseline_file.name)
+        with mock.patch.dict(BENCHMARKS, {"fake": benchmark}), mock.patch(
+            "api.management.commands.benchmark.test_database", contextlib.nullcontext
+        ):
+            call_command("benchmark", "fake", compare=baseline_file.name, stdout=io.StringIO())
+        return benchmark
+
+    def test_compare_fails_with_command_error(self):
+        rows = [{"mode": "bulk", "rows": 10, "queries": 40, "ms": 100.0}]
+
+        with self.assertRaisesMessage(CommandError, "1 regression(s) against the baseline"):
+            self.run_compare(rows, json.dumps(self.baseline))
+        self.run_compare(self.baseline["fake"], json.dumps(self.baseline))
+
+    def test_unreadable_baseline_fails_before_running(self):
+        benchmark = mock.Mock(return_value=[])
+        for text in ("not json", "[]"):
+            with self.subTest(baseline=text):
+                with self.assertRaises(CommandError):
+                    self.run_compare([], text, benchmark)
+        benchmark.assert_not_called()
+        with self.assertRaisesMessage(CommandError, "Cannot read baseline"):
+            call_command("benchmark", "jwt_auth", compare="/nonexistent/baseline.json")
+
+
+class SeedCollegeTests(TestCase):
+    def test_counts_match_the_seeded_rows(self):
+        sample = seed_college(
+            students=6, teachers=2, classes=2, subjects_per_class=2,
+            exams_per_subject=2, companies=3, applications_per_student=2, prefix="t",
+        )
+
+        counts = sample["counts"]
+        self.assertEqual(
+            counts,
+            {
+                "users": 8, "classes": 2, "subjects": 4, "exams": 8,
+                "student_results": 24, "companies": 3, "applications": 12,
+            },
+        )
+        self.assertEqual(User.objects.count(), counts["users"])
+        self.assertEqual(Subject.objects.count(), counts["subjects"])
+        self.assertEqual(Exam.objects.count(), counts["exams"])
+        self.assertEqual(StudentExamResult.objects.count(), counts["student_results"])
+        self.assertEqual(ExamRank.objects.count(), counts["student_results"])
+        self.assertEqual(PlacementApplication.objects.count(), counts["applications"])
+        # Two teachers per class and every student in exactly one class
+        self.assertEqual(ClassTeaching.objects.count(), 2 * 2 + 6)
+        self.assertTrue(
+            ClassTeaching.objects.filter(
+                user=sample["student"], class_taught=sample["class"], role=UserRole.STUDENT
+            ).exists()
+        )
+        self.assertEqual(sample["exam"].class_assigned_id, sample["class"].id)
+
+class BenchmarkSmokeTests(TransactionTestCase):
+    # Every registered benchmark, shrunk to run in seconds
+    small_runs = {
+        "analytics": {"students": 5, "repeat": 1},
+        "asgi_concurrency": {"total": 2, "concurrency": (1, 2), "scale": 0.01},
+        "db_throughput": {"threads": 2, "duration": 0.2},
+        "endpoints": {"iterations": 1, "scale": 0.01},
+        "jwt_auth": {"repeat": 2},
+        "login": {"users": 3, "repeat": 1, "threads": 1, "duration": 0.1},
+        "lookup_indexes": {"repeat": 1, "users": 300},
+        "publish_results": {"sizes": (3,), "legacy_limit": 3},
+        "student_result": {"sizes": (3,), "repeat": 1},
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_benchmark_runs(self):
+        self.assertEqual(set(self.small_runs), set(BENCHMARKS))
+        for name, kwargs in sorted(self.small_runs.items()):
+            with self.subTest(benchmark=name):
+                rows = BENCHMARKS[name](**kwargs)
+                self.assertTrue(rows)
+
+
+class LookupConstraintMigrationTests(TransactionTestCase):
+    before = [("api", "0025_image_variants")]
+    after = [("api", "0026_lookup_indexes_and_constraints")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_duplicates_are_removed_before_the_constraints(self):
+        self.addCleanup(call_command, "migrate", verbosity=0)
+        old_apps = self.migrate(self.before)
+        OldUser = old_apps.get_model("auth", "User")
+        student, other = OldUser.objects.bulk_create(
+            [OldUser(username="student"), OldUser(username="other")]
+        )
+        class_obj = old_apps.get_model("api", "Class").objects.create(name="S5", description="")
+        memberships = old_apps.get_model("api", "ClassTeaching").objects
+        memberships.create(user_id=student.id, class_taught=class_obj, role="Student")
+        memberships.create(user_id=student.id, class_taught=class_obj, role="Teacher")
+        memberships.create(user_id=other.id, class_taught=class_obj, role="Student")
+        company = old_apps.get_model("api", "PlacementCompany").objects.create(
+            name="Acme", job_description="SDE", min_cgpa=5, min_10th=60,
+            min_12th=60, max_backlogs=0, package=10,
+        )
+        applications = old_apps.get_model("api", "PlacementApplication").objects
+        first = applications.create(user_id=student.id, company=company, other_details={})
+        applications.create(user_id=student.id, company=company, other_details={})
+        profiles = old_apps.get_model("api", "PlacementProfile").objects
+        kept = profiles.create(user_id=student.id, cgpa=7, percentage_10th=80, percentage_12th=80)
+        profiles.create(
+            user_id=student.id, cgpa=8, percentage_10th=80, percentage_12th=80,
+            is_placement_coordinator=True,
+        )
+
+        new_apps = self.migrate(self.after)
+
+        self.assertEqual(
+            sorted(
+                new_apps.get_model("api", "ClassTeaching").objects.values_list("user_id", "role")
+            ),
+            [(student.id, "Teacher"), (other.id, "Student")],
+        )
+        self.assertEqual(
+            list(new_apps.get_model("api", "PlacementApplication").objects.values_list("id", flat=True)),
+            [first.id],
+        )
+        profile = new_apps.get_model("api", "PlacementProfile").objects.get()
+        self.assertEqual(profile.id, kept.id)
+        self.assertTrue(profile.is_placement_coordinator)
@@ -1,6 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import (
+    AsyncClassDetailView,
+    AsyncPlacementStudentCompanyView,
+    AsyncViewExamResultsView,
+    AsyncViewSubjectExamsView,
+)
 from .views import (
     AddTeacherView,
     PlacementProfileView,
@@ -10,18 +16,30 @@ from .views import (
     LoginView,
     LogoutView,
     TeacherClassesView,
+    StudentDashboardView,
     ClassDetailView,
     AddStudentToClass,
+    BulkAddStudentsToClass,
     AddSubjectToClass,
     CreateExamView,
     PublishExamResultsView,
+    PublishJobStatusView,
     ViewExamResultsView,
+    ViewOwnExamResultView,
+    ExamAnalyticsView,
+    ExamRankListView,
+    ExamOwnRankView,
+    ClassRankListView,
+    ClassOwnRankView,
     ViewSubjectExamsView,
     PlacementCompanyView,
     PlacementStudentCompanyView,
     PlacementApplyView,
     TeacherCheckView,
-    PlacementApplicationView
+    PlacementApplicationView,
+    PlacementApplicationExportView,
+    JobStatusView,
+    QueryMetricsView,
 )
 
 router = DefaultRouter()
@@ -31,22 +49,40 @@ router.register(r'research', ResearchViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('placement/company/<int:company_id>/applications/', PlacementApplicationView.as_view(), name="placement_applications"),
+    path('placement/company/<int:company_id>/applications/export/', PlacementApplicationExportView.as_view(), name="placement_applications_export"),
+    path('placement/applications/export/', PlacementApplicationExportView.as_view(), name="placement_all_applications_export"),
     path('placement/company/', PlacementCompanyView.as_view(), name="placement_company_view"),
     path('placement/student/company/', PlacementStudentCompanyView.as_view(), name="placement_student_view"),
     path('placement/apply/', PlacementApplyView.as_view(), name="placement_apply_view"),
     path('class/<int:class_id>/role/', TeacherCheckView.as_view()),
     path('placement/profile/', PlacementProfileView.as_view(), name="placement_views"),
     path('view-exam-results/<int:exam_id>/', ViewExamResultsView.as_view(), name='view_exam_results'),
+    path('view-exam-results/<int:exam_id>/me/', ViewOwnExamResultView.as_view(), name='view_own_exam_result'),
     path('subjects/<int:subject_id>/exams/', ViewSubjectExamsView.as_view(), name='view_exam_results'),
+    path('exams/<int:exam_id>/analytics/', ExamAnalyticsView.as_view(), name='exam_analytics'),
+    path('exams/<int:exam_id>/ranks/', ExamRankListView.as_view(), name='exam_ranks'),
+    path('exams/<int:exam_id>/ranks/me/', ExamOwnRankView.as_view(), name='exam_own_rank'),
+    path('class/<int:class_id>/ranks/', ClassRankListView.as_view(), name='class_ranks'),
+    path('class/<int:class_id>/ranks/me/', ClassOwnRankView.as_view(), name='class_own_rank'),
     path('exams/<int:exam_id>/publish-results/', PublishExamResultsView.as_view(), name='publish_exam_results'),
+    path('publish-jobs/<int:job_id>/', PublishJobStatusView.as_view(), name='publish_job_status'),
     path("class/<int:class_id>/<int:subject_id>/add-exam/",  CreateExamView.as_view(), name="add_subject"),
     path("class/<int:class_id>/add-subject/", AddSubjectToClass.as_view(), name="add_subject"),
     path("class/<int:class_id>/add-student/", AddStudentToClass.as_view(), name="add_student"),
+    path("class/<int:class_id>/add-students/", BulkAddStudentsToClass.as_view(), name="add_students"),
     path('class/<int:pk>/details/', ClassDetailView.as_view(), name='class_details'),
     path('teacher/classes/', TeacherClassesView.as_view(), name='teacher_classes'),
+    path('student/dashboard/', StudentDashboardView.as_view(), name='student_dashboard'),
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("add-teachers/", AddTeacherView.as_view(), name="token_refresh"),
+    path("jobs/<str:job_id>/", JobStatusView.as_view(), name="job_status"),
+    path("metrics/queries/", QueryMetricsView.as_view(), name="query_metrics"),
+    # Async variants of hot read endpoints for ASGI deployments
+    path('async/class/<int:pk>/details/', AsyncClassDetailView.as_view(), name='class_details_async'),
+    path('async/subjects/<int:subject_id>/exams/', AsyncViewSubjectExamsView.as_view(), name='view_subject_exams_async'),
+    path('async/view-exam-results/<int:exam_id>/', AsyncViewExamResultsView.as_view(), name='view_exam_results_async'),
+    path('async/placement/student/company/', AsyncPlacementStudentCompanyView.as_view(), name='placement_student_view_async'),
 ]
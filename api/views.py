@@ -1,8 +1,9 @@
 from rest_framework import generics, viewsets, status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import ClaimsRefreshToken
 from django.contrib.auth import get_user_model
 from .models import PlacementApplication, PlacementCompany, PlacementProfile, Teacher, Research
 from .serializers import (
@@ -16,27 +17,55 @@ from .serializers import (
     ClassSerializer,
     UserSerializer,
     SubjectSerializer,
-    ApplicationSerializer
+    ApplicationSerializer,
+    ApplicationListSerializer,
 )
+from .exports import EXPORT_FORMATS, export_applications
+from .middleware import reset_metrics, route_summaries
+from .pagination import ApplicationCursorPagination, ExamPageNumberPagination, RankPagination
+from .permissions import IsClassMember, IsClassTeacher, class_role
 from rest_framework import viewsets, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
-from .models import Teacher, Class, ClassTeaching, UserRole, Subject, Exam, ExamResult
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.exceptions import PermissionDenied
+from .models import Teacher, Class, ClassTeaching, UserRole, Subject, Exam, ExamResult, StudentExamResult, ExamRank, ClassRank, PublishJob
 from django.utils.timezone import get_current_timezone
-import os
-import requests
-from django.core.files.base import ContentFile
+from . import jobs
+from .analytics import exam_statistics
+from .caching import CachedDirectoryMixin
+from .dashboard import get_dashboard
+from .enrollment import (
+    ENROLLED,
+    EnrollmentError,
+    emails_from_request,
+    enroll_students,
+    users_by_email,
+)
+from .faculty import import_faculty
+from .publishing import prepare_entries, publish_results, queue_publish_job
 
 User = get_user_model()
 
 
-class TeacherViewSet(viewsets.ModelViewSet):
+class TeacherViewSet(CachedDirectoryMixin, viewsets.ModelViewSet):
     queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Optional ?branch=CSE filter for the department pages
+        branch = self.request.query_params.get("branch")
+        if branch:
+            queryset = queryset.filter(branch=branch)
+        return queryset
+
 
-class ResearchViewSet(viewsets.ModelViewSet):
+class ResearchViewSet(CachedDirectoryMixin, viewsets.ModelViewSet):
     queryset = Research.objects.all()
     serializer_class = ResearchSerializer
 
@@ -61,7 +90,7 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data["user"]
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             return Response(
                 {
                     "refresh": str(refresh),
@@ -115,19 +144,12 @@ class TeacherClassesView(APIView):
         return response
 
 
-class TeacherCheckView(APIView):
+class StudentDashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, class_id):
-
-        class_obj = get_object_or_404(Class, pk=class_id)
-        teaching = get_object_or_404(
-            ClassTeaching, class_taught=class_obj, user=request.user)
-        return Response(
-            {
-                "role": teaching.role
-            }
-        )
+    def get(self, request):
+        # Classes with nested subjects, exams and the user's own results
+        return Response(get_dashboard(request.user.id))
 
 
 class TeacherCheckView(APIView):
@@ -135,12 +157,12 @@ class TeacherCheckView(APIView):
 
     def get(self, request, class_id):
 
-        class_obj = get_object_or_404(Class, pk=class_id)
-        teaching = get_object_or_404(
-            ClassTeaching, class_taught=class_obj, user=request.user)
+        role = class_role(request, class_id)
+        if role is None:
+            raise Http404
         return Response(
             {
-                "role": teaching.role
+                "role": role
             }
         )
 
@@ -152,8 +174,10 @@ class ClassDetailView(APIView):
         # Get the class object by primary key
         class_obj = get_object_or_404(Class, pk=pk)
 
-        # Get the teachers associated with the class
-        persons = ClassTeaching.objects.filter(class_taught=class_obj)
+        # Get every member of the class together with their user in one query
+        persons = ClassTeaching.objects.filter(class_taught=class_obj).select_related(
+            "user"
+        )
 
         subjects = Subject.objects.filter(class_assigned=class_obj)
 
@@ -161,8 +185,6 @@ class ClassDetailView(APIView):
         students = []
 
         for person in persons:
-            print(person.role)
-
             if person.role == UserRole.TEACHER:
                 teachers.append(person.user)
 
@@ -189,65 +211,73 @@ class ClassDetailView(APIView):
 
 
 class AddStudentToClass(APIView):
-    permission_classes = [IsAuthenticated]
+    # Only teachers of the class may enroll students
+    permission_classes = [IsAuthenticated, IsClassTeacher]
+    class_permission_message = "You are not authorized to add students to this class."
 
     def post(self, request, class_id):
-        # Get the class object
-        class_obj = get_object_or_404(Class, id=class_id)
-
-        # Check if the requesting user is a teacher in this class
-        if not ClassTeaching.objects.filter(
-            user=request.user, class_taught=class_obj, role=UserRole.TEACHER
-        ).exists():
-            return Response(
-                {"error": "You are not authorized to add students to this class."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-
         # Get the student email from request data
         student_email = request.data.get("student_email")
-        if not student_email:
+        if not isinstance(student_email, str) or not student_email.strip():
             return Response(
                 {"error": "Student email is required."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get the student object
-        student = get_object_or_404(User, email=student_email)
+        # Same case-insensitive match as bulk enrollment; the oldest account wins
+        student = users_by_email([student_email.strip()]).first()
+        if student is None:
+            return Response(
+                {"error": "Student not found."}, status=status.HTTP_404_NOT_FOUND
+            )
 
-        # Check if the user is already enrolled
-        if ClassTeaching.objects.filter(user=student, class_taught=class_obj).exists():
+        # Enroll the student; the unique membership constraint rejects repeats
+        try:
+            with transaction.atomic():
+                ClassTeaching.objects.create(
+                    user=student, class_taught_id=class_id, role=UserRole.STUDENT
+                )
+        except IntegrityError:
             return Response(
                 {"error": "Student is already enrolled in this class."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Enroll the student
-        ClassTeaching.objects.create(
-            user=student, class_taught=class_obj, role=UserRole.STUDENT
-        )
-
         return Response(
             {"message": "Student added successfully to the class."},
             status=status.HTTP_201_CREATED,
         )
 
 
-class AddSubjectToClass(APIView):
-    permission_classes = [IsAuthenticated]
+class BulkAddStudentsToClass(APIView):
+    # Only teachers of the class may enroll students
+    permission_classes = [IsAuthenticated, IsClassTeacher]
+    class_permission_message = "You are not authorized to add students to this class."
 
     def post(self, request, class_id):
-        # Get the class object
-        class_obj = get_object_or_404(Class, id=class_id)
+        # Accepts {"student_emails": [...]} or a CSV upload in "file"
+        try:
+            emails = emails_from_request(request)
+        except EnrollmentError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = enroll_students(class_id, emails)
+        enrolled = sum(row["status"] == ENROLLED for row in results)
+        return Response(
+            {
+                "message": f"{enrolled} student(s) added to the class.",
+                "enrolled": enrolled,
+                "results": results,
+            },
+            status=status.HTTP_201_CREATED if enrolled else status.HTTP_200_OK,
+        )
 
-        # Check if the user is a teacher in this class
-        if not ClassTeaching.objects.filter(
-            user=request.user, class_taught=class_obj, role=UserRole.TEACHER
-        ).exists():
-            return Response(
-                {"error": "You are not authorized to add subjects to this class."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
 
+class AddSubjectToClass(APIView):
+    # Only teachers of the class may add subjects
+    permission_classes = [IsAuthenticated, IsClassTeacher]
+    class_permission_message = "You are not authorized to add subjects to this class."
+
+    def post(self, request, class_id):
         # Get the subject data from the request
         subject_name = request.data.get("name")
         subject_description = request.data.get("description", "")
@@ -261,7 +291,7 @@ class AddSubjectToClass(APIView):
 
         # Create a new subject and associate it with the class
         subject = Subject.objects.create(
-            name=subject_name, description=subject_description, class_assigned=class_obj
+            name=subject_name, description=subject_description, class_assigned_id=class_id
         )
 
         return Response(
@@ -274,21 +304,13 @@ class AddSubjectToClass(APIView):
 
 
 class CreateExamView(APIView):
-    permission_classes = [IsAuthenticated]
+    # Only teachers of the class may create exams
+    permission_classes = [IsAuthenticated, IsClassTeacher]
+    class_permission_message = "You are not authorized to create an exam for this class."
 
     def post(self, request, class_id, subject_id):
-        # Get the class and subject objects
-        class_obj = get_object_or_404(Class, id=class_id)
-        subject_obj = get_object_or_404(Subject, id=subject_id)
-
-        # Check if the user is a teacher for the specified class
-        if not ClassTeaching.objects.filter(
-            user=request.user, class_taught=class_obj, role=UserRole.TEACHER
-        ).exists():
-            return Response(
-                {"error": "You are not authorized to create an exam for this class."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        # Get the subject, which must belong to this class
+        subject_obj = get_object_or_404(Subject, id=subject_id, class_assigned_id=class_id)
 
         # Get the exam details from the request
         exam_name = request.data.get("name")
@@ -306,7 +328,7 @@ class CreateExamView(APIView):
         exam = Exam.objects.create(
             name=exam_name,
             description=exam_description,
-            class_assigned=class_obj,
+            class_assigned_id=class_id,
             subject=subject_obj,
         )
 
@@ -330,7 +352,7 @@ class PublishExamResultsView(APIView):
         exam = get_object_or_404(Exam, id=exam_id)
 
         # Check if the user is a teacher for this class
-        if not exam.class_assigned.teachers.filter(id=request.user.id).exists():
+        if class_role(request, exam.class_assigned_id) != UserRole.TEACHER:
             return Response(
                 {"error": "You are not authorized to publish results for this exam."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -344,36 +366,93 @@ class PublishExamResultsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Create or update the ExamResult for this exam
-        exam_result, created = ExamResult.objects.get_or_create(Exam=exam)
+        if not isinstance(results_data, list):
+            return Response(
+                {"error": "Results must be a list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # Loop through the results and add them to the ExamResult model
-        for result in results_data:
-            student_id = result.get("student_id")
-            marks = result.get("marks")
-            grade = result.get("grade", None)
+        if request.query_params.get("async") in ("1", "true"):
+            # Store the sheet and publish it in the background
+            job = queue_publish_job(exam, results_data, submitted_by=request.user)
+            return Response(
+                {"message": "Exam results queued for publishing.", "job": job.as_dict()},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
-            # Ensure the student exists
-            student = get_object_or_404(User, id=student_id)
+        # Validate every row up front, resolving the students in one lookup
+        entries, errors = prepare_entries(results_data)
 
-            # Add the student result to the exam results (in JSON format)
-            exam_result.add_student_result(student, marks, grade)
+        if not entries:
+            return Response(
+                {"error": "No valid results to publish.", "errors": errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Write only the entries that differ from the stored results
+        summary = publish_results(exam, entries, published_by=request.user)
+        if summary["changed"]:
+            message, code = "Exam results published successfully!", status.HTTP_201_CREATED
+        else:
+            message, code = "Exam results are already up to date.", status.HTTP_200_OK
 
         return Response(
-            {"message": "Exam results published successfully!"},
-            status=status.HTTP_201_CREATED,
+            {"message": message, "published": len(entries), **summary, "errors": errors},
+            status=code,
         )
 
 
+class PublishJobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(
+            PublishJob.objects.select_related("exam").defer("payload"), id=job_id
+        )
+        # The submitter, the class's teachers and staff can follow a job
+        if not (
+            job.submitted_by_id == request.user.id
+            or request.user.is_staff
+            or class_role(request, job.exam.class_assigned_id) == UserRole.TEACHER
+        ):
+            return Response(
+                {"error": "You are not authorized to view this job."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(job.as_dict())
+
+
 class ViewExamResultsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, exam_id):
-        # Get the exam result for the provided exam ID
-        exam_result = get_object_or_404(ExamResult, Exam__id=exam_id)
+        # Get the exam along with its subject
+        exam = get_object_or_404(Exam.objects.select_related("subject"), id=exam_id)
+
+        # Teachers see the whole sheet, students only their own entry
+        role = class_role(request, exam.class_assigned_id)
+        if role is None:
+            return Response(
+                {"error": "You are not a member of this class."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
 
-        # Retrieve the results from the JSONField
-        results = exam_result.results
+        # Read the normalized per-student rows for this exam
+        rows = StudentExamResult.objects.filter(exam=exam)
+        if role != UserRole.TEACHER:
+            rows = rows.filter(student_id=request.user.id)
+        rows = rows.order_by("student_id").values(
+            "student_id", "student__username", "marks", "grade"
+        )
+        results = {
+            str(row["student_id"]): {
+                "student_id": row["student_id"],
+                "student_name": row["student__username"],
+                "marks": row["marks"],
+                "grade": row["grade"],
+            }
+            for row in rows
+        }
 
         # If there are no results, return a message indicating so
         if not results:
@@ -385,26 +464,180 @@ class ViewExamResultsView(APIView):
         # Return the results in the response
         return Response(
             {
-                "exam": exam_result.Exam.name,
-                "subject": exam_result.Exam.subject.name,
+                "exam": exam.name,
+                "subject": exam.subject.name,
                 "results": results,
             },
             status=status.HTTP_200_OK,
         )
 
 
+class ExamAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, exam_id):
+        exam = get_object_or_404(Exam.objects.only("id", "name", "class_assigned_id"), id=exam_id)
+
+        # Only teachers of the class may see the statistics
+        if class_role(request, exam.class_assigned_id) != UserRole.TEACHER:
+            return Response(
+                {"error": "You are not authorized to view analytics for this exam."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return Response({"exam": exam.name, **exam_statistics(exam.id)})
+
+
+class ViewOwnExamResultView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, exam_id):
+        exam = get_object_or_404(
+            Exam.objects.select_related("subject").only("name", "subject__name"),
+            id=exam_id,
+        )
+
+        # The indexed per-student row; blobs edited outside publishing (e.g. in
+        # the admin) may lack one, so fall back to extracting the key in SQL
+        entry = (
+            StudentExamResult.objects.filter(exam=exam, student_id=request.user.id)
+            .values("student_id", "marks", "grade", student_name=F("student__username"))
+            .first()
+        )
+        if entry is None:
+            entry = ExamResult.objects.filter(Exam=exam).student_entry(request.user.id)
+        if entry is None:
+            return Response(
+                {"message": "No result published for you in this exam yet."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(
+            {"exam": exam.name, "subject": exam.subject.name, "result": entry},
+            status=status.HTTP_200_OK,
+        )
+
+
+class RankListMixin:
+    pagination_class = RankPagination
+
+    def paginated_ranks(self, request, ranks, **extra):
+        """One page of a merit list; ``ranks`` is a values() queryset."""
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            ranks.order_by("rank", "student_id"), request, view=self
+        )
+        for row in page:
+            row["percentile"] = round(row["percentile"], 2)
+        return Response(
+            {
+                **extra,
+                "count": paginator.page.paginator.count,
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "results": page,
+            }
+        )
+
+
+def exam_for_ranks(request, exam_id, teacher_only):
+    """Return the exam, or raise 404/403 for non-members (and non-teachers)."""
+    exam = get_object_or_404(Exam.objects.only("id", "name", "class_assigned_id"), id=exam_id)
+    role = class_role(request, exam.class_assigned_id)
+    if role is None or (teacher_only and role != UserRole.TEACHER):
+        raise PermissionDenied("You are not authorized to view ranks for this exam.")
+    return exam
+
+
+class ExamRankListView(RankListMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, exam_id):
+        exam = exam_for_ranks(request, exam_id, teacher_only=True)
+        ranks = ExamRank.objects.filter(exam_id=exam.id).values(
+            "rank", "percentile", "marks", "student_id", student_name=F("student__username")
+        )
+        return self.paginated_ranks(request, ranks, exam=exam.name)
+
+
+class ExamOwnRankView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, exam_id):
+        exam = exam_for_ranks(request, exam_id, teacher_only=False)
+        ranks = ExamRank.objects.filter(exam_id=exam.id)
+        entry = ranks.filter(student_id=request.user.id).values(
+            "rank", "percentile", "marks"
+        ).first()
+        if entry is None:
+            return Response(
+                {"message": "You have no rank in this exam yet."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        entry["percentile"] = round(entry["percentile"], 2)
+        return Response({"exam": exam.name, "ranked": ranks.count(), **entry})
+
+
+class ClassRankListView(RankListMixin, APIView):
+    # Only teachers of the class may see the whole merit list
+    permission_classes = [IsAuthenticated, IsClassTeacher]
+    class_permission_message = "You are not authorized to view ranks for this class."
+
+    def get(self, request, class_id):
+        ranks = ClassRank.objects.filter(class_assigned_id=class_id).values(
+            "rank", "percentile", "total_marks", "exams_counted", "student_id",
+            student_name=F("student__username"),
+        )
+        return self.paginated_ranks(request, ranks, class_id=class_id)
+
+
+class ClassOwnRankView(APIView):
+    permission_classes = [IsAuthenticated, IsClassMember]
+    class_permission_message = "You are not a member of this class."
+
+    def get(self, request, class_id):
+        ranks = ClassRank.objects.filter(class_assigned_id=class_id)
+        entry = ranks.filter(student_id=request.user.id).values(
+            "rank", "percentile", "total_marks", "exams_counted"
+        ).first()
+        if entry is None:
+            return Response(
+                {"message": "You have no rank in this class yet."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        entry["percentile"] = round(entry["percentile"], 2)
+        return Response({"class_id": class_id, "ranked": ranks.count(), **entry})
+
+
 class ViewSubjectExamsView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = ExamPageNumberPagination
+    ordering_fields = ("id", "name")
 
     def get(self, request, subject_id):
         # Get the subject object by subject_id
-        subject = get_object_or_404(Subject, id=subject_id)
+        subject = get_object_or_404(Subject.objects.only("id", "name"), id=subject_id)
 
-        # Get all exams related to this subject
-        exams = Exam.objects.filter(subject=subject)
+        # Optional ordering, e.g. ?ordering=-name
+        ordering = request.query_params.get("ordering", "id")
+        if ordering.lstrip("-") not in self.ordering_fields:
+            return Response(
+                {"error": f"Ordering must be one of: {', '.join(self.ordering_fields)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Project just the columns we return; the class name comes from a join
+        exams = (
+            Exam.objects.filter(subject=subject)
+            .order_by(ordering, "id")
+            .values("id", "name", "description", class_name=F("class_assigned__name"))
+        )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(exams, request, view=self)
 
         # If no exams are found, return a message
-        if not exams:
+        if not page:
             return Response(
                 {"message": "No exams found for this subject."},
                 status=status.HTTP_404_NOT_FOUND,
@@ -413,18 +646,25 @@ class ViewSubjectExamsView(APIView):
         # Serialize the exam data
         exam_data = [
             {
-                "id": exam.id,
-                "name": exam.name,
-                "description": exam.description,
-                "class_assigned": exam.class_assigned.name,
-                "subject": exam.subject.name,
+                "id": exam["id"],
+                "name": exam["name"],
+                "description": exam["description"],
+                "class_assigned": exam["class_name"],
+                "subject": subject.name,
             }
-            for exam in exams
+            for exam in page
         ]
 
-        # Return the exams for the subject
+        # Return one page of exams for the subject
         return Response(
-            {"subject": subject.name, "exams": exam_data}, status=status.HTTP_200_OK
+            {
+                "subject": subject.name,
+                "count": paginator.page.paginator.count,
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "exams": exam_data,
+            },
+            status=status.HTTP_200_OK,
         )
 
 
@@ -441,17 +681,6 @@ class PlacementProfileView(APIView):
         )
 
     def post(self, request):
-        try:
-            profile = PlacementProfile.objects.get(user=request.user)
-        except PlacementProfile.DoesNotExist:
-            profile = None
-
-        if profile is not None:
-            return Response(
-                {"error": "Profile already exists"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         cgpa = request.data.get("cgpa")
         percentage_10th = request.data.get("percentage_10th")
         percentage_12th = request.data.get("percentage_12th")
@@ -467,8 +696,16 @@ class PlacementProfileView(APIView):
             "percentage_12th": round(percentage_12th, 4),
         }
 
-        place_profile = PlacementProfile.objects.create(
-            user=request.user, **data)
+        # One profile per user is enforced by the one-to-one constraint
+        try:
+            with transaction.atomic():
+                place_profile = PlacementProfile.objects.create(
+                    user=request.user, **data)
+        except IntegrityError:
+            return Response(
+                {"error": "Profile already exists"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         return Response(
             {"profile": PlacementProfileSerializer(place_profile).data},
             status=status.HTTP_201_CREATED,
@@ -505,11 +742,10 @@ class PlacementStudentCompanyView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Filter companies based on eligibility criteria
-        companies = PlacementCompany.objects.all()
+        # Annotate eligibility and application status in the same query
+        companies = PlacementCompany.objects.with_student_flags(request.user, profile)
 
-        serializer = PlacementCompanySerializer(companies, many=True, context={
-                                                "profile": profile, "user": request.user})
+        serializer = PlacementCompanySerializer(companies, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -530,13 +766,6 @@ class PlacementApplyView(APIView):
             company = get_object_or_404(PlacementCompany, pk=company_id)
             profile = PlacementProfile.objects.get(user=request.user)
 
-            # Check if user already applied
-            if PlacementApplication.objects.filter(user=request.user, company=company).exists():
-                return Response(
-                    {"error": "You have already applied to this company"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
             # Check eligibility
             if not (profile.cgpa >= company.min_cgpa and
                     profile.percentage_10th >= company.min_10th and
@@ -546,15 +775,20 @@ class PlacementApplyView(APIView):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            # Create application
+            # Create application; the unique (user, company) constraint rejects repeats
             application_data = PlacementProfileSerializer(profile).data
-            application = PlacementApplication.objects.create(
-                user=request.user,
-                company=company,
-                other_details=application_data
-            )
-
-            print(ApplicationSerializer(application).data)
+            try:
+                with transaction.atomic():
+                    application = PlacementApplication.objects.create(
+                        user=request.user,
+                        company=company,
+                        other_details=application_data
+                    )
+            except IntegrityError:
+                return Response(
+                    {"error": "You have already applied to this company"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
             return Response(
                 ApplicationSerializer(application).data,
@@ -574,300 +808,108 @@ class PlacementApplyView(APIView):
 
 
 class PlacementApplicationView(APIView):
+    pagination_class = ApplicationCursorPagination
 
     def get(self, request, company_id):
-        company = PlacementCompany.objects.get(pk=company_id)
+        company = get_object_or_404(PlacementCompany, pk=company_id)
+
+        # Optional sparse fieldset, e.g. ?fields=id,user
+        fields = None
+        if request.query_params.get("fields"):
+            fields = [name.strip() for name in request.query_params["fields"].split(",")]
+            unknown = set(fields) - set(ApplicationListSerializer.Meta.fields)
+            if unknown:
+                return Response(
+                    {"error": f"Unknown fields: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
         applications = PlacementApplication.objects.filter(company=company)
+        if fields is None or "user" in fields:
+            applications = applications.select_related("user")
+        if fields is not None and "other_details" not in fields:
+            applications = applications.defer("other_details")
+
+        # Fetch one page by keyset and emit the shared company block once
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(applications, request, view=self)
+        serializer = ApplicationListSerializer(page, many=True, fields=fields)
         return Response(
-            ApplicationSerializer(applications, many=True).data
+            {
+                "company": PlacementCompanyAdminSerializer(company).data,
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "results": serializer.data,
+            }
         )
 
 
+class PlacementApplicationExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, company_id=None):
+        # Only placement coordinators can download applicant lists
+        if not PlacementProfile.objects.filter(
+            user=request.user, is_placement_coordinator=True
+        ).exists():
+            return Response(
+                {"error": "Only placement coordinators can export applications."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if company_id is not None:
+            get_object_or_404(PlacementCompany, pk=company_id)
+
+        # ?type=csv (default) or ?type=ndjson
+        export_format = request.query_params.get("type", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported export type: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Stream rows as they are read so memory stays flat for large drives
+        rows, content_type = export_applications(export_format, company_id)
+        filename = f"applications-{company_id or 'all'}.{export_format}"
+        response = StreamingHttpResponse(rows, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class QueryMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise Http404
+        return Response({"routes": route_summaries()})
+
+    def delete(self, request):
+        if not settings.QUERY_METRICS_ENABLED:
+            raise Http404
+        reset_metrics()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class AddTeacherView(APIView):
+    permission_classes = [IsAdminUser]
+
     def get(self, request):
-        teachers_data = {
-            "CSE": [
-                {
-                    "name": "Dr. Preetha Mathew",
-                    "profession": "HOD CS",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/01.jpg",
-                    "profileLink": "?page=12&s=17"
-                },
-                {
-                    "name": "Bindu P K",
-                    "profession": "Associate Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/02.jpg",
-                    "profileLink": "?page=12&s=18"
-                },
-                {
-                    "name": "Manoj Kumar P",
-                    "profession": "Associate Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/03.jpg",
-                    "profileLink": "?page=12&s=20"
-                },
-                {
-                    "name": "Anitha Mary Chacko",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/16.jpg",
-                    "profileLink": "?page=12&s=141"
-                },
-                {
-                    "name": "Alice Joseph",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/07.jpg",
-                    "profileLink": "?page=12&s=6"
-                },
-                {
-                    "name": "Aswathy V Shaji",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/22.jpg",
-                    "profileLink": "?page=12&s=197"
-                },
-                {
-                    "name": "Hafeesa M Habeeb",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/24.jpg",
-                    "profileLink": "?page=12&s=215"
-                },
-                {
-                    "name": "Amritha Mary Davis",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CSE/FACULTY PICS/0.jpg",
-                    "profileLink": "?page=12&s=#"
-                }
-            ],
-            "CE": [
-                {
-                    "name": "Dr.Sunilkumar N",
-                    "profession": "HOD CE",
-                    "image": "images/PIC & SIGN/CE/FACULTY PICS/01.jpg",
-                    "profileLink": "?page=12&s=52"
-                },
-                {
-                    "name": "Minimole A",
-                    "profession": "Associate Professor",
-                    "image": "images/PIC & SIGN/CE/FACULTY PICS/02.jpg",
-                    "profileLink": "?page=12&s=15"
-                },
-                {
-                    "name": "Harija K S",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CE/FACULTY PICS/40.jpg",
-                    "profileLink": "?page=12&s=205"
-                },
-                {
-                    "name": "Prajeesha M P",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CE/FACULTY PICS/0.jpg",
-                    "profileLink": "?page=12&s=#"
-                },
-                {
-                    "name": "Aimy Rose Joy",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/CE/FACULTY PICS/0.jpg",
-                    "profileLink": "?page=12&s=#"
-                }
-            ],
-            "ECE": [
-                {
-                    "name": "Dr.Anilkumar K K",
-                    "profession": "HOD ECE",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/02.jpg",
-                    "profileLink": "?page=12&s=26"
-                },
-                {
-                    "name": "Dr. Manoj V J",
-                    "profession": "Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/01.jpg",
-                    "profileLink": "?page=12&s=199"
-                },
-                {
-                    "name": "Nishanth R",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/24.jpg",
-                    "profileLink": "?page=12&s=203"
-                },
-                {
-                    "name": "Akhila L",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/05.jpg",
-                    "profileLink": "?page=12&s=67"
-                },
-                {
-                    "name": "Abin John Joseph",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/06.jpg",
-                    "profileLink": "?page=12&s=21"
-                },
-                {
-                    "name": "Malini Mohan",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/19.jpg",
-                    "profileLink": "?page=12&s=146"
-                },
-                {
-                    "name": "Sujith P S",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/21.jpg",
-                    "profileLink": "?page=12&s=200"
-                },
-                {
-                    "name": "Jaya Sukes",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/ECE/FACULTY PICS/26.jpg",
-                    "profileLink": "?page=12&s=214"
-                }
-            ],
-            "EEE": [
-                {
-                    "name": "Dr.Shiny Paul",
-                    "profession": "HOD EEE",
-                    "image": "images/PIC & SIGN/EEE/FACULTY PICS/02.jpg",
-                    "profileLink": "?page=12&s=29"
-                },
-                {
-                    "name": "Priya R Krishnan",
-                    "profession": "Associate Professor",
-                    "image": "images/PIC & SIGN/EEE/FACULTY PICS/04.jpg",
-                    "profileLink": "?page=12&s=27"
-                },
-                {
-                    "name": "Sajan Joseph",
-                    "profession": "Associate Professor",
-                    "image": "images/PIC & SIGN/EEE/FACULTY PICS/03.jpg",
-                    "profileLink": "?page=12&s=30"
-                },
-                {
-                    "name": "Nakul Sasikumar",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/EEE/FACULTY PICS/30.jpg",
-                    "profileLink": "?page=12&s=156"
-                },
-                {
-                    "name": "Raji Reghunanthan",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/EEE/FACULTY PICS/36.jpg",
-                    "profileLink": "?page=12&s=209"
-                }
-            ],
-            "IT": [
-                {
-                    "name": "Dr.Jabir K V T",
-                    "profession": "HOD IT",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/02.jpg",
-                    "profileLink": "?page=12&s=43"
-                },
-                {
-                    "name": "Dr.Jayaprabha P",
-                    "profession": "Associate Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/01.jpg",
-                    "profileLink": "?page=12&s=42"
-                },
-                {
-                    "name": "Dr.Harikrishnan D",
-                    "profession": "Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/03.jpg",
-                    "profileLink": "?page=12&s=44"
-                },
-                {
-                    "name": "Nidhin Sani",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/05.jpg",
-                    "profileLink": "?page=12&s=40"
-                },
-                {
-                    "name": "Vineeth M V",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/16.jpg",
-                    "profileLink": "?page=12&s=188"
-                },
-                {
-                    "name": "Santhikrishna M S",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/17.jpg",
-                    "profileLink": "?page=12&s=189"
-                },
-                {
-                    "name": "Athira K R",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/21.jpg",
-                    "profileLink": "?page=12&s=223"
-                },
-                {
-                    "name": "Vidya Muraleedharan",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/22.jpg",
-                    "profileLink": "?page=12&s=#"
-                },
-                {
-                    "name": "Jesna A A",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/23.jpg",
-                    "profileLink": "?page=12&s=#"
-                },
-                {
-                    "name": "Keethimol P P",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/IT/FACULTY PICS/20.jpg",
-                    "profileLink": "?page=12&s=222"
-                }
-            ],
-            "MCA": [
-                {
-                    "name": "Deepa Nair",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/MCA/FACULTY PICS/01.jpg",
-                    "profileLink": "?page=12&s=45"
-                },
-                {
-                    "name": "Radhika B",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/MCA/FACULTY PICS/09.jpg",
-                    "profileLink": "?page=12&s=75"
-                },
-                {
-                    "name": "Anoop S",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/MCA/FACULTY PICS/19.jpg",
-                    "profileLink": "?page=12&s=191"
-                },
-                {
-                    "name": "Sanjana",
-                    "profession": "Assistant Professor",
-                    "image": "images/PIC & SIGN/MCA/FACULTY PICS/0.jpg",
-                    "profileLink": "?page=12&s=#"
-                }
-            ]
-        }
+        # Run the import in the background and hand back a job to poll
+        job = jobs.submit("import_faculty", import_faculty)
+        return Response(
+            {"message": "Faculty import started.", "job": job.as_dict()},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        for branch, teachers in teachers_data.items():
-            for data in teachers:
-                image_url = f"https://cucek.cusat.ac.in/{data['image']}"
-                image_name = os.path.basename(data["image"]).replace(
-                    " ", "_")  # Clean image name
-
-                try:
-                    response = requests.get(image_url)
-                    if response.status_code == 200:
-                        image_file = ContentFile(
-                            response.content, name=image_name)
-
-                        Teacher.objects.create(
-                            name=data["name"],
-                            profession=data["profession"],
-                            about="",
-                            qualifications="M.Tech",
-                            experience=0,
-                            branch=branch,  # Use the branch dynamically here
-                            projects="",
-                            image=image_file,  # Saving image to the model field
-                            path=data["profileLink"]
-                        )
-                    else:
-                        print(
-                            f"Failed to download image: {image_url} (Status {response.status_code})")
-
-                except Exception as e:
-                    print(f"Error downloading image {image_url}: {e}")
-
-        return Response({"message": "Teachers added successfully."})
+
+class JobStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        job = jobs.get_job(job_id)
+        if job is None:
+            return Response(
+                {"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(job.as_dict())
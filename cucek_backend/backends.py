@@ -1,13 +1,25 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
 class EmailBackend(ModelBackend):
     def authenticate(self, request, email=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=email)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
-            return None
\ No newline at end of file
+        if email is None or password is None:
+            return None
+
+        # Matches the LOWER(email) index; emails are not unique, so the oldest account wins
+        user = (
+            User.objects.alias(email_lower=Lower("email"))
+            .filter(email_lower=email.lower())
+            .order_by("id")
+            .first()
+        )
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor raised to ``PASSWORD_PBKDF2_ITERATIONS``.
+
+    The setting can only raise Django's default, never lower it, so hashes
+    are not downgraded at login. Stored hashes keep their own iteration
+    count, so changing the setting never locks anyone out; accounts are
+    rehashed at their next login.
+    """
+
+    iterations = max(settings.PASSWORD_PBKDF2_ITERATIONS, PBKDF2PasswordHasher.iterations)
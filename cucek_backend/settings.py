@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -46,7 +47,7 @@ INSTALLED_APPS = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ),
 }
 SIMPLE_JWT = {
@@ -55,6 +56,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'api.middleware.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +67,9 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
  ]
 
+# Opt-in per-route SQL/latency metrics (see api/middleware.py)
+QUERY_METRICS_ENABLED = os.environ.get('QUERY_METRICS_ENABLED') == '1'
+
 ROOT_URLCONF = 'cucek_backend.urls'
 AUTHENTICATION_BACKENDS = [
     'cucek_backend.backends.EmailBackend',
@@ -92,15 +97,92 @@ WSGI_APPLICATION = 'cucek_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+# The database profile is chosen with environment variables:
+#   DB_ENGINE=sqlite (default) or postgres
+#   DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+#   DB_CONN_MAX_AGE (postgres, seconds; persistent connections)
+#   DB_POOL=1, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE (postgres, needs psycopg[pool])
+#   DB_SQLITE_TUNED=0 to fall back to SQLite's default journaling
+#   DB_BUSY_TIMEOUT (seconds to wait on a locked database)
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_BUSY_TIMEOUT = int(os.environ.get('DB_BUSY_TIMEOUT', '20'))
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'cucek_backend'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_POOL') == '1':
+        # Django's native psycopg pool replaces persistent connections
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'timeout': DB_BUSY_TIMEOUT,
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('DB_SQLITE_TUNED', '1') == '1':
+        # WAL lets readers run alongside the single writer, and IMMEDIATE
+        # transactions take the write lock up front so waiting writers
+        # queue on busy_timeout instead of failing with "database is locked"
+        DATABASES['default']['OPTIONS'] = {
+            'timeout': DB_BUSY_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT * 1000};'
+            ),
+        }
+
+# Caches hold directory responses and per-user class roles. Point
+# CACHE_BACKEND/CACHE_LOCATION at a shared backend such as Redis when running
+# more than one process, so invalidations reach every worker;
+# ``manage.py check --deploy`` fails while the cache is process-local.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+
+# PBKDF2 work factor. This can only raise Django's default (870k in 5.1);
+# 0 keeps the default, which rises with each Django release.
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "0"))
+
+PASSWORD_HASHERS = [
+    'cucek_backend.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -166,5 +248,7 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=1)
+    "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "api.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.serializers.ClaimsTokenRefreshSerializer",
 }
\ No newline at end of file